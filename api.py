@@ -1,16 +1,36 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import uvicorn
+import asyncio
 import os
 import pandas as pd
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from src.etl.pipeline import executar_pipeline
-from src.rag_builder import inicializar_rag
-from src.rag.rag_core import responder_pergunta_rag
-from src.rag.chat_history import limpar_contexto
-from src.etl.reporter import gerar_grafico_automatico
+from src.etl.esquema import ESQUEMA_POKEMON, TIPOS_POKEMON, CATEGORIAS_POKEMON, ler_relatorio_csv, bytes_por_linha
+from src.rag.aquecimento import Aquecimento
+from src.rag.rag_core import responder_pergunta_rag, responder_pergunta_rag_stream, responder_perguntas_em_lote, obter_saude_llm, get_llm
+from src.rag.chat_history import limpar_contexto, ler_historico
+from src.etl.servico_graficos import ServicoGraficos, carregar_dados_grafico
+from src.rag.gerenciador_vetorstore import GerenciadorVetorstore
+from src.utils.logger import configurar_logs, parar_logs
+from src.utils.perfilador import Perfilador
+from src.utils.armazem_artefatos import obter_armazem, validar_sessao
+from src.config.settings import (
+    CONCORRENCIA_LLM_LOTE,
+    MAX_CONCORRENCIA_LLM_LOTE,
+    MAX_PERGUNTAS_LOTE,
+    DIRETORIO_DADOS_CHAT,
+    DIRETORIO_GRAFICOS_CHAT,
+    DIRETORIO_HISTORICO_CHAT,
+    DPI_GRAFICOS_CHAT,
+    DPIS_PERMITIDOS_GRAFICOS,
+    PERFILAR_API
+)
 
 app = FastAPI()
 
@@ -23,38 +43,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Variável global para armazenar o vetorstore
-vetorstore_rag = None
+# Mantém o vetorstore em uso e o troca quando uma nova geração do índice é publicada
+gerenciador_vetorstore = GerenciadorVetorstore()
+
+# Renderiza os gráficos do chat em outros processos, com cache por pedido
+servico_graficos = ServicoGraficos()
+
+# Carrega modelo e índice em segundo plano, sem atrasar a subida do servidor
+aquecimento = Aquecimento(gerenciador_vetorstore)
+
+# Uma reconstrução por vez: execuções simultâneas disputariam o estado do pipeline, o
+# relatório e a publicação (e a limpeza) das gerações do índice
+trava_pipeline = threading.Lock()
+
+# Perfis de CPU, pilhas e memória de cada requisição de chat (ligado em PERFILAR_API ou POST /profiling)
+perfilador_api = Perfilador(ativo=PERFILAR_API, rotulo="api")
+
+def _chatbot_indisponivel() -> HTTPException:
+    if aquecimento.em_andamento:
+        return HTTPException(status_code=503, detail="Chatbot aquecendo (carregando modelo e índice). Tente novamente em instantes.")
+    return HTTPException(status_code=503, detail="Chatbot não inicializado. Execute o pipeline primeiro.")
+
+def _sessao(sessao) -> str:
+    """Valida a sessão enviada pelo cliente (namespace dos arquivos do chat); vazia é a sessão padrão."""
+    try:
+        return validar_sessao(sessao)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.on_event("startup")
 async def startup_event():
-    global vetorstore_rag
-    print("Inicializando RAG...")
-    vetorstore_rag = inicializar_rag()
-    if not vetorstore_rag:
-        print("Erro ao inicializar o RAG. O chatbot pode não funcionar corretamente.")
+    configurar_logs()  # Logs em fila: as requisições só enfileiram, a escrita fica em outra thread
+    # O modelo e o índice são carregados em segundo plano: o servidor sobe na hora e
+    # /health/ready indica quando a réplica pode receber tráfego de chat.
+    print("Inicializando RAG em segundo plano...")
+    # Acerta os índices do armazenamento do chat com o disco (e aplica os limites) uma vez por subida
+    for diretorio in (DIRETORIO_DADOS_CHAT, DIRETORIO_GRAFICOS_CHAT, DIRETORIO_HISTORICO_CHAT):
+        await run_in_threadpool(obter_armazem(diretorio).reconciliar)
+    aquecimento.iniciar(ao_carregar_indice=gerenciador_vetorstore.iniciar_monitoramento)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    gerenciador_vetorstore.parar_monitoramento()
+    servico_graficos.encerrar()
+    parar_logs()
 
 @app.get("/status")
 async def get_status():
-    return {"status": "API está online!"}
+    return {"status": "API está online!", "pronto": aquecimento.pronto}
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness: o processo está respondendo (não depende do aquecimento)."""
+    return {"status": "vivo"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness: 200 quando o modelo e o índice estão carregados; 503 com o progresso do aquecimento."""
+    estado = aquecimento.estado()
+    if not estado["pronto"]:
+        return JSONResponse(status_code=503, content=estado)
+    return estado
+
+@app.get("/get_llm_status")
+async def get_llm_status():
+    """Disjuntores, latências (p50/p95) e contadores de cada provedor de LLM e do roteador."""
+    saude = obter_saude_llm()
+    if saude is None:
+        return {"provedores": [], "roteador": None}
+    return saude
+
+@app.get("/profiling")
+async def get_profiling():
+    """Se o profiling está ligado, o diretório da sessão e o resumo de cada requisição perfilada."""
+    return perfilador_api.estado()
+
+@app.post("/profiling")
+async def set_profiling(ativo: bool):
+    """Liga (em uma nova sessão) ou desliga o profiling das requisições de chat e do pipeline."""
+    if ativo:
+        perfilador_api.ativar()
+    else:
+        perfilador_api.desativar()
+    return perfilador_api.estado()
 
 @app.post("/run_pipeline")
-async def run_pipeline():
+async def run_pipeline(forcar: bool = False, perfilar: bool = False):
+    if not trava_pipeline.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="O pipeline já está em execução. Aguarde o término.")
     try:
-        executar_pipeline()
-        return {"message": "Pipeline de ETL executado com sucesso!"}
+        # Em uma thread, para que o chat continue respondendo na geração atual durante a reconstrução
+        await run_in_threadpool(executar_pipeline, forcar=forcar, perfilar=perfilar or perfilador_api.ativo)
+        await run_in_threadpool(gerenciador_vetorstore.recarregar)
+        return {"message": "Pipeline de ETL executado com sucesso!", "geracao_indice": gerenciador_vetorstore.geracao}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao executar o pipeline: {e}")
+    finally:
+        trava_pipeline.release()
 
 @app.post("/chat")
 async def chat_endpoint(pergunta: dict):
-    global vetorstore_rag
+    vetorstore_rag = gerenciador_vetorstore.obter()  # A requisição termina nesta geração, mesmo após uma troca
     if not vetorstore_rag:
-        raise HTTPException(status_code=503, detail="Chatbot não inicializado. Execute o pipeline primeiro.")
+        raise _chatbot_indisponivel()
     
     user_pergunta = pergunta.get("pergunta")
     if not user_pergunta:
         raise HTTPException(status_code=400, detail="Pergunta não fornecida.")
+    sessao = _sessao(pergunta.get("sessao"))
     
     # A função responder_pergunta_rag já imprime a resposta e salva o histórico
     # Precisamos capturar a resposta para retornar ao frontend
@@ -64,16 +160,102 @@ async def chat_endpoint(pergunta: dict):
     # Por simplicidade, vamos assumir que responder_pergunta_rag será modificada para retornar a resposta
     # ou que o frontend fará uma nova requisição para buscar o histórico/dados
     
-    resposta_llm = responder_pergunta_rag(user_pergunta, vetorstore_rag)
+    def _responder():
+        with perfilador_api.secao("chat"):
+            return responder_pergunta_rag(user_pergunta, vetorstore_rag, sessao)
+
+    resposta_llm = await run_in_threadpool(_responder)
     if resposta_llm:
         return {"pergunta": user_pergunta, "resposta": resposta_llm}
     else:
         raise HTTPException(status_code=500, detail="Não foi possível obter uma resposta do chatbot.")
 
+async def _iterar_em_uma_thread(gerador):
+    """
+    Itera um gerador síncrono sempre na mesma thread. O StreamingResponse usaria uma thread
+    qualquer do pool a cada item, e o perfil de CPU precisa começar e terminar na mesma thread.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-stream")
+    fim = object()
+    try:
+        while True:
+            item = await asyncio.wrap_future(executor.submit(next, gerador, fim))
+            if item is fim:
+                break
+            yield item
+    finally:
+        executor.submit(gerador.close)  # Fecha o gerador (e a seção do perfil) na mesma thread
+        executor.shutdown(wait=False)
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(pergunta: dict):
+    """
+    Responde a pergunta em Server-Sent Events, enviando os tokens à medida que o LLM os gera:
+    eventos "token" ({"conteudo": ...}), depois "fim" ({"resposta": ..., "dados": ...}, quando
+    histórico e dados estruturados já foram salvos) ou "erro" ({"erro": ...}).
+    """
+    vetorstore_rag = gerenciador_vetorstore.obter()
+    if not vetorstore_rag:
+        raise _chatbot_indisponivel()
+
+    user_pergunta = pergunta.get("pergunta")
+    if not user_pergunta:
+        raise HTTPException(status_code=400, detail="Pergunta não fornecida.")
+    sessao = _sessao(pergunta.get("sessao"))
+
+    def _eventos_sse():
+        with perfilador_api.secao("chat_stream"):
+            for evento in responder_pergunta_rag_stream(user_pergunta, vetorstore_rag, sessao):
+                tipo = evento.pop("tipo")
+                yield f"event: {tipo}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+    # Sem cache nem buffer em proxies (ex: nginx), para cada token sair na hora
+    return StreamingResponse(
+        _iterar_em_uma_thread(_eventos_sse()) if perfilador_api.ativo else _eventos_sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/chat/batch")
+async def chat_batch_endpoint(payload: dict):
+    """
+    Responde várias perguntas em lote. As respostas chegam em NDJSON (uma linha JSON por
+    pergunta) à medida que ficam prontas; o campo "indice" indica a posição da pergunta.
+    Até MAX_PERGUNTAS_LOTE perguntas; "max_concorrencia" é limitado a MAX_CONCORRENCIA_LLM_LOTE.
+    """
+    vetorstore_rag = gerenciador_vetorstore.obter()
+    if not vetorstore_rag:
+        raise _chatbot_indisponivel()
+
+    perguntas = payload.get("perguntas")
+    if not perguntas or not isinstance(perguntas, list) or not all(isinstance(p, str) and p.strip() for p in perguntas):
+        raise HTTPException(status_code=400, detail="Forneça 'perguntas' como uma lista de textos não vazios.")
+    if len(perguntas) > MAX_PERGUNTAS_LOTE:
+        raise HTTPException(status_code=400, detail=f"No máximo {MAX_PERGUNTAS_LOTE} perguntas por lote.")
+    max_concorrencia = payload.get("max_concorrencia", CONCORRENCIA_LLM_LOTE)
+    if isinstance(max_concorrencia, str) and max_concorrencia.strip().isdigit():
+        max_concorrencia = int(max_concorrencia)
+    if isinstance(max_concorrencia, bool) or not isinstance(max_concorrencia, int) or max_concorrencia < 1:
+        raise HTTPException(status_code=400, detail="'max_concorrencia' deve ser um inteiro maior que zero.")
+    max_concorrencia = min(max_concorrencia, MAX_CONCORRENCIA_LLM_LOTE)
+    sessao = _sessao(payload.get("sessao"))
+    # Verificado antes de responder: depois dos cabeçalhos, um erro só truncaria o NDJSON
+    if not await run_in_threadpool(get_llm):
+        raise HTTPException(status_code=503, detail="Nenhum provedor de LLM configurado (GROQ_API_KEY ou OPENAI_API_KEY).")
+
+    def _linhas_ndjson():
+        for resultado in responder_perguntas_em_lote(perguntas, vetorstore_rag, max_concorrencia, sessao=sessao):
+            yield json.dumps(resultado, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_linhas_ndjson(), media_type="application/x-ndjson")
+
 @app.post("/clear_context")
-async def clear_context_endpoint():
+async def clear_context_endpoint(sessao: str = None):
+    """Limpa todo o contexto do chat ou, com ?sessao=, só os arquivos de dados dessa sessão."""
+    if sessao is not None:
+        sessao = _sessao(sessao)
     try:
-        limpar_contexto(confirmar=False) # Não pede confirmação no backend
+        limpar_contexto(confirmar=False, sessao=sessao) # Não pede confirmação no backend
         return {"message": "Contexto do chatbot limpo com sucesso!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao limpar o contexto: {e}")
@@ -85,11 +267,27 @@ async def get_pipeline_report():
         raise HTTPException(status_code=404, detail="Relatório do pipeline não encontrado. Execute o pipeline primeiro.")
     
     try:
-        df = pd.read_csv(caminho_relatorio, sep=';', encoding='utf-8')
+        df = await run_in_threadpool(ler_relatorio_csv, caminho_relatorio)
         return df.to_dict(orient="records")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao ler o relatório CSV: {e}")
 
+@app.get("/get_pipeline_schema")
+async def get_pipeline_schema():
+    """Esquema compacto da tabela de Pokémon e, se o relatório existir, a memória por linha de cada coluna."""
+    esquema = {
+        "colunas": {coluna: str(dtype) if not isinstance(dtype, pd.CategoricalDtype) else "category"
+                    for coluna, dtype in ESQUEMA_POKEMON.items()},
+        "tipos": list(TIPOS_POKEMON),
+        "categorias": list(CATEGORIAS_POKEMON),
+        "bytes_por_linha": None
+    }
+    caminho_relatorio = "data/relatorio.csv"
+    if os.path.exists(caminho_relatorio):
+        df = await run_in_threadpool(ler_relatorio_csv, caminho_relatorio)
+        esquema["bytes_por_linha"] = bytes_por_linha(df)
+    return esquema
+
 @app.get("/get_pipeline_chart")
 async def get_pipeline_chart():
     caminho_grafico = "data/grafico_tipos.png"
@@ -98,35 +296,97 @@ async def get_pipeline_chart():
     
     return FileResponse(caminho_grafico, media_type="image/png")
 
+@app.post("/plot")
+async def plot_endpoint(payload: dict):
+    """
+    Gera um gráfico a partir de um arquivo de chat_outputs/dados ("arquivo", da "sessao" se
+    informada) ou de dados enviados na requisição ("dados"), com "especificacao", "tipo",
+    "titulo" e "dpi" opcionais.
+    A renderização roda em outro processo; pedidos repetidos voltam do cache.
+    """
+    arquivo = payload.get("arquivo")
+    dados = payload.get("dados")
+    if arquivo:
+        sessao = _sessao(payload["sessao"]) if payload.get("sessao") else None
+        caminho_arquivo = await run_in_threadpool(obter_armazem(DIRETORIO_DADOS_CHAT).localizar, arquivo, sessao)
+        if not caminho_arquivo:
+            raise HTTPException(status_code=404, detail=f"Arquivo de dados '{arquivo}' não encontrado.")
+        try:
+            dados = await run_in_threadpool(carregar_dados_grafico, caminho_arquivo)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif isinstance(dados, list) and dados and all(isinstance(d, dict) for d in dados):
+        dados = pd.DataFrame(dados)
+    elif not isinstance(dados, dict) or not dados:
+        raise HTTPException(status_code=400, detail="Forneça 'arquivo' ou 'dados' (objeto ou lista de registros).")
+
+    dpi = payload.get("dpi", DPI_GRAFICOS_CHAT)
+    if dpi not in DPIS_PERMITIDOS_GRAFICOS:
+        raise HTTPException(status_code=400, detail=f"'dpi' deve ser um de {list(DPIS_PERMITIDOS_GRAFICOS)}.")
+    parametros = {
+        "tipo": payload.get("tipo"),
+        "especificacao_plot": payload.get("especificacao"),
+        "titulo": payload.get("titulo") or "Gráfico Gerado Automaticamente",
+        "dpi": dpi
+    }
+
+    # O hash dos dados roda no threadpool; a espera pela renderização não ocupa o event loop.
+    futuro, em_cache = await run_in_threadpool(servico_graficos.solicitar, dados, **parametros)
+    try:
+        caminho_grafico = await asyncio.wrap_future(futuro)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar o gráfico: {e}")
+    if not caminho_grafico:
+        raise HTTPException(status_code=422, detail="Não foi possível gerar o gráfico. Verifique a especificação ou os dados.")
+    nome = os.path.basename(caminho_grafico)
+    return {"grafico": nome, "url": f"/get_plot/{nome}", "em_cache": em_cache}
+
+@app.get("/get_plot/{nome}")
+async def get_plot(nome: str):
+    caminho_grafico = await run_in_threadpool(obter_armazem(DIRETORIO_GRAFICOS_CHAT).localizar, nome)
+    if not caminho_grafico:
+        raise HTTPException(status_code=404, detail="Gráfico não encontrado.")
+    return FileResponse(caminho_grafico, media_type="image/png")
+
 @app.get("/get_chat_history")
-async def get_chat_history():
-    historico_path = "chat_outputs/historico.txt"
-    if not os.path.exists(historico_path):
-        return {"history": ""}
-    with open(historico_path, "r", encoding="utf-8") as f:
-        return {"history": f.read()}
+async def get_chat_history(sessao: str = None):
+    """Histórico de conversas da sessão (?sessao=, padrão SESSAO_PADRAO_CHAT)."""
+    return {"history": await run_in_threadpool(ler_historico, _sessao(sessao))}
 
 @app.get("/get_chat_data")
-async def get_chat_data():
-    dados_dir = "chat_outputs/dados"
-    if not os.path.exists(dados_dir):
-        return {"data": []}
-    
+async def get_chat_data(sessao: str = None, limite: int = None):
+    """
+    Arquivos de dados do chat, do mais recente para o mais antigo, listados pelo índice do
+    armazém (sem varrer o diretório). Filtra por ?sessao= e limita a quantidade com ?limite=.
+    """
+    if sessao is not None:
+        sessao = _sessao(sessao)
+    artefatos = await run_in_threadpool(obter_armazem(DIRETORIO_DADOS_CHAT).listar, sessao, limite)
+
     all_data = []
-    for filename in os.listdir(dados_dir):
-        filepath = os.path.join(dados_dir, filename)
+    for artefato in artefatos:
+        filename, filepath = artefato['nome'], artefato['caminho']
         try:
             if filename.endswith(".csv"):
                 df = pd.read_csv(filepath, sep=';', encoding='utf-8')
-                all_data.append({"filename": filename, "type": "csv", "content": df.to_dict(orient="records")})
+                all_data.append({"filename": filename, "sessao": artefato['sessao'], "type": "csv", "content": df.to_dict(orient="records")})
             elif filename.endswith(".json"):
                 with open(filepath, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    all_data.append({"filename": filename, "type": "json", "content": data})
+                    all_data.append({"filename": filename, "sessao": artefato['sessao'], "type": "json", "content": data})
         except Exception as e:
             print(f"Erro ao ler arquivo de dados do chat {filename}: {e}")
             continue
     return {"data": all_data}
 
+@app.get("/get_chat_storage")
+async def get_chat_storage():
+    """Ocupação e limites do armazenamento do chat (dados, gráficos e histórico)."""
+    return {
+        "dados": await run_in_threadpool(obter_armazem(DIRETORIO_DADOS_CHAT).estado),
+        "graficos": await run_in_threadpool(obter_armazem(DIRETORIO_GRAFICOS_CHAT).estado),
+        "historico": await run_in_threadpool(obter_armazem(DIRETORIO_HISTORICO_CHAT).estado)
+    }
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,112 @@
+# bench_cache.py
+# Compara tempo de gravação/leitura e tamanho em disco dos formatos de cache JSON.
+#
+# Uso: python -m benchmarks.bench_cache [--tamanhos 1000 10000 100000]
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List, Dict, Any, Callable
+
+from src.utils import cache
+
+TIPOS = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+def _gerar_registros(quantidade: int, semente: int = 42) -> List[Dict[str, Any]]:
+    """Gera registros no formato da PokeAPI (versão reduzida) para o benchmark."""
+    aleatorio = random.Random(semente)
+    return [
+        {
+            'id': i,
+            'name': f"pokemon-{i}",
+            'base_experience': aleatorio.randint(36, 340),
+            'types': [{'slot': s + 1, 'type': {'name': t, 'url': f"https://pokeapi.co/api/v2/type/{TIPOS.index(t) + 1}/"}}
+                      for s, t in enumerate(aleatorio.sample(TIPOS, aleatorio.choice([1, 2])))],
+            'stats': [{'base_stat': aleatorio.randint(5, 255), 'effort': 0,
+                       'stat': {'name': n, 'url': f"https://pokeapi.co/api/v2/stat/{j + 1}/"}} for j, n in enumerate(STATS)],
+            'abilities': [{'ability': {'name': f"ability-{aleatorio.randint(1, 300)}", 'url': "https://pokeapi.co/api/v2/ability/1/"},
+                           'is_hidden': False, 'slot': 1}]
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+def _salvar_legado(dados: Any, caminho: str) -> None:
+    """Formato anterior: json da biblioteca padrão, indentado, sem escrita atômica."""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+
+def _carregar_legado(caminho: str) -> Any:
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+def _cronometrar(funcao: Callable[[], Any], repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def _carregar_sem_gc(caminho: str) -> Any:
+    """O benchmark roda em uma única thread, então pode pausar o coletor de lixo na leitura."""
+    return cache.carregar_cache_json(caminho, pausar_gc=True)
+
+def executar(tamanhos: List[int], repeticoes: int = 3) -> List[Dict[str, Any]]:
+    """
+    Mede gravação, leitura completa, leitura iterativa e tamanho de cada formato.
+
+    Returns:
+        List[Dict[str, Any]]: Uma linha de resultado por (tamanho, formato).
+    """
+    formatos = {
+        'legado (indent=2, json)': dict(salvar=_salvar_legado, carregar=_carregar_legado, iteravel=False),
+        'compacto': dict(salvar=lambda d, c: cache.salvar_cache_json(d, c), carregar=_carregar_sem_gc, iteravel=True),
+        'compacto + gzip': dict(salvar=lambda d, c: cache.salvar_cache_json(d, c, compressao="gzip"),
+                                carregar=_carregar_sem_gc, iteravel=True),
+    }
+    if cache.zstandard is not None:
+        formatos['compacto + zstd'] = dict(salvar=lambda d, c: cache.salvar_cache_json(d, c, compressao="zstd"),
+                                           carregar=_carregar_sem_gc, iteravel=True)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for quantidade in tamanhos:
+            dados = _gerar_registros(quantidade)
+            for nome, formato in formatos.items():
+                caminho = os.path.join(diretorio, f"cache_{quantidade}.json")
+                linha = {
+                    'registros': quantidade,
+                    'formato': nome,
+                    'gravacao_s': _cronometrar(lambda: formato['salvar'](dados, caminho), repeticoes),
+                    'leitura_s': _cronometrar(lambda: formato['carregar'](caminho), repeticoes),
+                    'leitura_iterativa_s': (_cronometrar(lambda: sum(1 for _ in cache.iterar_cache_json(caminho)), repeticoes)
+                                            if formato['iteravel'] else None),
+                    'tamanho_mb': os.path.getsize(caminho) / 1e6
+                }
+                resultados.append(linha)
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do utilitário de cache JSON.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    backend = "orjson" if cache.orjson is not None else "json (biblioteca padrão)"
+    print(f"Backend JSON: {backend}")
+    print(f"{'registros':>10} {'formato':<26} {'gravação (s)':>13} {'leitura (s)':>12} {'iterativa (s)':>14} {'tamanho (MB)':>13}")
+    for linha in executar(args.tamanhos, args.repeticoes):
+        iterativa = f"{linha['leitura_iterativa_s']:.3f}" if linha['leitura_iterativa_s'] is not None else "-"
+        print(f"{linha['registros']:>10} {linha['formato']:<26} {linha['gravacao_s']:>13.3f} "
+              f"{linha['leitura_s']:>12.3f} {iterativa:>14} {linha['tamanho_mb']:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# bench_esquema.py
+# Relatório de memória da tabela de Pokémon: bytes por linha de cada coluna sem e com o
+# esquema compacto (src/etl/esquema.py), para dados sintéticos de vários tamanhos.
+#
+# Uso: python -m benchmarks.bench_esquema [--tamanhos 10000 100000] [--saida relatorio.json]
+
+import argparse
+import logging
+import time
+
+from src.etl.dados_sinteticos import gerar_pokemon_sinteticos
+from src.etl.esquema import relatorio_memoria
+from src.etl.transformer import transformar_dados_pokemon, contar_pokemon_por_tipo, calcular_media_stats_por_tipo
+from src.utils import cache
+
+def medir(quantidade: int) -> dict:
+    dados = gerar_pokemon_sinteticos(quantidade)
+    antes = transformar_dados_pokemon(dados, compacto=False)
+    inicio = time.perf_counter()
+    depois = transformar_dados_pokemon(dados)
+    tempo_esquema = time.perf_counter() - inicio
+
+    relatorio = relatorio_memoria(antes, depois)
+    print(f"\n{quantidade} Pokémon (transformação compacta em {tempo_esquema:.2f}s):")
+    print(relatorio.to_string())
+
+    tempos = {}
+    for nome, tabela in (("antes", antes), ("depois", depois)):
+        inicio = time.perf_counter()
+        contar_pokemon_por_tipo(tabela)
+        calcular_media_stats_por_tipo(tabela)
+        tempos[nome] = time.perf_counter() - inicio
+    print(f"Contagem + médias por tipo: {tempos['antes']:.3f}s -> {tempos['depois']:.3f}s")
+    return {'memoria': relatorio.to_dict(orient="index"), 'analises_s': tempos}
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória por linha da tabela de Pokémon antes e depois do esquema compacto.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--saida", help="Arquivo JSON com o relatório.")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    resultado = {str(quantidade): medir(quantidade) for quantidade in args.tamanhos}
+    if args.saida:
+        cache.salvar_cache_json(resultado, args.saida, compacto=False)
+        print(f"\nRelatório salvo em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
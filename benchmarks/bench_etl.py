@@ -0,0 +1,265 @@
+# bench_etl.py
+# Mede as etapas do pipeline (extração, transformação, análises, relatórios e indexação) de
+# forma offline e grava os resultados em JSON, comparáveis entre versões.
+#
+# Uso: python -m benchmarks.bench_etl [--tamanhos 1000 10000 100000] [--referencia resultado_anterior.json]
+#
+# A extração usa o servidor local de benchmarks/stub_pokeapi.py. Por padrão a indexação usa
+# embeddings determinísticos por hash (sem baixar o modelo), o que mede FAISS e docstore;
+# --embeddings modelo inclui o custo do modelo de embeddings real.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.stub_pokeapi import ServidorPokeAPIFalso
+from src.etl import extractor
+from src.etl.dados_sinteticos import gerar_pokemon_sinteticos
+from src.etl.transformer import (
+    transformar_dados_pokemon,
+    contar_pokemon_por_tipo,
+    calcular_media_stats_por_tipo,
+    encontrar_top_5_experiencia
+)
+from src.etl.reporter import (
+    gerar_grafico_tipos,
+    exportar_relatorio_csv,
+    gerar_relatorio_consolidado,
+    gerar_resumo_relatorio
+)
+from src.rag import rag_data_loader
+from src.utils import cache
+
+DIRETORIO_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_LIMITES = os.path.join(DIRETORIO_BENCHMARKS, "limites_etl.json")
+DIRETORIO_RESULTADOS = os.path.join(DIRETORIO_BENCHMARKS, "resultados")
+
+CENARIOS_EXTRACAO: Dict[str, Dict[str, Any]] = {
+    'limpo': dict(latencia_s=0.02),
+    'erros': dict(latencia_s=0.02, taxa_erro=0.05),
+    'limitado': dict(latencia_s=0.02, limite_rps=50, retry_after_s=0.5),
+}
+
+class EmbeddingsHash(Embeddings):
+    """Embeddings determinísticos (hashing de tokens), para medir a indexação sem o modelo."""
+
+    def __init__(self, dimensao: int = 384):
+        self.dimensao = dimensao
+
+    def _vetor(self, texto: str) -> List[float]:
+        vetor = np.zeros(self.dimensao, dtype="float32")
+        for token in texto.lower().split():
+            vetor[zlib.crc32(token.encode("utf-8")) % self.dimensao] += 1.0
+        norma = np.linalg.norm(vetor)
+        return (vetor / norma if norma else vetor).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vetor(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vetor(text)
+
+def _cronometrar(funcao: Callable[[], Any], repeticoes: int) -> Tuple[float, Any]:
+    """Executa a função `repeticoes` vezes e retorna o melhor tempo e o último resultado."""
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def medir_extracao(quantidade: int, cenario: str) -> Dict[str, Any]:
+    """Mede buscar_dados_pokemon contra o servidor local, sem cache e sem dados de exemplo."""
+    with ServidorPokeAPIFalso(quantidade, **CENARIOS_EXTRACAO[cenario]) as servidor:
+        url_original = extractor.URL_API
+        extractor.URL_API = servidor.url_pokemon
+        try:
+            inicio = time.perf_counter()
+            dados = extractor.buscar_dados_pokemon(quantidade, usar_cache=False, usar_dados_exemplo=False)
+            tempo = time.perf_counter() - inicio
+        finally:
+            extractor.URL_API = url_original
+        return {
+            'tempo_s': tempo,
+            'registros_por_segundo': len(dados) / tempo if tempo else None,
+            'faltando': quantidade - len(dados),
+            'requisicoes': servidor.contadores['requisicoes'],
+            'respostas_429': servidor.contadores['limitadas'],
+            'respostas_5xx': servidor.contadores['erros']
+        }
+
+def medir_processamento(quantidade: int, diretorio: str, repeticoes: int, indexar: bool) -> Dict[str, Dict[str, Any]]:
+    """Mede transformação, análises, relatórios e indexação sobre dados sintéticos."""
+    dados = gerar_pokemon_sinteticos(quantidade)
+    caminho_csv = os.path.join(diretorio, "relatorio.csv")
+    medidas: Dict[str, Dict[str, Any]] = {}
+
+    def _medir(etapa: str, funcao: Callable[[], Any]) -> Any:
+        tempo, resultado = _cronometrar(funcao, repeticoes)
+        medidas[etapa] = {'tempo_s': tempo}
+        return resultado
+
+    tabela = _medir('transformacao', lambda: transformar_dados_pokemon(dados))
+    contagem = _medir('analise.contagem_tipos', lambda: contar_pokemon_por_tipo(tabela))
+    medias = _medir('analise.media_stats_tipo', lambda: calcular_media_stats_por_tipo(tabela))
+    top_5 = _medir('analise.top_5_experiencia', lambda: encontrar_top_5_experiencia(tabela))
+    _medir('relatorio.csv', lambda: exportar_relatorio_csv(tabela, caminho_csv))
+    _medir('relatorio.grafico_tipos', lambda: gerar_grafico_tipos(contagem, os.path.join(diretorio, "grafico.png")))
+    _medir('relatorio.consolidado', lambda: gerar_relatorio_consolidado(top_5, medias, os.path.join(diretorio, "consolidado.txt")))
+    _medir('relatorio.resumo', lambda: gerar_resumo_relatorio(tabela, {'contagem_tipos': contagem}))
+
+    if indexar:
+        documentos = _medir('indexacao.documentos', lambda: rag_data_loader.gerar_documentos_para_rag(caminho_csv))
+        _medir('indexacao.faiss', lambda: rag_data_loader.indexar_dados(documentos))
+    return medidas
+
+def comparar(metricas: Dict[str, float], referencia: Dict[str, float], limites: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compara as métricas com as de uma execução anterior.
+
+    Tempos (`*tempo_s`) regridem quando passam da referência mais a tolerância da etapa;
+    registros faltando regridem quando aumentam. Tempos abaixo de `ignorar_abaixo_s` nas
+    duas execuções são ignorados, pois ficam dominados por ruído.
+    """
+    tolerancia_padrao = limites.get('tolerancia_padrao', 0.25)
+    tolerancias = limites.get('tolerancias', {})
+    ignorar_abaixo = limites.get('ignorar_abaixo_s', 0.01)
+    regressoes = []
+    for nome, valor in sorted(metricas.items()):
+        anterior = referencia.get(nome)
+        if anterior is None or valor is None:
+            continue
+        if nome.endswith('tempo_s'):
+            if max(valor, anterior) < ignorar_abaixo:
+                continue
+            prefixos = [p for p in tolerancias if nome.startswith(p)]
+            tolerancia = tolerancias[max(prefixos, key=len)] if prefixos else tolerancia_padrao
+            if valor > anterior * (1 + tolerancia):
+                regressoes.append({'metrica': nome, 'atual': valor, 'referencia': anterior, 'tolerancia': tolerancia})
+        elif nome.endswith('faltando') and valor > anterior:
+            regressoes.append({'metrica': nome, 'atual': valor, 'referencia': anterior, 'tolerancia': 0})
+    return regressoes
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=DIRETORIO_BENCHMARKS
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar(
+    tamanhos: List[int],
+    tamanhos_extracao: List[int],
+    cenarios: List[str],
+    repeticoes: int = 1,
+    embeddings: str = "hash",
+    indexar: bool = True
+) -> Dict[str, Any]:
+    """
+    Executa o benchmark completo e retorna o documento de resultados.
+
+    As métricas ficam em um dicionário plano ('<etapa>.n<tamanho>.<medida>'), o que
+    facilita comparar execuções de versões diferentes.
+    """
+    metricas: Dict[str, float] = {}
+
+    for cenario in cenarios:
+        for quantidade in tamanhos_extracao:
+            print(f"Extração: cenário '{cenario}', {quantidade} Pokémon...")
+            for medida, valor in medir_extracao(quantidade, cenario).items():
+                metricas[f"extracao.{cenario}.n{quantidade}.{medida}"] = valor
+
+    obter_modelo_original = rag_data_loader.get_embedding_model
+    caminho_indice_original = rag_data_loader.CAMINHO_INDICE_FAISS
+    if embeddings == "hash":
+        modelo_hash = EmbeddingsHash()
+        rag_data_loader.get_embedding_model = lambda: modelo_hash
+    try:
+        for quantidade in tamanhos:
+            print(f"Processamento: {quantidade} Pokémon...")
+            with tempfile.TemporaryDirectory() as diretorio:
+                rag_data_loader.CAMINHO_INDICE_FAISS = os.path.join(diretorio, "indice_faiss")
+                for etapa, medidas in medir_processamento(quantidade, diretorio, repeticoes, indexar).items():
+                    for medida, valor in medidas.items():
+                        metricas[f"{etapa}.n{quantidade}.{medida}"] = valor
+    finally:
+        rag_data_loader.get_embedding_model = obter_modelo_original
+        rag_data_loader.CAMINHO_INDICE_FAISS = caminho_indice_original
+
+    return {
+        'gerado_em': datetime.now().isoformat(timespec="seconds"),
+        'commit': _commit_atual(),
+        'ambiente': {
+            'python': sys.version.split()[0],
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'backend_json': "orjson" if cache.orjson is not None else "json"
+        },
+        'parametros': {
+            'tamanhos': tamanhos,
+            'tamanhos_extracao': tamanhos_extracao,
+            'cenarios': {c: CENARIOS_EXTRACAO[c] for c in cenarios},
+            'repeticoes': repeticoes,
+            'embeddings': embeddings
+        },
+        'metricas': metricas
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline das etapas do pipeline de ETL.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--tamanhos-extracao", type=int, nargs="+", default=[200, 1_000])
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS_EXTRACAO), default=list(CENARIOS_EXTRACAO))
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--embeddings", choices=["hash", "modelo"], default="hash")
+    parser.add_argument("--sem-indexacao", action="store_true", help="Não mede a geração de documentos e o FAISS.")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: benchmarks/resultados/etl_<data>.json).")
+    parser.add_argument("--referencia", help="Resultado anterior para detectar regressões.")
+    parser.add_argument("--limites", default=CAMINHO_LIMITES, help="Tolerâncias de regressão por etapa.")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    resultado = executar(
+        args.tamanhos, args.tamanhos_extracao, args.cenarios, args.repeticoes, args.embeddings, not args.sem_indexacao
+    )
+
+    if args.referencia:
+        with open(args.referencia, "r", encoding="utf-8") as f:
+            referencia = json.load(f)
+        limites = {}
+        if os.path.exists(args.limites):
+            with open(args.limites, "r", encoding="utf-8") as f:
+                limites = json.load(f)
+        resultado['referencia'] = {'arquivo': args.referencia, 'commit': referencia.get('commit')}
+        resultado['regressoes'] = comparar(resultado['metricas'], referencia.get('metricas', {}), limites)
+
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"etl_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    cache.salvar_cache_json(resultado, saida, compacto=False)
+
+    print(f"\n{'métrica':<52} {'valor':>14}")
+    for nome, valor in resultado['metricas'].items():
+        print(f"{nome:<52} {valor:>14.4f}" if isinstance(valor, float) else f"{nome:<52} {valor!s:>14}")
+    print(f"\nResultados salvos em: {saida}")
+
+    for regressao in resultado.get('regressoes', []):
+        print(f"REGRESSÃO: {regressao['metrica']} = {regressao['atual']:.4f} "
+              f"(referência {regressao['referencia']:.4f}, tolerância {regressao['tolerancia']:.0%})")
+    if resultado.get('regressoes'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
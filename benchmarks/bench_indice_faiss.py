@@ -0,0 +1,84 @@
+# bench_indice_faiss.py
+# Compara recall@k, latência de consulta e memória dos tipos de índice FAISS contra o flat.
+#
+# Uso: python -m benchmarks.bench_indice_faiss [--vetores 20000] [--consultas 200] [--k 25]
+
+import argparse
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from src.rag.indice_vetorial import criar_indice_faiss
+
+CONFIGURACOES: List[Tuple[str, Optional[str]]] = [
+    ("flat", None), ("flat", "fp16"), ("flat", "sq8"), ("flat", "pq"),
+    ("ivf", None), ("ivf", "sq8"), ("ivf", "pq"),
+    ("hnsw", None), ("hnsw", "sq8"), ("hnsw", "fp16"),
+]
+
+def gerar_vetores(quantidade: int, dimensao: int, semente: int = 42) -> np.ndarray:
+    """Gera vetores agrupados em clusters, parecidos com embeddings de frases normalizados."""
+    gerador = np.random.default_rng(semente)
+    centros = gerador.normal(size=(max(1, quantidade // 100), dimensao))
+    vetores = centros[gerador.integers(0, len(centros), quantidade)] + 0.35 * gerador.normal(size=(quantidade, dimensao))
+    vetores /= np.linalg.norm(vetores, axis=1, keepdims=True)
+    return vetores.astype("float32")
+
+def medir(indice, consultas: np.ndarray, k: int, verdade: np.ndarray) -> Dict[str, float]:
+    """Mede recall@k e latência de consultas individuais (como no chat)."""
+    latencias = []
+    encontrados = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        _, vizinhos = indice.search(consulta[None, :], k)
+        latencias.append(time.perf_counter() - inicio)
+        encontrados.append(vizinhos[0])
+    recall = np.mean([len(set(e) & set(v)) / k for e, v in zip(encontrados, verdade)])
+    latencias_ms = np.array(latencias) * 1000
+    return {
+        'recall': float(recall),
+        'latencia_p50_ms': float(np.percentile(latencias_ms, 50)),
+        'latencia_p95_ms': float(np.percentile(latencias_ms, 95)),
+        'memoria_mb': len(faiss.serialize_index(indice)) / 1e6
+    }
+
+def executar(total_vetores: int, total_consultas: int, dimensao: int, k: int,
+             configuracoes: List[Tuple[str, Optional[str]]] = CONFIGURACOES) -> List[Dict[str, Any]]:
+    vetores = gerar_vetores(total_vetores + total_consultas, dimensao)
+    base, consultas = vetores[:total_vetores], vetores[total_vetores:]
+
+    referencia, _ = criar_indice_faiss(base, "flat", None)
+    _, verdade = referencia.search(consultas, k)
+
+    resultados = []
+    for tipo, compressao in configuracoes:
+        inicio = time.perf_counter()
+        indice, config = criar_indice_faiss(base, tipo, compressao)
+        construcao = time.perf_counter() - inicio
+        resultados.append({'fabrica': config['fabrica'], 'construcao_s': construcao, **medir(indice, consultas, k, verdade)})
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos tipos de índice FAISS do RAG.")
+    parser.add_argument("--vetores", type=int, default=20_000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--dimensao", type=int, default=384)
+    parser.add_argument("--k", type=int, default=25)
+    parser.add_argument("--configuracoes", nargs="+", default=None,
+                        help="Lista tipo[:compressao], ex: flat ivf:sq8 hnsw")
+    args = parser.parse_args()
+
+    configuracoes = CONFIGURACOES
+    if args.configuracoes:
+        configuracoes = [(c.split(":")[0], c.split(":")[1] if ":" in c else None) for c in args.configuracoes]
+
+    print(f"{args.vetores} vetores de dimensão {args.dimensao}, {args.consultas} consultas, k={args.k}")
+    print(f"{'índice':<18} {'construção (s)':>15} {'recall@k':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'memória (MB)':>13}")
+    for linha in executar(args.vetores, args.consultas, args.dimensao, args.k, configuracoes):
+        print(f"{linha['fabrica']:<18} {linha['construcao_s']:>15.2f} {linha['recall']:>9.3f} "
+              f"{linha['latencia_p50_ms']:>9.3f} {linha['latencia_p95_ms']:>9.3f} {linha['memoria_mb']:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# bench_llm.py
+# Mede a latência de cauda das chamadas ao LLM com e sem o roteador de provedores
+# (prazo, failover, hedging e disjuntores), usando os provedores falsos de benchmarks/stub_llm.py.
+#
+# Uso: python -m benchmarks.bench_llm [--chamadas 300] [--concorrencia 4] [--cenarios cauda_lenta fora_do_ar]
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.stub_llm import LLMFalso
+from src.rag.roteador_llm import Disjuntor, ProvedorLLM, RoteadorLLM
+from src.utils import cache
+
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+# Provedor principal degradado de formas diferentes; o secundário é mais lento, mas estável.
+CENARIOS = {
+    'saudavel': {'principal': {'latencia_s': 0.05}, 'secundario': {'latencia_s': 0.08}},
+    'cauda_lenta': {'principal': {'latencia_s': 0.05, 'prob_cauda': 0.04, 'latencia_cauda_s': 1.5}, 'secundario': {'latencia_s': 0.08}},
+    'erros': {'principal': {'latencia_s': 0.05, 'taxa_erro': 0.2}, 'secundario': {'latencia_s': 0.08}},
+    'fora_do_ar': {'principal': {'latencia_s': 0.05, 'fora_do_ar': True}, 'secundario': {'latencia_s': 0.08}}
+}
+
+def _criar_roteador(cenario: str, usar_roteador: bool, prazo_s: float) -> RoteadorLLM:
+    """Sem o roteador, equivale ao comportamento anterior: só o provedor principal, sem hedge."""
+    config = CENARIOS[cenario]
+    provedores = [ProvedorLLM("principal", LLMFalso("principal", semente=1, **config['principal']),
+                              atraso_padrao_s=0.2, amostras_minimas=10)]
+    if not usar_roteador:
+        provedores[0].disjuntor = Disjuntor(limite_falhas=10**9)
+        return RoteadorLLM(provedores, prazo_s=prazo_s, hedging=False)
+    provedores.append(ProvedorLLM("secundario", LLMFalso("secundario", semente=2, **config['secundario']),
+                                  atraso_padrao_s=0.2, amostras_minimas=10))
+    return RoteadorLLM(provedores, prazo_s=prazo_s, hedging=True)
+
+def medir(cenario: str, usar_roteador: bool, chamadas: int, concorrencia: int, prazo_s: float) -> Dict[str, Any]:
+    roteador = _criar_roteador(cenario, usar_roteador, prazo_s)
+    latencias: List[float] = []
+    erros = 0
+
+    def _chamar(_):
+        inicio = time.perf_counter()
+        try:
+            roteador.invoke("pergunta")
+            return time.perf_counter() - inicio, False
+        except Exception:
+            return time.perf_counter() - inicio, True
+
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        for latencia, falhou in executor.map(_chamar, range(chamadas)):
+            latencias.append(latencia)
+            erros += falhou
+    saude = roteador.saude()
+    roteador.encerrar()
+    return {
+        'p50_s': float(np.percentile(latencias, 50)),
+        'p95_s': float(np.percentile(latencias, 95)),
+        'p99_s': float(np.percentile(latencias, 99)),
+        'max_s': max(latencias),
+        'taxa_erro': erros / chamadas,
+        **{f"roteador_{chave}": valor for chave, valor in saude['roteador'].items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do roteador de provedores de LLM.")
+    parser.add_argument("--chamadas", type=int, default=300)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--prazo", type=float, default=2.0, help="Prazo (s) de cada chamada.")
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: benchmarks/resultados/llm_<data>.json).")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    metricas: Dict[str, float] = {}
+    for cenario in args.cenarios:
+        for modo, usar_roteador in (("direto", False), ("roteador", True)):
+            print(f"Cenário '{cenario}', {modo}...")
+            for medida, valor in medir(cenario, usar_roteador, args.chamadas, args.concorrencia, args.prazo).items():
+                metricas[f"{cenario}.{modo}.{medida}"] = valor
+
+    resultado = {
+        'gerado_em': datetime.now().isoformat(timespec="seconds"),
+        'parametros': {'chamadas': args.chamadas, 'concorrencia': args.concorrencia, 'prazo_s': args.prazo,
+                       'cenarios': {c: CENARIOS[c] for c in args.cenarios}},
+        'metricas': metricas
+    }
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"llm_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    cache.salvar_cache_json(resultado, saida, compacto=False)
+
+    print(f"\n{'métrica':<44} {'valor':>10}")
+    for nome, valor in metricas.items():
+        print(f"{nome:<44} {valor:>10.4f}" if isinstance(valor, float) else f"{nome:<44} {valor!s:>10}")
+    print(f"\nResultados salvos em: {saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# stub_llm.py
+# Provedores de LLM falsos, para testar o roteador (prazo, hedging e disjuntores) sem rede.
+
+import random
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+class LLMFalso:
+    """
+    Imita um ChatGroq/ChatOpenAI: `invoke(prompt)` dorme a latência sorteada e devolve
+    um AIMessage, ou levanta um erro com probabilidade `taxa_erro`.
+
+    A latência segue a distribuição base (`latencia_s` ± 20%) e, com probabilidade
+    `prob_cauda`, vai para a cauda (`latencia_cauda_s`), como um provedor degradado.
+    `fora_do_ar` faz todas as chamadas falharem (pode ser alterado durante o teste).
+    `stream(prompt)` entrega a mesma resposta em pedaços: a latência sorteada vale até o
+    primeiro pedaço, e cada pedaço seguinte leva `latencia_token_s`.
+
+    Uso:
+        roteador = RoteadorLLM([ProvedorLLM("a", LLMFalso("a", 0.05, prob_cauda=0.1)), ProvedorLLM("b", LLMFalso("b", 0.08))])
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        latencia_s: float = 0.05,
+        latencia_cauda_s: float = 1.0,
+        prob_cauda: float = 0.0,
+        taxa_erro: float = 0.0,
+        fora_do_ar: bool = False,
+        latencia_token_s: float = 0.0,
+        tokens_resposta: int = 20,
+        semente: Optional[int] = 42
+    ):
+        self.nome = nome
+        self.latencia_s = latencia_s
+        self.latencia_cauda_s = latencia_cauda_s
+        self.prob_cauda = prob_cauda
+        self.taxa_erro = taxa_erro
+        self.fora_do_ar = fora_do_ar
+        self.latencia_token_s = latencia_token_s
+        self.tokens_resposta = tokens_resposta
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self.chamadas = 0
+
+    def _aguardar_resposta(self) -> None:
+        """Dorme a latência sorteada (até a resposta, ou até o primeiro pedaço) e sorteia os erros."""
+        with self._trava:
+            self.chamadas += 1
+            sorteio_erro = self._aleatorio.random()
+            sorteio_cauda = self._aleatorio.random()
+            variacao = self._aleatorio.uniform(0.8, 1.2)
+        if self.fora_do_ar:
+            time.sleep(self.latencia_s * 0.1)
+            raise ConnectionError(f"{self.nome} fora do ar")
+        latencia = self.latencia_cauda_s if sorteio_cauda < self.prob_cauda else self.latencia_s * variacao
+        time.sleep(latencia)
+        if sorteio_erro < self.taxa_erro:
+            raise RuntimeError(f"{self.nome}: erro 500 simulado")
+
+    def invoke(self, prompt: Any) -> AIMessage:
+        self._aguardar_resposta()
+        time.sleep(self.latencia_token_s * (self.tokens_resposta - 1))
+        return AIMessage(content=" ".join(self._tokens()))
+
+    def stream(self, prompt: Any) -> Iterator[AIMessageChunk]:
+        self._aguardar_resposta()
+        for i, token in enumerate(self._tokens()):
+            if i:
+                time.sleep(self.latencia_token_s)
+            yield AIMessageChunk(content=token if i == 0 else f" {token}")
+
+    def _tokens(self) -> list:
+        return [f"Resposta de {self.nome}"] + [f"t{i}" for i in range(1, self.tokens_resposta)]
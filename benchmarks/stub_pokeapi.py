@@ -0,0 +1,159 @@
+# stub_pokeapi.py
+# Servidor HTTP local que imita a PokeAPI, para medir a extração sem depender da rede.
+#
+# Uso direto: python -m benchmarks.stub_pokeapi [--porta 8099] [--latencia-ms 20] [--taxa-erro 0.02] [--limite-rps 200]
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+from src.etl.dados_sinteticos import gerar_pokemon_sinteticos
+
+_ROTA_POKEMON = re.compile(r"^/api/v2/pokemon/(\d+)/?$")
+
+class ServidorPokeAPIFalso:
+    """
+    Serve /api/v2/pokemon/{id}/ com registros sintéticos no formato da PokeAPI.
+
+    Latência, erros 5xx e limitação de taxa (429 com Retry-After) são configuráveis,
+    para reproduzir as condições da API real de forma determinística.
+
+    Uso:
+        with ServidorPokeAPIFalso(quantidade=500, latencia_s=0.02) as servidor:
+            extractor.URL_API = servidor.url_pokemon
+    """
+
+    def __init__(
+        self,
+        quantidade: int,
+        latencia_s: float = 0.0,
+        taxa_erro: float = 0.0,
+        limite_rps: Optional[float] = None,
+        retry_after_s: float = 0.5,
+        semente: int = 42,
+        porta: int = 0
+    ):
+        self.latencia_s = latencia_s
+        self.taxa_erro = taxa_erro
+        self.limite_rps = limite_rps
+        self.retry_after_s = retry_after_s
+        self._respostas: Dict[int, bytes] = {
+            p['id']: json.dumps(p).encode("utf-8") for p in gerar_pokemon_sinteticos(quantidade, semente)
+        }
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self._fichas = float(limite_rps or 0)
+        self._ultima_recarga = time.monotonic()
+        self.contadores = {'requisicoes': 0, 'sucessos': 0, 'erros': 0, 'limitadas': 0, 'nao_encontradas': 0}
+        self.chegadas: List[Tuple[float, int]] = []  # (time.monotonic() da chegada, status) de cada requisição
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_handler())
+        self._servidor.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url_pokemon(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_port}/api/v2/pokemon/"
+
+    def _consumir_ficha(self) -> bool:
+        """Balde de fichas: no máximo `limite_rps` respostas por segundo, com rajada de 1s."""
+        if not self.limite_rps:
+            return True
+        agora = time.monotonic()
+        self._fichas = min(self._fichas + (agora - self._ultima_recarga) * self.limite_rps, self.limite_rps)
+        self._ultima_recarga = agora
+        if self._fichas < 1:
+            return False
+        self._fichas -= 1
+        return True
+
+    def _decidir(self, pokemon_id: int):
+        """Sorteia o resultado da requisição: (status, corpo, atraso)."""
+        with self._trava:
+            self.contadores['requisicoes'] += 1
+            if not self._consumir_ficha():
+                self.contadores['limitadas'] += 1
+                return 429, None, 0.0
+            atraso = self.latencia_s * self._aleatorio.uniform(0.5, 1.5)
+            if self._aleatorio.random() < self.taxa_erro:
+                self.contadores['erros'] += 1
+                return 503, None, atraso
+            corpo = self._respostas.get(pokemon_id)
+            if corpo is None:
+                self.contadores['nao_encontradas'] += 1
+                return 404, None, atraso
+            self.contadores['sucessos'] += 1
+            return 200, corpo, atraso
+
+    def _criar_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                rota = _ROTA_POKEMON.match(self.path)
+                if not rota:
+                    self._responder(404, None)
+                    return
+                chegada = time.monotonic()
+                status, corpo, atraso = servidor._decidir(int(rota.group(1)))
+                servidor.chegadas.append((chegada, status))
+                if atraso:
+                    time.sleep(atraso)
+                self._responder(status, corpo)
+
+            def _responder(self, status: int, corpo: Optional[bytes]):
+                corpo = corpo or b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                if status == 429:
+                    self.send_header("Retry-After", f"{servidor.retry_after_s:g}")
+                self.end_headers()
+                self.wfile.write(corpo)
+
+        return Handler
+
+    def iniciar(self) -> "ServidorPokeAPIFalso":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self) -> "ServidorPokeAPIFalso":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
+
+def main():
+    parser = argparse.ArgumentParser(description="PokeAPI local com dados sintéticos.")
+    parser.add_argument("--porta", type=int, default=8099)
+    parser.add_argument("--quantidade", type=int, default=1000)
+    parser.add_argument("--latencia-ms", type=float, default=20.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    parser.add_argument("--limite-rps", type=float, default=None)
+    args = parser.parse_args()
+
+    servidor = ServidorPokeAPIFalso(
+        args.quantidade, args.latencia_ms / 1000, args.taxa_erro, args.limite_rps, porta=args.porta
+    )
+    print(f"PokeAPI local em {servidor.url_pokemon} (Ctrl+C para encerrar)")
+    try:
+        servidor._servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+if __name__ == "__main__":
+    main()
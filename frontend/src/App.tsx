@@ -162,8 +162,13 @@ function App() {
     setChatHistory((prev) => [...prev, { sender: 'user', text: message }]);
     setMessage('');
 
+    // Replaces the text of the last (streaming) AI message
+    const updateLastAiMessage = (text: string) =>
+      setChatHistory((prev) => [...prev.slice(0, -1), { sender: 'ai', text }]);
+
     try {
-      const response = await fetch(`${API_BASE_URL}/chat`, {
+      // Server-Sent Events: tokens are shown as soon as the LLM produces them
+      const response = await fetch(`${API_BASE_URL}/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -171,13 +176,32 @@ function App() {
         body: JSON.stringify({ pergunta: message }),
       });
 
-      if (response.ok) {
-        const data = await response.json();
-        // Assuming the API returns the AI's response directly
-        if (data.resposta) {
-          setChatHistory((prev) => [...prev, { sender: 'ai', text: data.resposta }]);
+      if (response.ok && response.body) {
+        setChatHistory((prev) => [...prev, { sender: 'ai', text: '' }]);
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let answer = '';
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const events = buffer.split('\n\n');
+          buffer = events.pop() ?? '';
+          for (const event of events) {
+            const type = event.match(/^event: (.*)$/m)?.[1];
+            const data = JSON.parse(event.match(/^data: (.*)$/m)?.[1] ?? '{}');
+            if (type === 'token') {
+              answer += data.conteudo;
+              updateLastAiMessage(answer);
+            } else if (type === 'fim') {
+              updateLastAiMessage(data.resposta);
+            } else if (type === 'erro') {
+              updateLastAiMessage(`Erro: ${data.erro}`);
+            }
+          }
         }
-        await fetchChatData(); // Update chat data
+        await fetchChatData(); // Structured data is saved once the stream completes
       } else {
         const errorData = await response.json();
         setChatHistory((prev) => [...prev, { sender: 'ai', text: `Erro: ${errorData.detail || 'Ocorreu um erro.'}` }]);
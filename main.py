@@ -1,20 +1,37 @@
 import argparse
 import os
-import pandas as pd
 from dotenv import load_dotenv
 import uvicorn
 from api import app as fastapi_app # Importa a instância do FastAPI
 
-from src.etl.pipeline import executar_pipeline
+from src.etl.pipeline import executar_pipeline, ETAPAS_PIPELINE
+from src.etl.sharding import extrair_shard, mesclar_shards, extrair_em_paralelo
+from src.etl.dados_sinteticos import salvar_pokemon_sinteticos
+from src.utils.logger import configurar_logs
+from src.utils.perfilador import Perfilador
+from src.utils.armazem_artefatos import obter_armazem
+from src.config.settings import (
+    QUANTIDADE_POKEMON,
+    PROCESSOS_EXTRACAO,
+    REVALIDAR_CACHE,
+    STALE_WHILE_REVALIDATE,
+    INDEXACAO_PARALELA,
+    SEMENTE_DADOS_SINTETICOS,
+    CAMINHO_DADOS_SINTETICOS,
+    STREAMING_CHAT,
+    DIRETORIO_DADOS_CHAT,
+    DIRETORIO_GRAFICOS_CHAT,
+    DIRETORIO_HISTORICO_CHAT
+)
 from src.rag_builder import inicializar_rag
-from src.rag.rag_core import responder_pergunta_rag
+from src.rag.rag_core import responder_pergunta_rag, responder_pergunta_rag_stream, responder_perguntas_em_lote
 from src.rag.chat_history import limpar_contexto
-from src.etl.reporter import gerar_grafico_automatico
+from src.etl.servico_graficos import carregar_dados_grafico, gerar_grafico_em_cache
 
 def handle_plot_command(command: str):
     partes = command.split(maxsplit=2) # Divide em no máximo 3 partes: /plot, caminho, o_que_plotar
     if len(partes) < 2:
-        print("Uso incorreto. Forneça o caminho do arquivo e o que deve ser plotado. Ex: /plot chat_outputs/dados/arquivo.csv diferenca do hp")
+        print("Uso incorreto. Forneça o caminho do arquivo e o que deve ser plotado. Ex: /plot chat_outputs/dados/padrao/arquivo.csv diferenca do hp")
         return
 
     caminho_arquivo = partes[1]
@@ -25,27 +42,31 @@ def handle_plot_command(command: str):
         return
 
     try:
-        if caminho_arquivo.endswith('.csv'):
-            dados = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8')
-        elif caminho_arquivo.endswith('.json'):
-            with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-                import json
-                dados = json.load(f)
-        else:
-            print("Erro: Formato de arquivo não suportado. Use .csv ou .json")
-            return
-        
+        dados = carregar_dados_grafico(caminho_arquivo)
         # Passa o_que_plotar para a função de geração de gráfico
-        caminho_grafico = gerar_grafico_automatico(dados, especificacao_plot=o_que_plotar)
+        caminho_grafico, em_cache = gerar_grafico_em_cache(dados, especificacao_plot=o_que_plotar)
         if caminho_grafico:
-            print(f"[SUCESSO] Gráfico gerado e salvo em: {caminho_grafico}")
+            print(f"[SUCESSO] Gráfico {'reaproveitado do cache' if em_cache else 'gerado e salvo'} em: {caminho_grafico}")
         else:
             print("[INFO] Não foi possível gerar o gráfico. Verifique a especificação ou o arquivo.")
+    except ValueError as e:
+        print(f"Erro: {e}")
     except Exception as e:
         print(f"Erro ao gerar gráfico: {e}")
 
-def chat_interativo():
-    """Inicia um chat interativo com a IA no terminal."""
+def responder_em_streaming(pergunta: str, vetorstore):
+    """Imprime a resposta à medida que os tokens chegam; os dados estruturados são salvos no final."""
+    print("\nResposta:\n")
+    for evento in responder_pergunta_rag_stream(pergunta, vetorstore):
+        if evento['tipo'] == "token":
+            print(evento['conteudo'], end="", flush=True)
+        elif evento['tipo'] == "fim":
+            print()
+        else:
+            print(f"\nErro: {evento['erro']}")
+
+def chat_interativo(perfilar: bool = False):
+    """Inicia um chat interativo com a IA no terminal (com `perfilar`, grava o perfil de cada pergunta)."""
     print("Bem-vindo ao chat interativo com a IA Pokémon! Digite 'sair' para encerrar.")
     print("Comandos especiais:")
     print("  /limpar - Limpa o histórico de conversas e dados estruturados")
@@ -57,6 +78,11 @@ def chat_interativo():
         print("Não foi possível iniciar o chat. Encerrando.")
         return
 
+    for diretorio in (DIRETORIO_DADOS_CHAT, DIRETORIO_GRAFICOS_CHAT, DIRETORIO_HISTORICO_CHAT):
+        obter_armazem(diretorio).reconciliar()  # Acerta o índice com o disco e aplica os limites
+
+    perfilador = Perfilador(ativo=perfilar, rotulo="chat")
+    perguntas_feitas = 0
     while True:
         pergunta = input("Você: ")
         comando = pergunta.strip().lower()
@@ -73,7 +99,38 @@ def chat_interativo():
             print(f"Comando não reconhecido: {pergunta}")
             print("Comandos disponíveis: /limpar, /plot, sair")
         else:
-            responder_pergunta_rag(pergunta, vetorstore)
+            perguntas_feitas += 1
+            with perfilador.secao(f"pergunta_{perguntas_feitas}"):
+                if STREAMING_CHAT:
+                    responder_em_streaming(pergunta, vetorstore)
+                else:
+                    responder_pergunta_rag(pergunta, vetorstore)
+            if perfilador.diretorio:
+                print(f"[INFO] Perfil da pergunta salvo em: {perfilador.diretorio}")
+
+def chat_em_lote(caminho_arquivo: str):
+    """Responde as perguntas de um arquivo (uma por linha), imprimindo cada resposta assim que fica pronta."""
+    if not caminho_arquivo or not os.path.exists(caminho_arquivo):
+        print(f"Erro: Arquivo de perguntas não encontrado em '{caminho_arquivo}'")
+        return
+    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+        perguntas = [linha.strip() for linha in f if linha.strip()]
+    if not perguntas:
+        print("Nenhuma pergunta encontrada no arquivo.")
+        return
+
+    vetorstore = inicializar_rag()
+    if not vetorstore:
+        print("Não foi possível iniciar o chat. Encerrando.")
+        return
+
+    print(f"Respondendo {len(perguntas)} perguntas em lote...")
+    for resultado in responder_perguntas_em_lote(perguntas, vetorstore):
+        print(f"\n[{resultado['indice'] + 1}/{len(perguntas)}] Pergunta: {resultado['pergunta']}")
+        if resultado['erro']:
+            print(f"Erro: {resultado['erro']}")
+        else:
+            print(f"Resposta:\n{resultado['resposta']}")
 
 def main():
     """Função principal para executar o CLI."""
@@ -84,18 +141,68 @@ def main():
     )
     parser.add_argument(
         "acao",
-        choices=["pipeline", "chat", "serve_api"],
-        help="A ação a ser executada: 'pipeline' para processar os dados, 'chat' para conversar com a IA, 'serve_api' para iniciar o servidor FastAPI."
+        choices=["pipeline", "chat", "chat_lote", "serve_api", "extrair_shard", "mesclar_shards", "extrair_paralelo", "gerar_sinteticos"],
+        help="A ação a ser executada: 'pipeline' para processar os dados, 'chat' para conversar com a IA, 'serve_api' para iniciar o servidor FastAPI. "
+             "'chat_lote' responde as perguntas de um arquivo. 'extrair_shard', 'mesclar_shards' e 'extrair_paralelo' executam a extração particionada. "
+             "'gerar_sinteticos' grava um dataset sintético para testes de carga."
     )
+    parser.add_argument("--arquivo", help="Arquivo de perguntas (uma por linha) para 'chat_lote'.")
+    parser.add_argument("--shard", type=int, default=0, help="Índice do shard (0 a total-shards - 1) para 'extrair_shard'.")
+    parser.add_argument("--total-shards", type=int, default=None, help="Número total de shards da partição (obrigatório para 'extrair_shard').")
+    parser.add_argument("--recurso", default="pokemon", help="Endpoint da PokeAPI a extrair (ex: pokemon, pokemon-species).")
+    parser.add_argument("--quantidade", type=int, default=QUANTIDADE_POKEMON, help="Extrai as IDs de 1 até este valor.")
+    parser.add_argument("--revalidar-cache", action="store_true", help="Revalida o cache com GETs condicionais (ETag/Last-Modified) antes do pipeline.")
+    parser.add_argument("--stale-while-revalidate", action="store_true", help="Inicia o pipeline com o cache atual e o revalida em segundo plano.")
+    parser.add_argument("--semente", type=int, default=SEMENTE_DADOS_SINTETICOS, help="Semente do gerador para 'gerar_sinteticos'.")
+    parser.add_argument("--saida", default=CAMINHO_DADOS_SINTETICOS, help="Arquivo de destino para 'gerar_sinteticos' (.gz/.zst comprime).")
+    parser.add_argument("--forcar", "--force", action="store_true", help="Executa todas as etapas do pipeline, mesmo sem mudanças nos dados.")
+    parser.add_argument("--invalidar", nargs="+", choices=ETAPAS_PIPELINE, default=None, help="Etapas do pipeline a refazer mesmo sem mudanças.")
+    parser.add_argument("--indexacao-paralela", action="store_true", help="Calcula os embeddings do índice em shards, em vários processos (retomável).")
+    parser.add_argument("--perfilar", "--profile", action="store_true", help="Grava perfis de CPU, pilhas e memória de cada etapa do 'pipeline' ou pergunta do 'chat'.")
+    parser.add_argument("--processos", type=int, default=PROCESSOS_EXTRACAO, help="Processos locais para 'extrair_paralelo'.")
 
     args = parser.parse_args()
 
     if args.acao == "pipeline":
         print("Executando o pipeline de ETL...")
-        executar_pipeline()
+        executar_pipeline(
+            revalidar_cache=args.revalidar_cache or REVALIDAR_CACHE,
+            stale_while_revalidate=args.stale_while_revalidate or STALE_WHILE_REVALIDATE,
+            forcar=args.forcar,
+            invalidar=args.invalidar,
+            indexacao_paralela=args.indexacao_paralela or INDEXACAO_PARALELA,
+            perfilar=args.perfilar
+        )
         print("Pipeline de ETL concluído.")
     elif args.acao == "chat":
-        chat_interativo()
+        chat_interativo(perfilar=args.perfilar)
+    elif args.acao == "chat_lote":
+        chat_em_lote(args.arquivo)
+    elif args.acao == "extrair_shard":
+        if args.total_shards is None:
+            parser.error("'extrair_shard' requer --total-shards.")
+        configurar_logs()
+        caminho = extrair_shard(args.shard, args.total_shards, args.quantidade, args.recurso)
+        print(f"Shard {args.shard} salvo em: {caminho}")
+    elif args.acao == "mesclar_shards":
+        configurar_logs()
+        try:
+            dados, relatorio = mesclar_shards(args.recurso, args.quantidade, total_shards=args.total_shards)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            return
+        print(
+            f"{len(dados)} registros mesclados. Faltando: {len(relatorio['ids_faltando'])}, "
+            f"duplicados: {len(relatorio['ids_duplicados'])}, ignorados (fora das IDs esperadas): {len(relatorio['ids_inesperados'])}."
+        )
+    elif args.acao == "extrair_paralelo":
+        configurar_logs()
+        dados, relatorio = extrair_em_paralelo(args.quantidade, args.processos, args.recurso)
+        print(f"{len(dados)} registros extraídos em {args.processos} processos. Faltando: {len(relatorio['ids_faltando'])}.")
+    elif args.acao == "gerar_sinteticos":
+        configurar_logs()
+        total = salvar_pokemon_sinteticos(args.quantidade, args.saida, args.semente)
+        print(f"{total} Pokémon sintéticos salvos em: {args.saida}")
     elif args.acao == "serve_api":
         print("Iniciando servidor FastAPI...")
         uvicorn.run(fastapi_app, host="0.0.0.0", port=8001)
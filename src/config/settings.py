@@ -3,24 +3,142 @@ Arquivo de configuração para centralizar constantes e parâmetros.
 """
 
 # Configurações da API
-URL_API = "https://pokeapi.co/api/v2/pokemon/"
+URL_BASE_API = "https://pokeapi.co/api/v2/"
+URL_API = f"{URL_BASE_API}pokemon/"
 QUANTIDADE_POKEMON = 100  # Número de Pokémon a serem buscados
 TIMEOUT_REQUEST = 30  # Tempo máximo de espera para uma requisição
 
 # Configurações de Cache
 USAR_CACHE = True
 CAMINHO_CACHE = "data/pokemon_cache.json"
+CAMINHO_CACHE_VALIDADORES = "data/pokemon_cache_validadores.json"  # ETag/Last-Modified por ID
+COMPRESSAO_CACHE = None  # None, "gzip" ou "zstd" (requer o pacote zstandard)
+REVALIDAR_CACHE = False  # Envia GETs condicionais e reescreve apenas os registros alterados
+STALE_WHILE_REVALIDATE = False  # Usa o cache na hora e revalida em segundo plano
+CAMINHO_CACHE_RECURSOS = "data/recursos_cache.json"  # Memo por URL dos recursos relacionados
+IDADE_MAXIMA_MEMO_RECURSOS_S = 7 * 24 * 3600  # Depois disso, o recurso do memo é revalidado com um GET condicional (None = sem limite)
+INVALIDAR_MEMO_RECURSOS = False  # Ignora o memo salvo e baixa todos os recursos de novo
+
+# Configurações de Extração Particionada (Shards)
+DIRETORIO_SHARDS = "data/shards"  # Caches parciais de cada shard
+PROCESSOS_EXTRACAO = 4  # Processos locais no modo extrair_paralelo
 
 # Configurações de Dados de Exemplo
 USAR_DADOS_EXEMPLO = True
+SEMENTE_DADOS_SINTETICOS = 42  # Mesma semente, mesmos dados sintéticos
+CAMINHO_DADOS_SINTETICOS = "data/pokemon_sinteticos.json"
+
+# Configurações da Análise em Blocos
+TAMANHO_BLOCO_ANALISE = 10_000  # Registros transformados e agregados por vez
 
 # Configurações de Caminhos de Saída
 CAMINHO_LOG = "logs/pipeline.log"
 CAMINHO_GRAFICO_TIPOS = "data/grafico_tipos.png"
 CAMINHO_RELATORIO_CSV = "data/relatorio.csv"
+CAMINHO_RELATORIO_CONSOLIDADO = "data/relatorio_consolidado.txt"
+CAMINHO_ESTADO_PIPELINE = "data/estado_pipeline.json"  # Impressões digitais das etapas (execução incremental)
+
+# Configurações dos Gráficos do Chat
+DIRETORIO_DADOS_CHAT = "chat_outputs/dados"
+DIRETORIO_GRAFICOS_CHAT = "chat_outputs/graficos"
+DPI_GRAFICOS_CHAT = 300
+DPIS_PERMITIDOS_GRAFICOS = (72, 100, 150, 200, 300)  # Limita o custo de renderização pedido pela API
+PROCESSOS_GRAFICOS = 2  # Processos que renderizam gráficos para a API, fora do event loop
+
+# Configurações do Armazenamento do Chat (dados estruturados e gráficos em chat_outputs)
+SESSAO_PADRAO_CHAT = "padrao"  # Namespace de quem não informa a sessão (CLI e frontend)
+SESSAO_GRAFICOS_CHAT = "cache"  # Gráficos são endereçados pelo conteúdo e compartilhados entre sessões
+LIMITE_BYTES_ARTEFATOS_CHAT = 200 * 2**20  # Por diretório (dados e gráficos); acima disso, remove os menos usados
+LIMITE_ARQUIVOS_ARTEFATOS_CHAT = 500  # Por diretório
+IDADE_MAXIMA_ARTEFATOS_CHAT_S = 7 * 24 * 3600  # Artefatos criados há mais tempo que isso são removidos (None: sem limite)
+ARTEFATOS_NO_CONTEXTO = 5  # Dados estruturados mais recentes da sessão incluídos no prompt
+DIRETORIO_HISTORICO_CHAT = "chat_outputs/historico"  # Um historico.jsonl por sessão, no mesmo tipo de armazém
+ENTRADAS_HISTORICO_NO_CONTEXTO = 10  # Últimas perguntas e respostas da sessão incluídas no prompt
+ORCAMENTO_TOKENS_HISTORICO = 1000  # Tokens (estimados) do histórico no prompt; as entradas mais antigas saem primeiro
+ORCAMENTO_TOKENS_DADOS_ANTERIORES = 1000  # Tokens (estimados) dos dados estruturados anteriores no prompt
+LIMITE_BYTES_HISTORICO_SESSAO = 256 * 2**10  # Acima disso, o histórico da sessão é compactado
+ENTRADAS_MANTIDAS_HISTORICO = 100  # Entradas que ficam no histórico da sessão após a compactação
+
+# Configurações de Logs
+NIVEL_LOG = "INFO"
+NIVEIS_LOG_POR_MODULO = {  # Por arquivo do projeto (ex: "extractor") ou logger nomeado (ex: "urllib3")
+    "urllib3": "WARNING",
+    "httpx": "WARNING"
+}
+LOG_ASSINCRONO = True  # Escrita dos logs em uma thread separada (QueueHandler + QueueListener)
+LOG_FORMATO_JSON = False  # Uma linha JSON por registro no arquivo de log
+LOG_ROTACAO = "tamanho"  # "tamanho", "tempo" ou None
+LOG_TAMANHO_MAXIMO_MB = 10
+LOG_ROTACAO_QUANDO = "midnight"  # Intervalo da rotação por tempo (ver TimedRotatingFileHandler)
+LOG_ARQUIVOS_BACKUP = 5
+
+# Configurações de Profiling
+DIRETORIO_PERFIS = "logs/perfis"  # Uma pasta por sessão (pipeline, chat ou API) com os relatórios de cada seção
+PERFILAR_API = False  # Perfila cada requisição de chat da API (também pode ser ligado em POST /profiling)
+INTERVALO_AMOSTRAGEM_PERFIL_S = 0.005  # Intervalo entre amostras de pilha (stacks colapsadas para flame graphs)
+QUADROS_TRACEMALLOC = 1  # Quadros guardados por alocação; mais quadros mostram quem chamou, mas deixam a seção ~3x mais lenta
+TOP_PERFIL = 30  # Linhas nos relatórios de funções e de alocações
 
 # Configurações de Retentativas (Retry)
 RETENTATIVAS_CONEXAO = 3  # Número máximo de retentativas
 FATOR_BACKOFF = 0.5  # Espera entre retentativas (ex: 0.5s, 1s, 2s)
 
+# Configurações de Limitação de Taxa (Rate Limiting)
+CONCORRENCIA_INICIAL = 10  # Requisições simultâneas ao iniciar a extração
+CONCORRENCIA_MINIMA = 1
+CONCORRENCIA_MAXIMA = 20
+FATOR_REDUCAO_CONCORRENCIA = 0.5  # Redução multiplicativa a cada resposta 429
+ESPERA_PADRAO_429 = 1.0  # Espera (s) quando o 429 não traz Retry-After
+ESPERA_MAXIMA_RETRY_AFTER = 60.0  # Limite superior para o Retry-After informado
+MAX_REENFILEIRAMENTOS = 5  # Rodadas extras para IDs que falharam ou foram limitados
+
+# Configurações do Índice Vetorial (RAG)
+CAMINHO_INDICE_FAISS = "data/indice_faiss"
+TIPO_INDICE_FAISS = "flat"  # "flat", "ivf" ou "hnsw"
+COMPRESSAO_INDICE_FAISS = None  # None, "pq", "sq8" ou "fp16"
+GERACOES_INDICE_MANTIDAS = 3  # Gerações antigas preservadas para consultas ainda em andamento
+INTERVALO_VERIFICACAO_INDICE = 5.0  # Segundos entre verificações de nova geração na API
+USAR_MMAP_INDICE = True  # Mapeia o índice em memória em vez de copiá-lo para cada processo
+IVF_NPROBE = 8  # Listas do IVF visitadas por consulta
+HNSW_M = 32  # Vizinhos por nó do grafo HNSW
+HNSW_EF_SEARCH = 64  # Candidatos avaliados por consulta no HNSW
+PQ_SUBQUANTIZADORES = 48  # Deve dividir a dimensão do embedding (384 no all-MiniLM-L6-v2)
+MODELO_EMBEDDINGS = "all-MiniLM-L6-v2"
+
+# Configurações da Indexação Paralela (embeddings em shards)
+INDEXACAO_PARALELA = False  # Calcula os embeddings em um pool de processos, um shard por tarefa
+PROCESSOS_EMBEDDINGS = 4  # Cada processo carrega o modelo uma única vez
+TAMANHO_SHARD_EMBEDDINGS = 2000  # Documentos por shard; corpora menores são indexados no próprio processo
+DIRETORIO_SHARDS_EMBEDDINGS = "data/shards/embeddings"  # Vetores de cada shard (.npy), para retomar builds interrompidos
+
+# Configurações do Chat (RAG)
+K_RECUPERACAO = 25  # Documentos recuperados por pergunta (máximo, na recuperação adaptativa)
+RECUPERACAO_ADAPTATIVA = True  # k pelo tipo de pergunta e saltos de distância, MMR e orçamento de tokens
+K_CANDIDATOS = 40  # Vizinhos buscados no índice antes do corte adaptativo
+FATOR_AMPLIACAO_AGREGADA = 10  # Perguntas agregadas sem [RESUMO] entre os candidatos buscam K_CANDIDATOS x isso
+K_MINIMO = 3
+K_MAXIMO_POR_TIPO_PERGUNTA = {"especifica": 5, "agregada": 6, "geral": 12, "lista": K_RECUPERACAO}
+FATOR_SALTO_SCORE = 2.5  # Corta onde a distância salta mais que isso vezes o salto médio anterior
+LAMBDA_MMR = 0.7  # 1.0 = só relevância; menor = mais diversidade
+LIMIAR_DUPLICADO = 0.97  # Similaridade de cosseno a partir da qual um documento é descartado como duplicado
+ORCAMENTO_TOKENS_CONTEXTO = 1500  # Tokens (estimados) de documentos no prompt
+CONCORRENCIA_LLM_LOTE = 4  # Chamadas simultâneas ao LLM no chat em lote
+MAX_CONCORRENCIA_LLM_LOTE = 16  # Teto do 'max_concorrencia' pedido em /chat/batch
+MAX_PERGUNTAS_LOTE = 100  # Perguntas por requisição em /chat/batch
+STREAMING_CHAT = True  # O chat do terminal mostra a resposta à medida que os tokens chegam
+INCLUIR_DOCUMENTOS_AGREGADOS = True  # Indexa resumos por tipo, rankings e top-N junto das linhas do CSV
+TOP_N_DOCUMENTOS_AGREGADOS = 10
 
+# Configurações dos Provedores de LLM
+MODELO_GROQ = "llama3-8b-8192"
+MODELO_OPENAI = "gpt-3.5-turbo"
+PRAZO_LLM_S = 30.0  # Prazo total de uma chamada ao LLM, somando failover e hedging
+HEDGING_LLM = True  # Dispara o próximo provedor se o primeiro passar do seu p95 sem responder
+PERCENTIL_HEDGING = 95
+ATRASO_HEDGING_PADRAO_S = 3.0  # Atraso do hedge enquanto não há amostras de latência suficientes
+AMOSTRAS_MINIMAS_HEDGING = 20
+JANELA_LATENCIAS_LLM = 200  # Latências recentes guardadas por provedor
+FALHAS_ABRIR_DISJUNTOR = 3  # Falhas consecutivas que tiram o provedor de uso
+TEMPO_DISJUNTOR_ABERTO_S = 30.0  # Espera até uma chamada de teste ao provedor
+TRABALHADORES_ROTEADOR_LLM = 16  # Threads para as chamadas em andamento (inclui hedges)
+AQUECER_LLM = False  # Chamada curta ao LLM no aquecimento da API (abre conexões e mede latência; consome tokens)
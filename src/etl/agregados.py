@@ -0,0 +1,231 @@
+# agregados.py
+# Agregados parciais das análises, atualizáveis bloco a bloco e mescláveis entre blocos ou shards.
+
+import heapq
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.etl.transformer import transformar_dados_pokemon
+from src.etl.esquema import explodir_tipos
+from src.utils.cache import iterar_cache_json
+from src.config.settings import CAMINHO_CACHE, TAMANHO_BLOCO_ANALISE
+
+COLUNAS_STATS = ['HP', 'Ataque', 'Defesa']
+CATEGORIAS = {'Forte': 'fortes', 'Médio': 'medios', 'Fraco': 'fracos'}
+
+def _inteiro(valor: Any) -> Any:
+    """Converte escalares numpy para int/float do Python (somas exatas e serializáveis)."""
+    return valor.item() if hasattr(valor, 'item') else valor
+
+class ContagemTipos:
+    """Contagem de Pokémon por tipo (equivalente a contar_pokemon_por_tipo)."""
+
+    def __init__(self):
+        self.contagem: Counter = Counter()
+
+    def atualizar(self, bloco: pd.DataFrame) -> None:
+        tipos = explodir_tipos(bloco, colunas=[])['Tipos']
+        self.contagem.update({tipo: _inteiro(n) for tipo, n in tipos.value_counts().items() if n > 0})
+
+    def mesclar(self, outra: "ContagemTipos") -> None:
+        self.contagem.update(outra.contagem)
+
+    def resultado(self) -> Dict[str, int]:
+        """Contagens em ordem decrescente (empates em ordem alfabética)."""
+        return dict(sorted(self.contagem.items(), key=lambda item: (-item[1], item[0])))
+
+class MediasPorTipo:
+    """Somas e contagens de HP, Ataque e Defesa por tipo (equivalente a calcular_media_stats_por_tipo)."""
+
+    def __init__(self):
+        self.somas: Dict[str, Dict[str, Any]] = {}
+        self.contagens: Dict[str, Dict[str, int]] = {}
+
+    def atualizar(self, bloco: pd.DataFrame) -> None:
+        explodido = explodir_tipos(bloco, colunas=COLUNAS_STATS)
+        agrupado = explodido.groupby('Tipos', observed=True)[COLUNAS_STATS].agg(['sum', 'count'])
+        for tipo, linha in agrupado.iterrows():
+            somas = self.somas.setdefault(tipo, dict.fromkeys(COLUNAS_STATS, 0))
+            contagens = self.contagens.setdefault(tipo, dict.fromkeys(COLUNAS_STATS, 0))
+            for coluna in COLUNAS_STATS:
+                somas[coluna] += _inteiro(linha[(coluna, 'sum')])
+                contagens[coluna] += _inteiro(linha[(coluna, 'count')])
+
+    def mesclar(self, outra: "MediasPorTipo") -> None:
+        for tipo, somas in outra.somas.items():
+            proprias = self.somas.setdefault(tipo, dict.fromkeys(COLUNAS_STATS, 0))
+            contagens = self.contagens.setdefault(tipo, dict.fromkeys(COLUNAS_STATS, 0))
+            for coluna in COLUNAS_STATS:
+                proprias[coluna] += somas[coluna]
+                contagens[coluna] += outra.contagens[tipo][coluna]
+
+    def resultado(self) -> pd.DataFrame:
+        linhas = {
+            tipo: {
+                coluna: (self.somas[tipo][coluna] / self.contagens[tipo][coluna]) if self.contagens[tipo][coluna] else float('nan')
+                for coluna in COLUNAS_STATS
+            }
+            for tipo in sorted(self.somas)
+        }
+        tabela = pd.DataFrame.from_dict(linhas, orient='index', columns=COLUNAS_STATS).round(1)
+        tabela.index.name = 'Tipos'
+        return tabela
+
+class TopK:
+    """
+    Os k Pokémon de maior valor em uma coluna, com um heap limitado a k linhas
+    (equivalente a tabela.nlargest(k, coluna)). Empates ficam com a menor ID, que é a
+    primeira linha na ordem da tabela.
+    """
+
+    def __init__(self, k: int = 5, coluna: str = 'Experiencia_Base'):
+        self.k = k
+        self.coluna = coluna
+        self.heap: List[Tuple[Any, Any, Any, Dict[str, Any]]] = []
+        self.colunas: Optional[List[str]] = None
+
+    def _inserir(self, item: Tuple[Any, Any, Any, Dict[str, Any]]) -> None:
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, item)
+
+    def atualizar(self, bloco: pd.DataFrame) -> None:
+        self.colunas = self.colunas or list(bloco.columns)
+        # Só os k maiores do bloco podem entrar no top-k global.
+        for indice, linha in bloco.nlargest(self.k, self.coluna).iterrows():
+            registro = {c: _inteiro(v) for c, v in linha.items()}
+            self._inserir((_inteiro(linha[self.coluna]), -_inteiro(linha['ID']), indice, registro))
+
+    def mesclar(self, outro: "TopK") -> None:
+        self.colunas = self.colunas or outro.colunas
+        for item in outro.heap:
+            self._inserir(item)
+
+    def resultado(self) -> pd.DataFrame:
+        itens = sorted(self.heap, key=lambda item: item[:2], reverse=True)
+        return pd.DataFrame([item[3] for item in itens], index=[item[2] for item in itens], columns=self.colunas)
+
+class ResumoCategorias:
+    """Total, contagem por categoria e somas de stats (base de gerar_resumo_relatorio)."""
+
+    def __init__(self):
+        self.total = 0
+        self.categorias: Counter = Counter()
+        self.somas: Dict[str, Any] = dict.fromkeys(COLUNAS_STATS, 0)
+        self.contagens: Dict[str, int] = dict.fromkeys(COLUNAS_STATS, 0)
+
+    def atualizar(self, bloco: pd.DataFrame) -> None:
+        self.total += len(bloco)
+        self.categorias.update({c: _inteiro(n) for c, n in bloco['Categoria'].value_counts().items() if n > 0})
+        for coluna in COLUNAS_STATS:
+            self.somas[coluna] += _inteiro(bloco[coluna].sum())
+            self.contagens[coluna] += _inteiro(bloco[coluna].count())
+
+    def mesclar(self, outro: "ResumoCategorias") -> None:
+        self.total += outro.total
+        self.categorias.update(outro.categorias)
+        for coluna in COLUNAS_STATS:
+            self.somas[coluna] += outro.somas[coluna]
+            self.contagens[coluna] += outro.contagens[coluna]
+
+    def media(self, coluna: str) -> float:
+        return self.somas[coluna] / self.contagens[coluna] if self.contagens[coluna] else float('nan')
+
+class AgregadosPokemon:
+    """
+    Reúne os agregados das análises do pipeline. Cada bloco da tabela transformada é
+    processado uma vez e descartado, então a memória não depende do tamanho do dataset;
+    agregados de blocos ou shards diferentes podem ser mesclados em qualquer ordem.
+    """
+
+    def __init__(self, k_top: int = 5):
+        self.tipos = ContagemTipos()
+        self.medias = MediasPorTipo()
+        self.top = TopK(k_top)
+        self.categorias = ResumoCategorias()
+
+    def atualizar(self, bloco: pd.DataFrame) -> "AgregadosPokemon":
+        if not bloco.empty:
+            self.tipos.atualizar(bloco)
+            self.medias.atualizar(bloco)
+            self.top.atualizar(bloco)
+            self.categorias.atualizar(bloco)
+        return self
+
+    def mesclar(self, outro: "AgregadosPokemon") -> "AgregadosPokemon":
+        self.tipos.mesclar(outro.tipos)
+        self.medias.mesclar(outro.medias)
+        self.top.mesclar(outro.top)
+        self.categorias.mesclar(outro.categorias)
+        return self
+
+    def contagem_tipos(self) -> Dict[str, int]:
+        return self.tipos.resultado()
+
+    def media_stats_por_tipo(self) -> pd.DataFrame:
+        return self.medias.resultado()
+
+    def top_experiencia(self) -> pd.DataFrame:
+        return self.top.resultado()
+
+    def resumo(self) -> Dict[str, Any]:
+        """O mesmo dicionário de gerar_resumo_relatorio."""
+        resumo = {
+            'total_pokemon': self.categorias.total,
+            'tipos_unicos': len(self.tipos.contagem)
+        }
+        resumo.update({chave: self.categorias.categorias.get(categoria, 0) for categoria, chave in CATEGORIAS.items()})
+        resumo.update({
+            'hp_medio': self.categorias.media('HP'),
+            'ataque_medio': self.categorias.media('Ataque'),
+            'defesa_media': self.categorias.media('Defesa')
+        })
+        return resumo
+
+def iterar_blocos_transformados(registros: Iterable[Dict[str, Any]], tamanho_bloco: int = TAMANHO_BLOCO_ANALISE) -> Iterator[pd.DataFrame]:
+    """
+    Transforma registros brutos em blocos de até `tamanho_bloco` linhas.
+
+    Args:
+        registros (Iterable[Dict[str, Any]]): Registros da PokeAPI (ex: de iterar_cache_json).
+        tamanho_bloco (int): O número de registros por bloco.
+
+    Yields:
+        pd.DataFrame: Cada bloco transformado, com índices contínuos entre blocos.
+    """
+    bloco: List[Dict[str, Any]] = []
+    inicio = 0
+    for registro in registros:
+        bloco.append(registro)
+        if len(bloco) >= tamanho_bloco:
+            yield transformar_dados_pokemon(bloco).set_axis(range(inicio, inicio + len(bloco)))
+            inicio += len(bloco)
+            bloco = []
+    if bloco:
+        yield transformar_dados_pokemon(bloco).set_axis(range(inicio, inicio + len(bloco)))
+
+def agregar_em_blocos(blocos: Iterable[pd.DataFrame], k_top: int = 5) -> AgregadosPokemon:
+    """Atualiza um AgregadosPokemon com cada bloco da tabela (ex: pd.read_csv com chunksize)."""
+    agregados = AgregadosPokemon(k_top)
+    for bloco in blocos:
+        agregados.atualizar(bloco)
+    return agregados
+
+def analisar_cache_em_blocos(caminho_cache: str = CAMINHO_CACHE, tamanho_bloco: int = TAMANHO_BLOCO_ANALISE) -> AgregadosPokemon:
+    """
+    Calcula as análises lendo o cache em fluxo, sem carregar o dataset inteiro.
+
+    Args:
+        caminho_cache (str): O cache JSON (comprimido ou não) com a lista de Pokémon.
+        tamanho_bloco (int): O número de registros transformados por vez.
+
+    Returns:
+        AgregadosPokemon: Os agregados, com os mesmos resultados da análise em memória.
+    """
+    agregados = agregar_em_blocos(iterar_blocos_transformados(iterar_cache_json(caminho_cache), tamanho_bloco))
+    logging.info(f"Análise em blocos concluída: {agregados.categorias.total} Pokémon.")
+    return agregados
@@ -0,0 +1,196 @@
+# dados_sinteticos.py
+# Gerador determinístico de Pokémon sintéticos no formato da PokeAPI, para testes de carga.
+
+import itertools
+import logging
+import math
+import random
+from typing import List, Dict, Any, Iterator, Optional
+
+from src.utils.cache import salvar_cache_json_em_fluxo
+from src.config.settings import URL_BASE_API, QUANTIDADE_POKEMON, SEMENTE_DADOS_SINTETICOS
+
+# Frequência aproximada de cada tipo como primário e como secundário na Pokédex real.
+# 'flying' quase sempre aparece como segundo tipo; 'normal' e 'water' dominam o primário.
+PESOS_TIPO_PRIMARIO = {
+    'water': 13.0, 'normal': 11.0, 'grass': 9.5, 'bug': 8.0, 'psychic': 6.5, 'fire': 6.5,
+    'electric': 5.5, 'rock': 5.0, 'dark': 4.5, 'poison': 4.0, 'fighting': 4.0, 'ground': 4.0,
+    'dragon': 4.0, 'ghost': 3.5, 'steel': 3.5, 'ice': 3.5, 'fairy': 3.0, 'flying': 1.0
+}
+PESOS_TIPO_SECUNDARIO = {
+    'flying': 20.0, 'psychic': 6.0, 'ground': 6.0, 'fairy': 6.0, 'poison': 6.0, 'steel': 5.0,
+    'fighting': 5.0, 'dragon': 5.0, 'dark': 4.5, 'ghost': 4.0, 'water': 3.5, 'grass': 3.5,
+    'rock': 3.0, 'ice': 3.0, 'fire': 2.5, 'electric': 2.5, 'normal': 2.0, 'bug': 1.0
+}
+PROBABILIDADE_TIPO_DUPLO = 0.52
+
+NOMES_STATS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+# Multiplicadores por tipo sobre o peso de cada stat (hp, atk, def, sp.atk, sp.def, speed).
+VIES_STATS_POR_TIPO = {
+    'fighting': (1.0, 1.3, 0.95, 0.7, 0.9, 1.0),
+    'rock': (1.0, 1.15, 1.35, 0.8, 0.9, 0.75),
+    'steel': (0.9, 1.1, 1.4, 0.85, 1.05, 0.8),
+    'ground': (1.05, 1.2, 1.15, 0.8, 0.85, 0.9),
+    'psychic': (0.95, 0.8, 0.9, 1.35, 1.2, 1.05),
+    'fairy': (1.0, 0.8, 0.95, 1.2, 1.25, 0.9),
+    'ghost': (0.85, 0.95, 1.0, 1.2, 1.1, 1.0),
+    'electric': (0.9, 0.95, 0.85, 1.2, 0.95, 1.3),
+    'flying': (0.95, 1.05, 0.9, 0.95, 0.9, 1.25),
+    'dragon': (1.1, 1.2, 1.0, 1.1, 1.0, 1.05),
+    'normal': (1.25, 1.05, 0.9, 0.85, 0.9, 1.05),
+    'bug': (0.9, 1.05, 1.05, 0.85, 0.95, 0.95),
+    'ice': (1.05, 1.0, 0.95, 1.1, 1.0, 0.9),
+}
+# Distribuição do total de stats (média, desvio) e peso de cada estágio evolutivo.
+ESTAGIOS = (
+    ('basico', 0.45, 320.0, 45.0),
+    ('intermediario', 0.22, 410.0, 40.0),
+    ('final', 0.28, 510.0, 40.0),
+    ('lendario', 0.05, 620.0, 50.0),
+)
+SILABAS_NOME = (
+    'ba', 'be', 'bi', 'bo', 'bu', 'cha', 'chi', 'da', 'do', 'fa', 'fe', 'ga', 'go', 'ka', 'ki',
+    'ko', 'la', 'li', 'lo', 'ma', 'mi', 'mo', 'na', 'no', 'pa', 'pi', 'po', 'ra', 'ri', 'ro',
+    'sa', 'so', 'ta', 'to', 'va', 'vi', 'za', 'zo', 'xa', 'ru'
+)
+
+def _nome_sintetico(pokemon_id: int) -> str:
+    """Codifica a ID em sílabas (base len(SILABAS_NOME)), o que garante nomes únicos e pronunciáveis."""
+    silabas = []
+    valor = pokemon_id
+    while True:
+        valor, resto = divmod(valor, len(SILABAS_NOME))
+        silabas.append(SILABAS_NOME[resto])
+        if valor == 0:
+            break
+    nome = "".join(reversed(silabas))
+    return nome if len(silabas) > 1 else f"{nome}mon"
+
+def _acumular(pesos) -> List[float]:
+    return list(itertools.accumulate(pesos))
+
+# Pesos acumulados calculados uma vez: rng.choices com cum_weights evita refazer a soma a cada sorteio.
+_TIPOS_PRIMARIOS = list(PESOS_TIPO_PRIMARIO)
+_PESOS_PRIMARIOS_ACUMULADOS = _acumular(PESOS_TIPO_PRIMARIO.values())
+_SECUNDARIOS_POR_PRIMARIO = {
+    primario: (
+        [t for t in PESOS_TIPO_SECUNDARIO if t != primario],
+        _acumular(p for t, p in PESOS_TIPO_SECUNDARIO.items() if t != primario)
+    )
+    for primario in PESOS_TIPO_PRIMARIO
+}
+_PESOS_ESTAGIOS_ACUMULADOS = _acumular(e[1] for e in ESTAGIOS)
+_VIES_NEUTRO = (1.0,) * len(NOMES_STATS)
+
+def _sortear_tipos(rng: random.Random) -> List[str]:
+    primario = rng.choices(_TIPOS_PRIMARIOS, cum_weights=_PESOS_PRIMARIOS_ACUMULADOS)[0]
+    if rng.random() >= PROBABILIDADE_TIPO_DUPLO:
+        return [primario]
+    candidatos, pesos_acumulados = _SECUNDARIOS_POR_PRIMARIO[primario]
+    return [primario, rng.choices(candidatos, cum_weights=pesos_acumulados)[0]]
+
+def _sortear_stats(rng: random.Random, tipos: List[str], total: float) -> List[int]:
+    """Divide o total de stats entre os seis stats, com viés pelos tipos e ruído individual."""
+    pesos = []
+    for i in range(len(NOMES_STATS)):
+        peso = max(rng.gauss(1.0, 0.2), 0.4)
+        for tipo in tipos:
+            peso *= VIES_STATS_POR_TIPO.get(tipo, _VIES_NEUTRO)[i]
+        pesos.append(peso)
+    soma = sum(pesos)
+    return [min(max(round(total * peso / soma), 5), 255) for peso in pesos]
+
+def _montar_pokemon(rng: random.Random, pokemon_id: int) -> Dict[str, Any]:
+    estagio = rng.choices(ESTAGIOS, cum_weights=_PESOS_ESTAGIOS_ACUMULADOS)[0]
+    total_stats = min(max(rng.gauss(estagio[2], estagio[3]), 180.0), 720.0)
+    tipos = _sortear_tipos(rng)
+    stats = _sortear_stats(rng, tipos, total_stats)
+
+    # Na PokeAPI a experiência base acompanha o total de stats (~64 para 318, ~250 para 525).
+    experiencia_base = int(min(max(0.9 * sum(stats) - 222 + rng.gauss(0, 15), 36), 395))
+    altura = max(1, round(math.exp(rng.gauss(math.log(total_stats / 40), 0.45))))
+    peso = max(1, round(altura ** 2.4 * math.exp(rng.gauss(0.4, 0.6))))
+
+    # Cada registro tem as próprias listas e dicionários; nada é compartilhado entre registros.
+    return {
+        'id': pokemon_id,
+        'name': _nome_sintetico(pokemon_id),
+        'base_experience': experiencia_base,
+        'height': altura,
+        'weight': peso,
+        'order': pokemon_id,
+        'is_default': True,
+        'types': [
+            {'slot': slot, 'type': {'name': tipo, 'url': f"{URL_BASE_API}type/{tipo}/"}}
+            for slot, tipo in enumerate(tipos, start=1)
+        ],
+        'stats': [
+            {'base_stat': valor, 'effort': 0, 'stat': {'name': nome, 'url': f"{URL_BASE_API}stat/{nome}/"}}
+            for nome, valor in zip(NOMES_STATS, stats)
+        ]
+    }
+
+def iterar_pokemon_sinteticos(
+    quantidade: int = QUANTIDADE_POKEMON,
+    semente: Optional[int] = SEMENTE_DADOS_SINTETICOS,
+    id_inicial: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """
+    Gera Pokémon sintéticos um por vez, sem materializar a lista inteira.
+
+    A mesma semente produz sempre a mesma sequência, o que torna os testes de carga
+    reprodutíveis. Tipos seguem a frequência real de combinações e os stats seguem
+    distribuições por estágio evolutivo, com viés por tipo.
+
+    Args:
+        quantidade (int): O número de Pokémon a serem gerados.
+        semente (Optional[int]): A semente do gerador. None usa uma semente aleatória.
+        id_inicial (int): A ID do primeiro Pokémon gerado.
+
+    Yields:
+        Dict[str, Any]: Um Pokémon no formato da resposta de /pokemon/{id} da PokeAPI.
+    """
+    rng = random.Random(semente)
+    for pokemon_id in range(id_inicial, id_inicial + quantidade):
+        yield _montar_pokemon(rng, pokemon_id)
+
+def gerar_pokemon_sinteticos(
+    quantidade: int = QUANTIDADE_POKEMON,
+    semente: Optional[int] = SEMENTE_DADOS_SINTETICOS
+) -> List[Dict[str, Any]]:
+    """
+    Gera uma lista de Pokémon sintéticos.
+
+    Args:
+        quantidade (int): O número de Pokémon a serem gerados.
+        semente (Optional[int]): A semente do gerador.
+
+    Returns:
+        List[Dict[str, Any]]: Os Pokémon gerados, ordenados por ID.
+    """
+    dados = list(iterar_pokemon_sinteticos(quantidade, semente))
+    logging.info(f"Dados sintéticos gerados: {len(dados)} Pokémon (semente={semente})")
+    return dados
+
+def salvar_pokemon_sinteticos(
+    quantidade: int,
+    caminho: str,
+    semente: Optional[int] = SEMENTE_DADOS_SINTETICOS,
+    compressao: Optional[str] = None
+) -> int:
+    """
+    Gera Pokémon sintéticos direto para um arquivo JSON, sem mantê-los em memória.
+
+    O arquivo tem o mesmo formato do cache da extração e pode ser lido com
+    `carregar_cache_json` ou `iterar_cache_json`.
+
+    Args:
+        quantidade (int): O número de Pokémon a serem gerados.
+        caminho (str): O arquivo de destino.
+        semente (Optional[int]): A semente do gerador.
+        compressao (Optional[str]): 'gzip', 'zstd' ou None (inferida pela extensão).
+
+    Returns:
+        int: O número de Pokémon gravados.
+    """
+    return salvar_cache_json_em_fluxo(iterar_pokemon_sinteticos(quantidade, semente), caminho, compressao)
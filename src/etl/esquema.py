@@ -0,0 +1,148 @@
+# esquema.py
+# Esquema compacto da tabela de Pokémon: inteiros estreitos, categorias e tipos codificados por dicionário.
+
+import itertools
+import logging
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Todos os tipos da PokeAPI, na ordem dos IDs da API.
+TIPOS_POKEMON = (
+    'normal', 'fighting', 'flying', 'poison', 'ground', 'rock', 'bug', 'ghost', 'steel',
+    'fire', 'water', 'grass', 'electric', 'psychic', 'ice', 'dragon', 'dark', 'fairy',
+    'stellar', 'unknown'
+)
+CATEGORIAS_POKEMON = ('Fraco', 'Médio', 'Forte')
+
+# 'Tipos' continua sendo o texto "fire, flying" nos artefatos e na API, mas em memória é uma
+# categoria com todas as combinações possíveis (tipo primário, secundário): cada linha guarda
+# só um código int16, e o texto de cada combinação existe uma única vez.
+COMBINACOES_TIPOS = TIPOS_POKEMON + tuple(
+    f"{primario}, {secundario}" for primario, secundario in itertools.permutations(TIPOS_POKEMON, 2)
+)
+DTYPE_TIPOS = pd.CategoricalDtype(COMBINACOES_TIPOS)
+DTYPE_TIPO = pd.CategoricalDtype(TIPOS_POKEMON)
+DTYPE_CATEGORIA = pd.CategoricalDtype(CATEGORIAS_POKEMON, ordered=True)
+
+# Stats base da PokeAPI vão até 255 e a experiência base até ~650.
+ESQUEMA_POKEMON: Dict[str, Union[str, pd.CategoricalDtype]] = {
+    'ID': 'uint32',
+    'Nome': 'str',  # Com pyarrow instalado, o pandas guarda os textos em buffers do Arrow
+    'Tipos': DTYPE_TIPOS,
+    'Experiencia_Base': 'uint16',
+    'HP': 'uint8',
+    'Ataque': 'uint8',
+    'Defesa': 'uint8',
+    'Categoria': DTYPE_CATEGORIA
+}
+
+def _categorizar(serie: pd.Series, dtype: pd.CategoricalDtype) -> pd.Series:
+    """Converte para a categoria; valores fora dela são acrescentados (com aviso) em vez de virarem NaN."""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and serie.dtype == dtype:
+        return serie
+    presentes = serie.notna() & (serie != '')  # Texto vazio (ex: Pokémon sem tipos) vira ausente
+    textos = serie.astype(str).where(presentes)
+    novos = sorted(set(textos.dropna().unique()) - set(dtype.categories))
+    if novos:
+        logging.warning(f"Valores fora do esquema em '{serie.name}': {novos}. Acrescentados às categorias.")
+        dtype = pd.CategoricalDtype(list(dtype.categories) + novos, ordered=dtype.ordered)
+    return textos.astype(dtype)
+
+def _inteiro_estreito(serie: pd.Series, dtype: str) -> pd.Series:
+    """Converte para o inteiro do esquema; se algum valor não couber, mantém int64 (com aviso)."""
+    if serie.empty:
+        return serie.astype(dtype)
+    limites = np.iinfo(dtype)
+    if serie.isna().any() or serie.min() < limites.min or serie.max() > limites.max:
+        logging.warning(f"Coluna '{serie.name}' fora da faixa de {dtype} (ou com nulos); mantida sem compactar.")
+        return serie
+    return serie.astype(dtype)
+
+def aplicar_esquema(tabela: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica ESQUEMA_POKEMON às colunas presentes na tabela (as demais ficam como estão).
+
+    Args:
+        tabela (pd.DataFrame): A tabela de Pokémon (da transformação ou lida do CSV).
+
+    Returns:
+        pd.DataFrame: A mesma tabela com os tipos compactos.
+    """
+    colunas = {}
+    for coluna, dtype in ESQUEMA_POKEMON.items():
+        if coluna not in tabela.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            colunas[coluna] = _categorizar(tabela[coluna], dtype)
+        elif dtype.startswith(('int', 'uint')):
+            colunas[coluna] = _inteiro_estreito(tabela[coluna], dtype)
+        else:
+            colunas[coluna] = tabela[coluna].astype(dtype)
+    return tabela.assign(**colunas)
+
+def explodir_tipos(tabela: pd.DataFrame, colunas: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Uma linha por (Pokémon, tipo), com 'Tipos' categórico de um único tipo (DTYPE_TIPO) e o
+    índice original repetido. Equivale a tabela['Tipos'].str.split(', ') + explode, mas divide
+    só o texto de cada combinação (uma vez) e monta o resultado pelos códigos das linhas.
+
+    Args:
+        tabela (pd.DataFrame): A tabela de Pokémon.
+        colunas (Optional[List[str]]): Colunas a manter além de 'Tipos' (padrão: todas).
+    """
+    tipos = _categorizar(tabela['Tipos'], DTYPE_TIPOS)
+    combinacoes = pd.Series(tipos.cat.categories).str.split(', ', n=1, expand=True).reindex(columns=[0, 1])
+    dtype_tipo = DTYPE_TIPO
+    novos = sorted(set(combinacoes.stack().dropna()) - set(TIPOS_POKEMON))
+    if novos:
+        dtype_tipo = pd.CategoricalDtype(TIPOS_POKEMON + tuple(novos))
+    primario_por_combinacao = pd.Categorical(combinacoes[0], dtype=dtype_tipo).codes
+    secundario_por_combinacao = pd.Categorical(combinacoes[1], dtype=dtype_tipo).codes
+
+    codigos = tipos.cat.codes.to_numpy()
+    linhas = np.flatnonzero(codigos >= 0)  # Linhas sem tipo não geram nenhuma linha
+    primarios = primario_por_combinacao[codigos[linhas]]
+    secundarios = secundario_por_combinacao[codigos[linhas]]
+    com_secundario = secundarios >= 0
+
+    posicoes = np.concatenate([linhas, linhas[com_secundario]])
+    codigos_tipo = np.concatenate([primarios, secundarios[com_secundario]])
+    ordem = np.argsort(posicoes, kind='stable')  # Mesma ordem do explode: primário e depois secundário
+
+    base = tabela if colunas is None else tabela[[c for c in colunas if c != 'Tipos']]
+    explodido = base.iloc[posicoes[ordem]]
+    return explodido.assign(Tipos=pd.Categorical.from_codes(codigos_tipo[ordem], dtype=dtype_tipo))
+
+def ler_relatorio_csv(caminho_csv: str, chunksize: Optional[int] = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Lê o relatório CSV do pipeline já no esquema compacto (em blocos, se chunksize for informado).
+    Os textos são lidos como texto e só depois categorizados, para que valores fora do esquema
+    não virem NaN em silêncio.
+    """
+    leitura = pd.read_csv(
+        caminho_csv, sep=';', encoding='utf-8', chunksize=chunksize,
+        dtype={'Nome': 'str', 'Tipos': 'str', 'Categoria': 'str'}
+    )
+    if chunksize is None:
+        return aplicar_esquema(leitura)
+    return (aplicar_esquema(bloco) for bloco in leitura)
+
+def bytes_por_linha(tabela: pd.DataFrame) -> Dict[str, float]:
+    """Memória (deep) por linha de cada coluna, mais o total."""
+    if tabela.empty:
+        return {}
+    uso = tabela.memory_usage(deep=True, index=False) / len(tabela)
+    return {**{coluna: round(float(valor), 2) for coluna, valor in uso.items()}, 'total': round(float(uso.sum()), 2)}
+
+def relatorio_memoria(antes: pd.DataFrame, depois: pd.DataFrame) -> pd.DataFrame:
+    """Compara o uso de memória por linha (bytes) de cada coluna antes e depois do esquema."""
+    relatorio = pd.DataFrame({
+        'dtype_antes': {**antes.dtypes.astype(str).to_dict(), 'total': ''},
+        'bytes_antes': bytes_por_linha(antes),
+        'dtype_depois': {**depois.dtypes.astype(str).to_dict(), 'total': ''},
+        'bytes_depois': bytes_por_linha(depois)
+    })
+    relatorio['reducao'] = (1 - relatorio['bytes_depois'] / relatorio['bytes_antes']).map(lambda r: f"{r:.0%}")
+    return relatorio
@@ -3,27 +3,43 @@
 
 import requests
 import logging
+import threading
+import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Callable
 
 from src.utils.cache import salvar_cache_json, carregar_cache_json
+from src.etl.limitador import LimitadorAdaptativo, interpretar_retry_after
+from src.etl.dados_sinteticos import gerar_pokemon_sinteticos
 from src.config.settings import (
     URL_API,
     CAMINHO_CACHE,
+    CAMINHO_CACHE_RECURSOS,
+    IDADE_MAXIMA_MEMO_RECURSOS_S,
+    INVALIDAR_MEMO_RECURSOS,
+    CAMINHO_CACHE_VALIDADORES,
     QUANTIDADE_POKEMON,
     USAR_CACHE,
+    REVALIDAR_CACHE,
+    STALE_WHILE_REVALIDATE,
     USAR_DADOS_EXEMPLO,
     TIMEOUT_REQUEST,
     RETENTATIVAS_CONEXAO,
-    FATOR_BACKOFF
+    FATOR_BACKOFF,
+    MAX_REENFILEIRAMENTOS,
+    CONCORRENCIA_MAXIMA
 )
 
+_revalidacao_em_andamento: Optional[threading.Thread] = None
+_trava_revalidacao = threading.Lock()
+
 def _criar_sessao_com_retentativas() -> requests.Session:
     """
     Cria uma sessão de requests com uma estratégia de retentativas.
     Isso ajuda a lidar com instabilidades temporárias da rede ou da API.
+    Respostas 429 não são repetidas aqui: elas são tratadas pelo LimitadorAdaptativo.
 
     Returns:
         requests.Session: Uma sessão configurada com retentativas.
@@ -33,9 +49,10 @@ def _criar_sessao_com_retentativas() -> requests.Session:
         total=RETENTATIVAS_CONEXAO,
         backoff_factor=FATOR_BACKOFF,
         status_forcelist=[500, 502, 503, 504],  # Erros de servidor
-        allowed_methods=frozenset(['GET'])
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=False  # 429 e Retry-After ficam a cargo do limitador
     )
-    adaptador = HTTPAdapter(max_retries=retries)
+    adaptador = HTTPAdapter(max_retries=retries, pool_maxsize=CONCORRENCIA_MAXIMA)
     sessao.mount("https://", adaptador)
     sessao.mount("http://", adaptador)
     return sessao
@@ -50,6 +67,9 @@ def testar_conexao_api() -> bool:
     try:
         sessao = _criar_sessao_com_retentativas()
         resposta = sessao.get(f"{URL_API}1", timeout=TIMEOUT_REQUEST)
+        if resposta.status_code == 429:
+            logging.warning("PokeAPI respondeu 429 no teste de conexão; a API está acessível, mas limitando a taxa.")
+            return True
         resposta.raise_for_status()
         logging.info("Conexão com PokeAPI testada com sucesso.")
         return True
@@ -60,6 +80,7 @@ def testar_conexao_api() -> bool:
 def gerar_dados_exemplo(quantidade: int = QUANTIDADE_POKEMON) -> List[Dict[str, Any]]:
     """
     Gera dados de exemplo para desenvolvimento ou quando a API está indisponível.
+    Os registros vêm do gerador sintético, com tipos, stats e experiência base realistas.
 
     Args:
         quantidade (int): O número de Pokémon de exemplo a serem gerados.
@@ -67,47 +88,328 @@ def gerar_dados_exemplo(quantidade: int = QUANTIDADE_POKEMON) -> List[Dict[str,
     Returns:
         List[Dict[str, Any]]: Uma lista de dicionários, cada um representando um Pokémon.
     """
-    pokemon_exemplo = [
-        {
-            'id': 1, 'name': 'bulbasaur', 'types': [{'type': {'name': 'grass'}}, {'type': {'name': 'poison'}}],
-            'stats': [
-                {'stat': {'name': 'hp'}, 'base_stat': 45},
-                {'stat': {'name': 'attack'}, 'base_stat': 49},
-                {'stat': {'name': 'defense'}, 'base_stat': 49}
-            ]
-        }
-    ]
-    resultado = [pokemon_exemplo[0].copy() for _ in range(quantidade)]
-    for i, pokemon in enumerate(resultado):
-        pokemon['id'] = i + 1
-        pokemon['name'] = f"pokemon_{i+1}"
-    logging.info(f"Dados de exemplo gerados: {len(resultado)} Pokémon")
-    return resultado
+    return gerar_pokemon_sinteticos(quantidade)
 
-def _buscar_pokemon_individual(pokemon_id: int, sessao: requests.Session) -> Optional[Dict[str, Any]]:
+def _requisitar(
+    url: str,
+    sessao: requests.Session,
+    limitador: LimitadorAdaptativo,
+    cabecalhos: Optional[Dict[str, str]] = None
+) -> Tuple[Optional[requests.Response], bool]:
     """
-    Busca os dados de um único Pokémon pela sua ID.
+    Faz um GET respeitando o limitador de taxa.
 
     Args:
-        pokemon_id (int): A ID do Pokémon a ser buscado.
+        url (str): A URL completa do recurso.
         sessao (requests.Session): A sessão de requests a ser usada.
+        limitador (LimitadorAdaptativo): O limitador compartilhado entre os workers.
+        cabecalhos (Optional[Dict[str, str]]): Cabeçalhos extras (ex: If-None-Match).
 
     Returns:
-        Optional[Dict[str, Any]]: Um dicionário com os dados do Pokémon ou None se falhar.
+        Tuple[Optional[requests.Response], bool]: A resposta (200 ou 304), ou None se falhar,
+        e se a requisição deve ser repetida (falhas temporárias e 429).
     """
+    limitador.adquirir()
+    try:
+        resposta = sessao.get(url, headers=cabecalhos, timeout=TIMEOUT_REQUEST)
+    except requests.exceptions.RequestException as erro:
+        limitador.registrar_falha()
+        logging.error(f"Erro ao baixar {url}: {erro}")
+        return None, True
+
+    if resposta.status_code == 429:
+        limitador.registrar_limitacao(interpretar_retry_after(resposta.headers.get("Retry-After")))
+        return None, True
+
     try:
-        url = f"{URL_API}{pokemon_id}"
-        resposta = sessao.get(url, timeout=TIMEOUT_REQUEST)
         resposta.raise_for_status()
-        return resposta.json()
     except requests.exceptions.RequestException as erro:
-        logging.error(f"Erro ao baixar Pokémon {pokemon_id}: {erro}")
-        return None
+        limitador.registrar_falha()
+        logging.error(f"Erro ao baixar {url}: {erro}")
+        return None, resposta.status_code >= 500 or resposta.status_code == 408
+    limitador.registrar_sucesso()
+    return resposta, False
+
+def _extrair_validadores(resposta: requests.Response) -> Dict[str, str]:
+    """Retorna o ETag e o Last-Modified da resposta, quando presentes."""
+    validadores = {}
+    if resposta.headers.get("ETag"):
+        validadores['etag'] = resposta.headers["ETag"]
+    if resposta.headers.get("Last-Modified"):
+        validadores['last_modified'] = resposta.headers["Last-Modified"]
+    return validadores
+
+def _cabecalhos_condicionais(validadores: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Monta os cabeçalhos If-None-Match / If-Modified-Since a partir dos validadores salvos."""
+    cabecalhos = {}
+    if validadores and validadores.get('etag'):
+        cabecalhos['If-None-Match'] = validadores['etag']
+    if validadores and validadores.get('last_modified'):
+        cabecalhos['If-Modified-Since'] = validadores['last_modified']
+    return cabecalhos
+
+def _buscar_url(
+    url: str,
+    sessao: requests.Session,
+    limitador: LimitadorAdaptativo,
+    validadores: Optional[Dict[str, str]] = None
+) -> Tuple[Optional[Tuple[Optional[Dict[str, Any]], Dict[str, str]]], bool]:
+    """
+    Busca um recurso JSON por URL, respeitando o limitador de taxa.
+
+    Args:
+        url (str): A URL completa do recurso.
+        sessao (requests.Session): A sessão de requests a ser usada.
+        limitador (LimitadorAdaptativo): O limitador compartilhado entre os workers.
+        validadores (Optional[Dict[str, str]]): ETag/Last-Modified de uma cópia já salva;
+            se informados, o GET é condicional.
+
+    Returns:
+        Tuple[Optional[Tuple[Optional[Dict[str, Any]], Dict[str, str]]], bool]: (dados novos,
+        ou None se não mudou (304), e os validadores da resposta) ou None se falhar, e se a
+        requisição deve ser repetida (falhas temporárias e 429).
+    """
+    resposta, repetir = _requisitar(url, sessao, limitador, _cabecalhos_condicionais(validadores))
+    if resposta is None:
+        return None, repetir
+    if resposta.status_code == 304:
+        return (None, _extrair_validadores(resposta) or validadores or {}), False
+    try:
+        return (resposta.json(), _extrair_validadores(resposta)), False
+    except ValueError as erro:
+        logging.error(f"Resposta inválida de {url}: {erro}")
+        return None, True
+
+def _buscar_pokemon_individual(
+    pokemon_id: int,
+    sessao: requests.Session,
+    limitador: LimitadorAdaptativo,
+    url_base: str = URL_API,
+    validadores: Optional[Dict[str, Dict[str, str]]] = None
+) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Busca os dados de um único Pokémon pela sua ID, respeitando o limitador de taxa.
+
+    Args:
+        pokemon_id (int): A ID do Pokémon a ser buscado.
+        sessao (requests.Session): A sessão de requests a ser usada.
+        limitador (LimitadorAdaptativo): O limitador compartilhado entre os workers.
+        url_base (str): O endpoint do recurso (ex: .../pokemon/ ou .../pokemon-species/).
+        validadores (Optional[Dict[str, Dict[str, str]]]): Se informado, recebe o ETag e o
+            Last-Modified da resposta, indexados pela ID.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], bool]: Os dados do Pokémon (ou None se falhar) e
+        se a ID deve ser reenfileirada (falhas temporárias e 429).
+    """
+    url = f"{url_base}{pokemon_id}"
+    resposta, repetir = _requisitar(url, sessao, limitador)
+    if resposta is None:
+        return None, repetir
+    try:
+        dados = resposta.json()
+    except ValueError as erro:
+        logging.error(f"Resposta inválida de {url}: {erro}")
+        return None, True
+    if validadores is not None:
+        validadores[str(pokemon_id)] = _extrair_validadores(resposta)
+    return dados, False
+
+def _revalidar_pokemon_individual(
+    pokemon_id: int,
+    sessao: requests.Session,
+    limitador: LimitadorAdaptativo,
+    validadores: Dict[str, Dict[str, str]],
+    url_base: str = URL_API
+) -> Tuple[Optional[Tuple[bool, Optional[Dict[str, Any]]]], bool]:
+    """
+    Envia um GET condicional para um Pokémon já em cache.
+
+    Args:
+        pokemon_id (int): A ID do Pokémon.
+        sessao (requests.Session): A sessão de requests a ser usada.
+        limitador (LimitadorAdaptativo): O limitador compartilhado entre os workers.
+        validadores (Dict[str, Dict[str, str]]): Os validadores salvos; são atualizados in-place.
+        url_base (str): O endpoint do recurso.
+
+    Returns:
+        Tuple[Optional[Tuple[bool, Optional[Dict[str, Any]]]], bool]: (alterado, dados novos)
+        ou None se falhar, e se a ID deve ser reenfileirada.
+    """
+    url = f"{url_base}{pokemon_id}"
+    resposta, repetir = _requisitar(url, sessao, limitador, _cabecalhos_condicionais(validadores.get(str(pokemon_id))))
+    if resposta is None:
+        return None, repetir
+    if resposta.status_code == 304:
+        return (False, None), False
+    try:
+        dados = resposta.json()
+    except ValueError as erro:
+        logging.error(f"Resposta inválida de {url}: {erro}")
+        return None, True
+    validadores[str(pokemon_id)] = _extrair_validadores(resposta)
+    return (True, dados), False
+
+def _executar_em_rodadas(
+    ids: Iterable[int],
+    tarefa: Callable[[int], Tuple[Any, bool]],
+    max_workers: int
+) -> Dict[int, Any]:
+    """
+    Executa uma tarefa por ID em paralelo, reenfileirando as IDs que falharam temporariamente.
+
+    Args:
+        ids (Iterable[int]): As IDs a processar.
+        tarefa (Callable[[int], Tuple[Any, bool]]): Recebe a ID e retorna (resultado ou None, repetir).
+        max_workers (int): O número de threads do pool.
+
+    Returns:
+        Dict[int, Any]: Os resultados obtidos, indexados por ID.
+    """
+    resultado: Dict[int, Any] = {}
+    pendentes = list(ids)
+
+    for rodada in range(MAX_REENFILEIRAMENTOS + 1):
+        if not pendentes:
+            break
+        if rodada:
+            logging.info(f"Reenfileirando {len(pendentes)} IDs (rodada {rodada}/{MAX_REENFILEIRAMENTOS}).")
+
+        reenfileirar: List[int] = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {executor.submit(tarefa, i): i for i in pendentes}
+
+            for futuro in as_completed(futuros):
+                dados, repetir = futuro.result()
+                if dados:
+                    resultado[futuros[futuro]] = dados
+                elif repetir:
+                    reenfileirar.append(futuros[futuro])
+        pendentes = sorted(reenfileirar)
+
+    if pendentes:
+        logging.error(f"{len(pendentes)} Pokémon não foram baixados após {MAX_REENFILEIRAMENTOS} reenfileiramentos: {pendentes}")
+
+    return resultado
+
+def _baixar_pokemon(
+    ids: Iterable[int],
+    sessao: requests.Session,
+    limitador: LimitadorAdaptativo,
+    url_base: str = URL_API,
+    validadores: Optional[Dict[str, Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Baixa uma lista de IDs em paralelo, reenfileirando as que falharam temporariamente.
+
+    Args:
+        ids (Iterable[int]): As IDs dos Pokémon a serem baixados.
+        sessao (requests.Session): A sessão de requests a ser usada.
+        limitador (LimitadorAdaptativo): Controla a concorrência e as pausas por 429.
+        url_base (str): O endpoint do recurso a ser consultado.
+        validadores (Optional[Dict[str, Dict[str, str]]]): Se informado, recebe os validadores HTTP de cada ID.
+
+    Returns:
+        List[Dict[str, Any]]: Os Pokémon baixados com sucesso, ordenados por ID.
+    """
+    resultado = _executar_em_rodadas(
+        ids,
+        lambda i: _buscar_pokemon_individual(i, sessao, limitador, url_base, validadores),
+        limitador.concorrencia_maxima
+    )
+    return [resultado[i] for i in sorted(resultado)]
+
+def revalidar_cache(
+    quantidade: int = QUANTIDADE_POKEMON,
+    caminho_cache: str = CAMINHO_CACHE,
+    caminho_validadores: str = CAMINHO_CACHE_VALIDADORES
+) -> List[Dict[str, Any]]:
+    """
+    Atualiza o cache com GETs condicionais, reescrevendo apenas os registros alterados.
+
+    Registros com ETag/Last-Modified salvos são revalidados (304 mantém o registro);
+    registros sem validadores ou ausentes do cache são baixados normalmente.
+
+    Args:
+        quantidade (int): O número de Pokémon esperados no cache.
+        caminho_cache (str): O caminho do cache de Pokémon.
+        caminho_validadores (str): O caminho dos validadores HTTP do cache.
+
+    Returns:
+        List[Dict[str, Any]]: Os dados atualizados, ordenados por ID.
+    """
+    por_id = {p['id']: p for p in (carregar_cache_json(caminho_cache) or [])}
+    validadores = carregar_cache_json(caminho_validadores) or {}
+
+    sessao = _criar_sessao_com_retentativas()
+    limitador = LimitadorAdaptativo()
+    resultado = _executar_em_rodadas(
+        range(1, quantidade + 1),
+        lambda i: _revalidar_pokemon_individual(i, sessao, limitador, validadores, URL_API),
+        limitador.concorrencia_maxima
+    )
+
+    alterados = 0
+    for pokemon_id, (mudou, dados) in resultado.items():
+        if mudou and dados != por_id.get(pokemon_id):
+            por_id[pokemon_id] = dados
+            alterados += 1
+
+    dados_atualizados = [por_id[i] for i in sorted(por_id)]
+    if alterados:
+        salvar_cache_json(dados_atualizados, caminho_cache)
+    salvar_cache_json(validadores, caminho_validadores)
+    logging.info(
+        f"Revalidação do cache concluída: {alterados} registros alterados, "
+        f"{len(resultado) - alterados} inalterados, {quantidade - len(resultado)} sem resposta."
+    )
+    return dados_atualizados
+
+def iniciar_revalidacao_em_segundo_plano(quantidade: int = QUANTIDADE_POKEMON) -> threading.Thread:
+    """
+    Inicia a revalidação do cache em uma thread, sem bloquear quem chamou (stale-while-revalidate).
+
+    A thread não é daemon: o processo espera a revalidação terminar antes de encerrar,
+    para que a próxima execução encontre o cache atualizado.
+
+    Args:
+        quantidade (int): O número de Pokémon esperados no cache.
+
+    Returns:
+        threading.Thread: A thread da revalidação.
+    """
+    global _revalidacao_em_andamento
+    with _trava_revalidacao:
+        if _revalidacao_em_andamento and _revalidacao_em_andamento.is_alive():
+            return _revalidacao_em_andamento
+        _revalidacao_em_andamento = threading.Thread(
+            target=revalidar_cache, args=(quantidade,), name="revalidacao-cache"
+        )
+        _revalidacao_em_andamento.start()
+    return _revalidacao_em_andamento
+
+def aguardar_revalidacao(timeout: Optional[float] = None) -> bool:
+    """
+    Espera a revalidação em segundo plano, se houver uma.
+
+    Args:
+        timeout (Optional[float]): Tempo máximo de espera em segundos.
+
+    Returns:
+        bool: True se não há revalidação em andamento ao final da espera.
+    """
+    thread = _revalidacao_em_andamento
+    if thread is None:
+        return True
+    thread.join(timeout)
+    return not thread.is_alive()
 
 def buscar_dados_pokemon(
     quantidade: int = QUANTIDADE_POKEMON,
     usar_cache: bool = USAR_CACHE,
-    usar_dados_exemplo: bool = USAR_DADOS_EXEMPLO
+    usar_dados_exemplo: bool = USAR_DADOS_EXEMPLO,
+    revalidar: bool = REVALIDAR_CACHE,
+    stale_while_revalidate: bool = STALE_WHILE_REVALIDATE
 ) -> List[Dict[str, Any]]:
     """
     Busca dados dos Pokémon da PokeAPI em paralelo, com suporte a cache e dados de exemplo.
@@ -116,6 +418,9 @@ def buscar_dados_pokemon(
         quantidade (int): O número de Pokémon a serem buscados.
         usar_cache (bool): Se deve usar o cache para carregar/salvar os dados.
         usar_dados_exemplo (bool): Se deve usar dados de exemplo em caso de falha na API.
+        revalidar (bool): Se deve revalidar o cache com GETs condicionais antes de usá-lo.
+        stale_while_revalidate (bool): Se deve retornar o cache imediatamente e revalidá-lo
+            em segundo plano (tem prioridade sobre `revalidar`).
 
     Returns:
         List[Dict[str, Any]]: Uma lista de dicionários com os dados brutos dos Pokémon.
@@ -124,6 +429,10 @@ def buscar_dados_pokemon(
         dados_cache = carregar_cache_json(CAMINHO_CACHE)
         if dados_cache:
             logging.info(f"Dados de {len(dados_cache)} Pokémon carregados do cache.")
+            if stale_while_revalidate:
+                iniciar_revalidacao_em_segundo_plano(quantidade)
+            elif revalidar:
+                return revalidar_cache(quantidade)
             return dados_cache
 
     if not testar_conexao_api():
@@ -134,22 +443,14 @@ def buscar_dados_pokemon(
             logging.error("Falha na conexão com a API. Nenhum dado foi obtido.")
             return []
 
-    resultado: List[Dict[str, Any]] = []
     sessao = _criar_sessao_com_retentativas()
-    
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futuros = {executor.submit(_buscar_pokemon_individual, i, sessao): i for i in range(1, quantidade + 1)}
-        
-        for futuro in as_completed(futuros):
-            dados = futuro.result()
-            if dados:
-                resultado.append(dados)
-
-    resultado.sort(key=lambda p: p['id'])  # Ordenar para consistência
+    validadores: Dict[str, Dict[str, str]] = {}
+    resultado = _baixar_pokemon(range(1, quantidade + 1), sessao, LimitadorAdaptativo(), URL_API, validadores)
 
     if resultado:
         if usar_cache:
             salvar_cache_json(resultado, CAMINHO_CACHE)
+            salvar_cache_json(validadores, CAMINHO_CACHE_VALIDADORES)
         logging.info(f"{len(resultado)} Pokémon baixados e processados com sucesso.")
     else:
         logging.error("Nenhum Pokémon foi baixado com sucesso.")
@@ -158,3 +459,172 @@ def buscar_dados_pokemon(
             return gerar_dados_exemplo(quantidade)
     
     return resultado
+
+class BuscadorRecursos:
+    """
+    Camada de busca por URL para os recursos ligados aos Pokémon (tipos, habilidades,
+    espécies, cadeias de evolução).
+
+    Cada URL é baixada no máximo uma vez por execução: chamadas simultâneas para a
+    mesma URL esperam a mesma requisição em voo (single-flight), e os resultados ficam
+    em um memo persistente em disco para as execuções seguintes. Entradas do memo com
+    mais de `idade_maxima_s` são revalidadas com um GET condicional (ETag/Last-Modified):
+    um 304 renova a entrada sem baixar o recurso. O pipeline ainda não consome esses
+    recursos; a camada fica pronta para a extração que passar a usá-los.
+    """
+
+    def __init__(
+        self,
+        sessao: Optional[requests.Session] = None,
+        limitador: Optional[LimitadorAdaptativo] = None,
+        caminho_memo: Optional[str] = CAMINHO_CACHE_RECURSOS,
+        idade_maxima_s: Optional[float] = IDADE_MAXIMA_MEMO_RECURSOS_S,
+        invalidar: bool = INVALIDAR_MEMO_RECURSOS,
+        relogio: Callable[[], float] = time.time
+    ):
+        self.sessao = sessao or _criar_sessao_com_retentativas()
+        self.limitador = limitador or LimitadorAdaptativo()
+        self.caminho_memo = caminho_memo
+        self.idade_maxima_s = idade_maxima_s
+        self._relogio = relogio
+        memo = carregar_cache_json(caminho_memo) if caminho_memo and not invalidar else None
+        # Entradas de versões anteriores (sem data nem validadores) são baixadas de novo
+        self._memo: Dict[str, Dict[str, Any]] = {
+            url: entrada for url, entrada in memo.items()
+            if isinstance(entrada, dict) and 'dados' in entrada and 'obtido_em' in entrada
+        } if isinstance(memo, dict) else {}
+        self._em_voo: Dict[str, Future] = {}
+        self._trava = threading.Lock()
+        self._memo_alterado = invalidar and bool(caminho_memo)  # Sobrescreve o memo invalidado
+        self.requisicoes = 0
+        self.acertos_memo = 0
+        self.revalidados = 0
+        self.esperas_em_voo = 0
+
+    def _valida(self, entrada: Dict[str, Any]) -> bool:
+        return self.idade_maxima_s is None or self._relogio() - entrada['obtido_em'] <= self.idade_maxima_s
+
+    def buscar(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o recurso da URL, usando o memo (se dentro da idade máxima) ou a requisição
+        em voo quando possível. Se a revalidação falhar, a cópia antiga do memo é usada.
+
+        Args:
+            url (str): A URL do recurso.
+
+        Returns:
+            Optional[Dict[str, Any]]: Os dados do recurso ou None se não puder ser baixado.
+        """
+        with self._trava:
+            anterior = self._memo.get(url)
+            if anterior is not None and self._valida(anterior):
+                self.acertos_memo += 1
+                return anterior['dados']
+            futuro = self._em_voo.get(url)
+            dono = futuro is None
+            if dono:
+                futuro = Future()
+                self._em_voo[url] = futuro
+            else:
+                self.esperas_em_voo += 1
+
+        if not dono:
+            return futuro.result()
+
+        dados: Optional[Dict[str, Any]] = anterior['dados'] if anterior else None
+        try:
+            resultado = None
+            for _ in range(MAX_REENFILEIRAMENTOS + 1):
+                with self._trava:
+                    self.requisicoes += 1
+                resultado, repetir = _buscar_url(url, self.sessao, self.limitador, anterior['validadores'] if anterior else None)
+                if resultado is not None or not repetir:
+                    break
+            if resultado is not None:
+                novos, validadores = resultado
+                with self._trava:
+                    if novos is None:
+                        self.revalidados += 1  # 304: a cópia do memo continua valendo
+                    else:
+                        dados = novos
+                    if dados is not None:
+                        self._memo[url] = {'dados': dados, 'validadores': validadores, 'obtido_em': self._relogio()}
+                        self._memo_alterado = True
+        finally:
+            with self._trava:
+                self._em_voo.pop(url, None)
+            futuro.set_result(dados)
+        return dados
+
+    def buscar_varios(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca várias URLs em paralelo; URLs repetidas resultam em uma única requisição.
+
+        Args:
+            urls (Iterable[str]): As URLs a serem buscadas (podem conter repetições).
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Os recursos obtidos, indexados por URL.
+        """
+        unicas = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.limitador.concorrencia_maxima) as executor:
+            resultados = list(executor.map(self.buscar, unicas))
+        return {url: dados for url, dados in zip(unicas, resultados) if dados is not None}
+
+    def salvar(self) -> None:
+        """Persiste o memo em disco, se houver recursos novos ou revalidados."""
+        if self.caminho_memo and self._memo_alterado:
+            with self._trava:
+                memo = dict(self._memo)
+                self._memo_alterado = False
+            salvar_cache_json(memo, self.caminho_memo)
+
+def coletar_urls_relacionadas(pokemon: Dict[str, Any]) -> List[str]:
+    """
+    Lista as URLs dos recursos ligados a um Pokémon (tipos, habilidades e espécie).
+
+    Args:
+        pokemon (Dict[str, Any]): O registro bruto do Pokémon.
+
+    Returns:
+        List[str]: As URLs encontradas no registro.
+    """
+    urls = [t['type']['url'] for t in pokemon.get('types', []) if t.get('type', {}).get('url')]
+    urls += [a['ability']['url'] for a in pokemon.get('abilities', []) if a.get('ability', {}).get('url')]
+    if pokemon.get('species', {}).get('url'):
+        urls.append(pokemon['species']['url'])
+    return urls
+
+def buscar_recursos_relacionados(
+    dados_pokemon: List[Dict[str, Any]],
+    buscador: Optional[BuscadorRecursos] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Busca todos os recursos ligados aos Pokémon, incluindo as cadeias de evolução das espécies.
+
+    O volume de requisições depende do número de recursos distintos, e não do número
+    de Pokémon que apontam para eles.
+
+    Args:
+        dados_pokemon (List[Dict[str, Any]]): Os registros brutos dos Pokémon.
+        buscador (Optional[BuscadorRecursos]): O buscador a ser usado. Se None, um novo é criado.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Os recursos obtidos, indexados por URL.
+    """
+    buscador = buscador or BuscadorRecursos()
+    recursos = buscador.buscar_varios(url for pokemon in dados_pokemon for url in coletar_urls_relacionadas(pokemon))
+
+    urls_evolucao = [
+        dados['evolution_chain']['url'] for dados in list(recursos.values())
+        if (dados.get('evolution_chain') or {}).get('url')
+    ]
+    recursos.update(buscador.buscar_varios(urls_evolucao))
+    buscador.salvar()
+
+    logging.info(
+        f"{len(recursos)} recursos relacionados obtidos: {buscador.requisicoes} requisições, "
+        f"{buscador.acertos_memo} acertos no memo, {buscador.revalidados} revalidados sem mudança (304), "
+        f"{buscador.esperas_em_voo} deduplicadas em voo."
+    )
+    return recursos
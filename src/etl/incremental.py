@@ -0,0 +1,110 @@
+# incremental.py
+# Impressões digitais das entradas e saídas de cada etapa do pipeline, para pular etapas
+# cujas entradas não mudaram desde a última execução.
+
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils.cache import salvar_cache_json, carregar_cache_json, serializar_json
+from src.config.settings import CAMINHO_ESTADO_PIPELINE
+
+_TAMANHO_BLOCO_HASH = 1 << 20
+
+def impressao_digital_dados(dados: Any) -> str:
+    """Retorna o SHA-256 da serialização JSON compacta dos dados."""
+    return hashlib.sha256(serializar_json(dados)).hexdigest()
+
+def impressao_digital_arquivo(caminho: str, anterior: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Retorna tamanho, data de modificação e SHA-256 de um arquivo (None se ele não existir).
+
+    Se tamanho e data de modificação forem iguais aos da impressão anterior, o hash
+    anterior é reaproveitado sem reler o arquivo.
+    """
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    if anterior and anterior.get('tamanho') == estado.st_size and anterior.get('mtime_ns') == estado.st_mtime_ns:
+        return anterior
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_BLOCO_HASH), b""):
+            sha.update(bloco)
+    return {'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'sha256': sha.hexdigest()}
+
+def impressao_digital_codigo(*modulos) -> str:
+    """Combina o hash do código-fonte dos módulos: uma mudança no código invalida a etapa."""
+    sha = hashlib.sha256()
+    for modulo in modulos:
+        with open(modulo.__file__, "rb") as arquivo:
+            sha.update(arquivo.read())
+    return sha.hexdigest()
+
+class RegistroEtapas:
+    """
+    Guarda, por etapa, as impressões das entradas, das saídas e um resultado opcional.
+
+    Uma etapa está atualizada quando as entradas atuais são iguais às registradas e todas
+    as saídas registradas ainda existem com o mesmo conteúdo.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_ESTADO_PIPELINE):
+        self.caminho = caminho
+        estado = carregar_cache_json(caminho)
+        self.etapas: Dict[str, Dict[str, Any]] = estado.get('etapas', {}) if isinstance(estado, dict) else {}
+
+    def atualizada(self, etapa: str, entradas: Dict[str, Any]) -> bool:
+        """Indica se a etapa pode ser pulada."""
+        registro = self.etapas.get(etapa)
+        if not registro or registro.get('entradas') != entradas:
+            return False
+        for caminho, anterior in registro.get('saidas', {}).items():
+            atual = impressao_digital_arquivo(caminho, anterior)
+            if atual is None or atual['sha256'] != anterior['sha256']:
+                logging.info(f"Saída '{caminho}' da etapa '{etapa}' foi alterada ou removida.")
+                return False
+            registro['saidas'][caminho] = atual  # Guarda a nova data de modificação (ex: arquivo tocado)
+        return True
+
+    def resultado(self, etapa: str) -> Any:
+        """Retorna o resultado guardado da etapa, se houver."""
+        return self.etapas.get(etapa, {}).get('resultado')
+
+    def registrar(self, etapa: str, entradas: Dict[str, Any], saidas: Iterable[str] = (), resultado: Any = None) -> None:
+        """Registra uma execução bem-sucedida da etapa e salva o estado."""
+        self.etapas[etapa] = {
+            'entradas': entradas,
+            'saidas': {caminho: impressao_digital_arquivo(caminho) for caminho in saidas if os.path.exists(caminho)},
+            'resultado': resultado,
+            'concluida_em': datetime.now().isoformat(timespec="seconds")
+        }
+        self.salvar()
+
+    def impressao_saida(self, etapa: str, caminho: str) -> Optional[str]:
+        """Retorna o SHA-256 registrado de uma saída da etapa (para encadear etapas)."""
+        saida = self.etapas.get(etapa, {}).get('saidas', {}).get(caminho)
+        return saida['sha256'] if saida else None
+
+    def invalidar(self, etapas: Optional[Iterable[str]] = None) -> List[str]:
+        """Esquece as etapas informadas (ou todas), forçando sua execução."""
+        nomes = list(self.etapas) if etapas is None else [e for e in etapas if e in self.etapas]
+        for nome in nomes:
+            del self.etapas[nome]
+        if nomes:
+            self.salvar()
+        return nomes
+
+    def salvar(self) -> None:
+        salvar_cache_json({'etapas': self.etapas}, self.caminho, compacto=False)
+
+def serializavel(valor: Any) -> Any:
+    """Converte escalares numpy (ex: resultados do pandas) para tipos JSON."""
+    if hasattr(valor, 'item'):
+        return valor.item()
+    if isinstance(valor, dict):
+        return {str(k): serializavel(v) for k, v in valor.items()}
+    return valor
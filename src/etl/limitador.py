@@ -0,0 +1,114 @@
+# limitador.py
+# Limitador de taxa do lado do cliente com concorrência adaptativa (AIMD).
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from src.config.settings import (
+    CONCORRENCIA_INICIAL,
+    CONCORRENCIA_MINIMA,
+    CONCORRENCIA_MAXIMA,
+    FATOR_REDUCAO_CONCORRENCIA,
+    ESPERA_PADRAO_429,
+    ESPERA_MAXIMA_RETRY_AFTER
+)
+
+def interpretar_retry_after(valor: Optional[str], padrao: float = ESPERA_PADRAO_429) -> float:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera.
+
+    Args:
+        valor (Optional[str]): O valor bruto do cabeçalho, se presente.
+        padrao (float): A espera usada quando o cabeçalho está ausente ou é inválido.
+
+    Returns:
+        float: Segundos de espera, limitados a ESPERA_MAXIMA_RETRY_AFTER.
+    """
+    if not valor:
+        return padrao
+    valor = valor.strip()
+    try:
+        espera = float(valor)
+    except ValueError:
+        try:
+            data = parsedate_to_datetime(valor)
+        except (TypeError, ValueError):
+            return padrao
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        espera = (data - datetime.now(timezone.utc)).total_seconds()
+    return min(max(espera, 0.0), ESPERA_MAXIMA_RETRY_AFTER)
+
+class LimitadorAdaptativo:
+    """
+    Controla quantas requisições podem estar em andamento ao mesmo tempo.
+
+    O limite cresce de forma aditiva a cada resposta bem-sucedida e cai de forma
+    multiplicativa a cada 429 (AIMD). Um 429 também pausa novas requisições até
+    o fim do Retry-After informado pelo servidor.
+    """
+
+    def __init__(
+        self,
+        concorrencia_inicial: int = CONCORRENCIA_INICIAL,
+        concorrencia_minima: int = CONCORRENCIA_MINIMA,
+        concorrencia_maxima: int = CONCORRENCIA_MAXIMA,
+        fator_reducao: float = FATOR_REDUCAO_CONCORRENCIA
+    ):
+        self.concorrencia_minima = concorrencia_minima
+        self.concorrencia_maxima = concorrencia_maxima
+        self.fator_reducao = fator_reducao
+        self.limite = float(min(max(concorrencia_inicial, concorrencia_minima), concorrencia_maxima))
+        self.em_andamento = 0
+        self.pausado_ate = 0.0
+        self._condicao = threading.Condition()
+
+    def adquirir(self) -> None:
+        """Bloqueia até haver uma vaga livre e nenhuma pausa ativa."""
+        with self._condicao:
+            while True:
+                espera = self.pausado_ate - time.monotonic()
+                if espera > 0:
+                    self._condicao.wait(timeout=espera)
+                elif self.em_andamento >= int(self.limite):
+                    self._condicao.wait()
+                else:
+                    self.em_andamento += 1
+                    return
+
+    def registrar_sucesso(self) -> None:
+        """Libera a vaga e aumenta o limite em aproximadamente 1 a cada janela completa."""
+        with self._condicao:
+            self.em_andamento -= 1
+            self.limite = min(self.limite + 1.0 / self.limite, float(self.concorrencia_maxima))
+            self._condicao.notify_all()
+
+    def registrar_limitacao(self, espera: float) -> None:
+        """
+        Libera a vaga após um 429, reduz o limite e pausa novas requisições.
+
+        Args:
+            espera (float): Segundos até o servidor voltar a aceitar requisições.
+        """
+        with self._condicao:
+            self.em_andamento -= 1
+            agora = time.monotonic()
+            # Vários 429 da mesma rajada contam como um único sinal de congestionamento.
+            if agora >= self.pausado_ate:
+                self.limite = max(self.limite * self.fator_reducao, float(self.concorrencia_minima))
+                logging.warning(
+                    f"API limitou a taxa (429). Concorrência reduzida para {int(self.limite)}; "
+                    f"pausa de {espera:.1f}s."
+                )
+            self.pausado_ate = max(self.pausado_ate, agora + espera)
+            self._condicao.notify_all()
+
+    def registrar_falha(self) -> None:
+        """Libera a vaga após uma falha que não é de limitação de taxa, sem alterar o limite."""
+        with self._condicao:
+            self.em_andamento -= 1
+            self._condicao.notify_all()
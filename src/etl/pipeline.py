@@ -1,8 +1,33 @@
 # pipeline.py
 # Execução geral do pipeline de ETL 
 
+import time
+from typing import Iterable, Optional
+
 from src.utils.logger import configurar_logs
-from src.etl.extractor import buscar_dados_pokemon
+from src.utils.perfilador import Perfilador
+from src.etl.extractor import buscar_dados_pokemon, aguardar_revalidacao
+from src.etl.incremental import (
+    RegistroEtapas,
+    impressao_digital_dados,
+    impressao_digital_codigo,
+    serializavel
+)
+from src.etl import transformer, reporter, agregados, esquema
+from src.config.settings import (
+    REVALIDAR_CACHE,
+    STALE_WHILE_REVALIDATE,
+    CAMINHO_RELATORIO_CSV,
+    CAMINHO_GRAFICO_TIPOS,
+    CAMINHO_RELATORIO_CONSOLIDADO,
+    CAMINHO_INDICE_FAISS,
+    TIPO_INDICE_FAISS,
+    COMPRESSAO_INDICE_FAISS,
+    INCLUIR_DOCUMENTOS_AGREGADOS,
+    TOP_N_DOCUMENTOS_AGREGADOS,
+    INDEXACAO_PARALELA,
+    MODELO_EMBEDDINGS
+)
 from src.etl.transformer import (
     transformar_dados_pokemon, 
     contar_pokemon_por_tipo,
@@ -16,57 +41,172 @@ from src.etl.reporter import (
     gerar_relatorio_consolidado
 )
 import logging
+from src.rag import rag_data_loader, indice_vetorial, embeddings_paralelos
 from src.rag.rag_data_loader import gerar_documentos_para_rag, indexar_dados
+from src.rag.indice_vetorial import geracao_atual_indice
+
+# Etapas que podem ser puladas quando as entradas não mudaram (e invalidadas pela linha de comando).
+ETAPAS_PIPELINE = ("relatorio_csv", "grafico_tipos", "relatorio_consolidado", "resumo", "indexacao")
+
+def _logar_resumo(resumo: dict) -> None:
+    """Reproduz no log o resumo guardado de uma execução anterior."""
+    logging.info("=== RESUMO DO RELATÓRIO (sem alterações) ===")
+    for chave, valor in resumo.items():
+        if isinstance(valor, float):
+            logging.info(f"{chave.replace('_', ' ').capitalize()}: {valor:.1f}")
+        else:
+            logging.info(f"{chave.replace('_', ' ').capitalize()}: {valor}")
 
-def executar_pipeline():
+def executar_pipeline(
+    revalidar_cache: bool = REVALIDAR_CACHE,
+    stale_while_revalidate: bool = STALE_WHILE_REVALIDATE,
+    forcar: bool = False,
+    invalidar: Optional[Iterable[str]] = None,
+    indexacao_paralela: bool = INDEXACAO_PARALELA,
+    perfilar: bool = False
+):
     """
     Executa todo o processo de ETL:
     1. Busca dados da PokeAPI
     2. Transforma e analisa os dados
     3. Gera relatórios e gráficos
+
+    A execução é incremental: cada etapa guarda a impressão digital das suas entradas
+    (dados extraídos, código e configuração) e das suas saídas em CAMINHO_ESTADO_PIPELINE,
+    e é pulada quando nada mudou e as saídas continuam intactas.
+
+    Args:
+        revalidar_cache (bool): Revalida o cache com GETs condicionais antes de usá-lo.
+        stale_while_revalidate (bool): Usa o cache imediatamente e o revalida em segundo plano;
+            o pipeline espera a revalidação antes de terminar.
+        forcar (bool): Executa todas as etapas, ignorando o estado salvo.
+        invalidar (Optional[Iterable[str]]): Etapas de ETAPAS_PIPELINE a serem executadas
+            mesmo sem mudanças.
+        indexacao_paralela (bool): Calcula os embeddings da indexação em shards, em um
+            pool de processos (retomável se interrompido).
+        perfilar (bool): Grava perfis de CPU, pilhas e memória de cada etapa em DIRETORIO_PERFIS.
     """
     # Configurar logs
     configurar_logs()
     logging.info("Iniciando pipeline de ETL.")
+    inicio = time.perf_counter()
+    perfilador = Perfilador(ativo=perfilar, rotulo="pipeline")
     
     try:
         # 1. Extração
-        dados_brutos = buscar_dados_pokemon()
+        with perfilador.secao('extracao'):
+            dados_brutos = buscar_dados_pokemon(
+                revalidar=revalidar_cache,
+                stale_while_revalidate=stale_while_revalidate
+            )
         logging.info(f"Busca concluída. {len(dados_brutos)} Pokémon obtidos.")
         
         if not dados_brutos:
             logging.warning("Nenhum dado foi obtido. Encerrando o pipeline.")
             return
 
-        # 2. Transformação
-        tabela = transformar_dados_pokemon(dados_brutos)
-        logging.info("Transformação de dados concluída.")
+        registro = RegistroEtapas()
+        if forcar:
+            registro.invalidar()
+        elif invalidar:
+            registro.invalidar(invalidar)
 
-        # 3. Análise
-        contagem_tipos = contar_pokemon_por_tipo(tabela)
-        media_stats_tipo = calcular_media_stats_por_tipo(tabela)
-        top_5_exp = encontrar_top_5_experiencia(tabela)
-        logging.info("Análises estatísticas concluídas.")
-        
-        # 4. Geração de Relatórios
-        exportar_relatorio_csv(tabela)
-        gerar_grafico_tipos(contagem_tipos)
-        gerar_relatorio_consolidado(top_5_exp, media_stats_tipo)
-        
-        # Gerar resumo para o log
-        analise_completa = {
-            'contagem_tipos': contagem_tipos
+        entradas_analise = {
+            'dados': impressao_digital_dados(dados_brutos),
+            'codigo': impressao_digital_codigo(transformer, reporter, esquema)
         }
-        gerar_resumo_relatorio(tabela, analise_completa)
+        analises = {}
+        etapas_executadas = []
+
+        def _analisar() -> dict:
+            """Transforma e analisa os dados só quando alguma etapa precisar deles."""
+            if not analises:
+                # 2. Transformação
+                with perfilador.secao('transformacao'):
+                    tabela = transformar_dados_pokemon(dados_brutos)
+                logging.info("Transformação de dados concluída.")
+
+                # 3. Análise
+                with perfilador.secao('analise'):
+                    analises.update(
+                        tabela=tabela,
+                        contagem_tipos=contar_pokemon_por_tipo(tabela),
+                        media_stats_tipo=calcular_media_stats_por_tipo(tabela),
+                        top_5_exp=encontrar_top_5_experiencia(tabela)
+                    )
+                logging.info("Análises estatísticas concluídas.")
+            return analises
+
+        def _executar_etapa(etapa: str, entradas: dict, funcao, saidas=()) -> None:
+            if registro.atualizada(etapa, entradas):
+                logging.info(f"Etapa '{etapa}' sem alterações; pulando.")
+                return
+            with perfilador.secao(etapa):  # A transformação, se ainda não rodou, tem uma seção própria
+                resultado = funcao()
+            registro.registrar(etapa, entradas, saidas, resultado)
+            etapas_executadas.append(etapa)
+
+        # 4. Geração de Relatórios
+        _executar_etapa(
+            'relatorio_csv', entradas_analise,
+            lambda: exportar_relatorio_csv(_analisar()['tabela']), [CAMINHO_RELATORIO_CSV]
+        )
+        _executar_etapa(
+            'grafico_tipos', entradas_analise,
+            lambda: gerar_grafico_tipos(_analisar()['contagem_tipos']), [CAMINHO_GRAFICO_TIPOS]
+        )
+        _executar_etapa(
+            'relatorio_consolidado', entradas_analise,
+            lambda: gerar_relatorio_consolidado(_analisar()['top_5_exp'], _analisar()['media_stats_tipo']),
+            [CAMINHO_RELATORIO_CONSOLIDADO]
+        )
+
+        # Gerar resumo para o log (guardado no estado, para ser repetido quando a etapa é pulada)
+        def _resumir():
+            analise_completa = {
+                'contagem_tipos': _analisar()['contagem_tipos']
+            }
+            return serializavel(gerar_resumo_relatorio(_analisar()['tabela'], analise_completa))
+
+        _executar_etapa('resumo', entradas_analise, _resumir)
+        if 'resumo' not in etapas_executadas and registro.resultado('resumo'):
+            _logar_resumo(registro.resultado('resumo'))
         
         # 5. Indexação para RAG
-        documentos = gerar_documentos_para_rag()
-        if documentos:
-            indexar_dados(documentos)
-            logging.info("Indexação de dados para o RAG concluída.")
+        entradas_indexacao = {
+            'csv': registro.impressao_saida('relatorio_csv', CAMINHO_RELATORIO_CSV),
+            'codigo': impressao_digital_codigo(rag_data_loader, indice_vetorial, embeddings_paralelos, agregados, esquema),
+            'tipo_indice': TIPO_INDICE_FAISS,
+            'compressao_indice': COMPRESSAO_INDICE_FAISS,
+            'modelo_embeddings': MODELO_EMBEDDINGS,
+            'documentos_agregados': TOP_N_DOCUMENTOS_AGREGADOS if INCLUIR_DOCUMENTOS_AGREGADOS else None
+        }
+        if (registro.resultado('indexacao') != geracao_atual_indice(CAMINHO_INDICE_FAISS)
+                or not registro.atualizada('indexacao', entradas_indexacao)):
+            with perfilador.secao('documentos_rag'):
+                documentos = gerar_documentos_para_rag()
+            if documentos:
+                with perfilador.secao('indexacao'):
+                    indexar_dados(documentos, paralelo=indexacao_paralela)
+                registro.registrar('indexacao', entradas_indexacao, resultado=geracao_atual_indice(CAMINHO_INDICE_FAISS))
+                etapas_executadas.append('indexacao')
+                logging.info("Indexação de dados para o RAG concluída.")
+            else:
+                logging.warning("Não foi possível gerar documentos para o RAG.")
         else:
-            logging.warning("Não foi possível gerar documentos para o RAG.")
+            logging.info("Etapa 'indexacao' sem alterações; o índice atual continua válido.")
 
+        registro.salvar()
+        if stale_while_revalidate:
+            # O pipeline rodou com o cache antigo; só termina quando o cache estiver atualizado
+            logging.info("Aguardando a revalidação do cache em segundo plano...")
+            aguardar_revalidacao()
+        logging.info(
+            f"Etapas executadas: {', '.join(etapas_executadas) or 'nenhuma'} "
+            f"({time.perf_counter() - inicio:.2f}s)."
+        )
+        if perfilador.diretorio:
+            logging.info(f"Perfis das etapas salvos em: {perfilador.diretorio}")
         logging.info("Pipeline concluído com sucesso!")
         
     except Exception as erro:
@@ -6,10 +6,17 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import logging
 import os
+import uuid
 from typing import Dict, Any, Optional, Union, List
 from datetime import datetime
 
-from src.config.settings import CAMINHO_GRAFICO_TIPOS, CAMINHO_RELATORIO_CSV
+from src.config.settings import (
+    CAMINHO_GRAFICO_TIPOS,
+    CAMINHO_RELATORIO_CSV,
+    CAMINHO_RELATORIO_CONSOLIDADO,
+    DIRETORIO_GRAFICOS_CHAT,
+    DPI_GRAFICOS_CHAT
+)
 
 def gerar_grafico_tipos(contagem_tipos: Dict[str, int], caminho_saida: str = CAMINHO_GRAFICO_TIPOS):
     """
@@ -55,7 +62,7 @@ def exportar_relatorio_csv(tabela: pd.DataFrame, caminho_saida: str = CAMINHO_RE
     tabela.to_csv(caminho_saida, index=False, encoding='utf-8', sep=';')
     logging.info(f"Relatório CSV salvo em: {caminho_saida}")
 
-def gerar_relatorio_consolidado(top_5: pd.DataFrame, media_por_tipo: pd.DataFrame, caminho_saida: str = "data/relatorio_consolidado.txt"):
+def gerar_relatorio_consolidado(top_5: pd.DataFrame, media_por_tipo: pd.DataFrame, caminho_saida: str = CAMINHO_RELATORIO_CONSOLIDADO):
     """
     Gera um relatório de texto consolidado com as principais análises.
 
@@ -203,7 +210,8 @@ def gerar_grafico_automatico(
     caminho_saida: Optional[str] = None,
     tipo: Optional[str] = None,  # 'barras', 'pizza', 'linha'
     titulo: str = "Gráfico Gerado Automaticamente",
-    especificacao_plot: Optional[str] = None # Novo parâmetro
+    especificacao_plot: Optional[str] = None, # Novo parâmetro
+    dpi: int = DPI_GRAFICOS_CHAT
 ) -> Optional[str]:
     """
     Gera um gráfico automaticamente a partir de diferentes tipos de dados.
@@ -214,15 +222,17 @@ def gerar_grafico_automatico(
         tipo: O tipo de gráfico a ser gerado ('barras', 'pizza', 'linha').
         titulo: Título do gráfico.
         especificacao_plot: String descrevendo o que deve ser plotado (ex: "diferenca do hp", "apenas hp").
+        dpi: Resolução da imagem salva.
 
     Returns:
         O caminho onde o gráfico foi salvo, ou None se falhar.
     """
     if not caminho_saida:
-        GRAFICOS_DIR = "chat_outputs/graficos"
-        os.makedirs(GRAFICOS_DIR, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        caminho_saida = os.path.join(GRAFICOS_DIR, f"grafico_{timestamp}.png")
+        os.makedirs(DIRETORIO_GRAFICOS_CHAT, exist_ok=True)
+        # Microssegundos e um sufixo aleatório: gráficos gerados no mesmo segundo (ou em
+        # processos diferentes) não sobrescrevem uns aos outros.
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        caminho_saida = os.path.join(DIRETORIO_GRAFICOS_CHAT, f"grafico_{timestamp}_{uuid.uuid4().hex[:8]}.png")
 
     fig, ax = plt.subplots(figsize=(12, 8))
     
@@ -242,7 +252,15 @@ def gerar_grafico_automatico(
 
         ax.set_title(titulo, fontsize=16, fontweight='bold')
         plt.tight_layout()
-        plt.savefig(caminho_saida, dpi=300)
+        # Escreve em um arquivo temporário e renomeia: quem lê o caminho nunca vê uma imagem pela metade.
+        caminho_temporario = f"{caminho_saida}.{os.getpid()}.tmp"
+        try:
+            fig.savefig(caminho_temporario, dpi=dpi, format="png")
+            os.replace(caminho_temporario, caminho_saida)
+        except Exception:
+            if os.path.exists(caminho_temporario):
+                os.remove(caminho_temporario)  # Um .tmp esquecido ficaria fora do armazém para sempre
+            raise
         plt.close(fig)
         logging.info(f"Gráfico automático salvo em: {caminho_saida}")
         return caminho_saida
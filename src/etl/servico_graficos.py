@@ -0,0 +1,163 @@
+# servico_graficos.py
+# Gráficos do chat renderizados fora do processo da API, com cache pelo conteúdo do pedido.
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.etl.incremental import impressao_digital_dados
+from src.etl.reporter import gerar_grafico_automatico
+from src.utils.armazem_artefatos import obter_armazem
+from src.config.settings import DIRETORIO_GRAFICOS_CHAT, DPI_GRAFICOS_CHAT, PROCESSOS_GRAFICOS, SESSAO_GRAFICOS_CHAT
+
+TITULO_PADRAO = "Gráfico Gerado Automaticamente"
+
+def carregar_dados_grafico(caminho_arquivo: str) -> Union[pd.DataFrame, Dict, List]:
+    """
+    Lê um arquivo de dados do chat (CSV com ';' ou JSON) para plotagem.
+
+    Raises:
+        ValueError: Se a extensão não for .csv nem .json.
+    """
+    if caminho_arquivo.endswith('.csv'):
+        return pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8')
+    if caminho_arquivo.endswith('.json'):
+        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    raise ValueError("Formato de arquivo não suportado. Use .csv ou .json")
+
+def chave_grafico(
+    dados: Union[pd.DataFrame, Dict, List],
+    tipo: Optional[str] = None,
+    especificacao_plot: Optional[str] = None,
+    titulo: str = TITULO_PADRAO,
+    dpi: int = DPI_GRAFICOS_CHAT
+) -> str:
+    """Identifica um gráfico pelo hash dos dados, especificação, tipo, título e dpi."""
+    if isinstance(dados, pd.DataFrame):
+        sha = hashlib.sha256(pd.util.hash_pandas_object(dados, index=True).values.tobytes())
+        sha.update(json.dumps([str(c) for c in dados.columns]).encode("utf-8"))
+        hash_dados = sha.hexdigest()
+    else:
+        hash_dados = impressao_digital_dados(dados)
+    return impressao_digital_dados([hash_dados, especificacao_plot, tipo, titulo, dpi])
+
+def caminho_grafico_em_cache(chave: str) -> str:
+    """Gráficos ficam no namespace compartilhado do armazém, para o cache valer entre sessões."""
+    return obter_armazem(DIRETORIO_GRAFICOS_CHAT).caminho(f"grafico_{chave[:20]}.png", SESSAO_GRAFICOS_CHAT)
+
+def _usar_do_cache(caminho: str) -> bool:
+    """Se o gráfico já existe, marca o uso (para a remoção LRU) e retorna True."""
+    if not os.path.exists(caminho):
+        return False
+    obter_armazem(DIRETORIO_GRAFICOS_CHAT).tocar(caminho)
+    return True
+
+def _registrar_grafico(caminho: Optional[str]) -> None:
+    if caminho:
+        obter_armazem(DIRETORIO_GRAFICOS_CHAT).registrar(caminho)
+
+def gerar_grafico_em_cache(
+    dados: Union[pd.DataFrame, Dict, List],
+    tipo: Optional[str] = None,
+    especificacao_plot: Optional[str] = None,
+    titulo: str = TITULO_PADRAO,
+    dpi: int = DPI_GRAFICOS_CHAT
+) -> Tuple[Optional[str], bool]:
+    """
+    Gera o gráfico no processo atual, reaproveitando a imagem se o mesmo pedido já foi feito.
+
+    Returns:
+        Tuple[Optional[str], bool]: O caminho do gráfico (None se falhar) e se veio do cache.
+    """
+    caminho = caminho_grafico_em_cache(chave_grafico(dados, tipo, especificacao_plot, titulo, dpi))
+    if _usar_do_cache(caminho):
+        return caminho, True
+    caminho_gerado = _renderizar(dados, caminho, tipo, especificacao_plot, titulo, dpi)
+    _registrar_grafico(caminho_gerado)
+    return caminho_gerado, False
+
+def _renderizar(dados, caminho: str, tipo: Optional[str], especificacao_plot: Optional[str], titulo: str, dpi: int) -> Optional[str]:
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    return gerar_grafico_automatico(dados, caminho, tipo, titulo, especificacao_plot, dpi)
+
+class ServicoGraficos:
+    """
+    Renderiza gráficos em um pool de processos, para que o matplotlib (CPU e GIL) não
+    atrase as requisições de chat da API.
+
+    Pedidos iguais (mesma chave) são atendidos pela imagem já salva ou, se ainda estiverem
+    sendo renderizados, aguardam a mesma renderização em vez de começar outra.
+    """
+
+    def __init__(self, processos: int = PROCESSOS_GRAFICOS):
+        self.processos = processos
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._em_andamento: Dict[str, Future] = {}
+        self._trava = threading.Lock()
+
+    def _obter_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 'spawn': a API já tem threads (logs, monitor do índice), e fork com threads não é seguro.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def solicitar(
+        self,
+        dados: Union[pd.DataFrame, Dict, List],
+        tipo: Optional[str] = None,
+        especificacao_plot: Optional[str] = None,
+        titulo: str = TITULO_PADRAO,
+        dpi: int = DPI_GRAFICOS_CHAT
+    ) -> Tuple[Future, bool]:
+        """
+        Pede um gráfico sem bloquear.
+
+        Returns:
+            Tuple[Future, bool]: Um Future com o caminho do gráfico (None se falhar) e se
+            o gráfico já estava em cache.
+        """
+        chave = chave_grafico(dados, tipo, especificacao_plot, titulo, dpi)
+        caminho = caminho_grafico_em_cache(chave)
+        with self._trava:
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                return futuro, False
+            if _usar_do_cache(caminho):
+                pronto: Future = Future()
+                pronto.set_result(caminho)
+                return pronto, True
+            argumentos = (dados, caminho, tipo, especificacao_plot, titulo, dpi)
+            try:
+                futuro = self._obter_executor().submit(_renderizar, *argumentos)
+            except BrokenProcessPool:
+                # Um processo morreu (ex: falta de memória): recria o pool em vez de falhar para sempre.
+                logging.warning("Pool de renderização de gráficos quebrado; recriando.")
+                self._executor = None
+                futuro = self._obter_executor().submit(_renderizar, *argumentos)
+            self._em_andamento[chave] = futuro
+        futuro.add_done_callback(lambda f: self._concluir(chave, f))
+        logging.info(f"Gráfico {chave[:12]} enviado para renderização.")
+        return futuro, False
+
+    def _concluir(self, chave: str, futuro: Future) -> None:
+        # O processo de renderização só grava a imagem; o índice do armazém é mantido aqui.
+        if not futuro.cancelled() and futuro.exception() is None:
+            _registrar_grafico(futuro.result())
+        with self._trava:
+            self._em_andamento.pop(chave, None)
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,216 @@
+# sharding.py
+# Extração particionada (shards) entre processos ou máquinas, com mesclagem determinística.
+
+import glob
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from src.utils.cache import salvar_cache_json, carregar_cache_json
+from src.etl.extractor import _criar_sessao_com_retentativas, _baixar_pokemon
+from src.etl.limitador import LimitadorAdaptativo
+from src.config.settings import (
+    CONCORRENCIA_INICIAL,
+    CONCORRENCIA_MINIMA,
+    CONCORRENCIA_MAXIMA,
+    URL_BASE_API,
+    CAMINHO_CACHE,
+    QUANTIDADE_POKEMON,
+    DIRETORIO_SHARDS,
+    PROCESSOS_EXTRACAO
+)
+
+def particionar_ids(ids: Sequence[int], total_shards: int, indice_shard: int) -> List[int]:
+    """
+    Seleciona as IDs de um shard de forma determinística.
+
+    As IDs são ordenadas e distribuídas de forma intercalada (shard i recebe as posições
+    i, i + n, i + 2n, ...), o que equilibra a carga mesmo quando IDs altas são mais lentas.
+
+    Args:
+        ids (Sequence[int]): O espaço completo de IDs.
+        total_shards (int): O número total de shards.
+        indice_shard (int): O índice deste shard, de 0 a total_shards - 1.
+
+    Returns:
+        List[int]: As IDs atribuídas a este shard.
+    """
+    if total_shards < 1 or not 0 <= indice_shard < total_shards:
+        raise ValueError(f"Shard inválido: {indice_shard} de {total_shards}.")
+    return sorted(set(ids))[indice_shard::total_shards]
+
+def caminho_shard(recurso: str, indice_shard: int, total_shards: int, diretorio: str = DIRETORIO_SHARDS) -> str:
+    """Retorna o caminho do cache parcial de um shard."""
+    return os.path.join(diretorio, f"{recurso}_shard_{indice_shard:03d}_de_{total_shards:03d}.json")
+
+def caminho_dataset_mesclado(recurso: str) -> str:
+    """Retorna o caminho do dataset canônico de um recurso (o cache principal, para 'pokemon')."""
+    if recurso == "pokemon":
+        return CAMINHO_CACHE
+    return os.path.join(os.path.dirname(CAMINHO_CACHE), f"{recurso.replace('-', '_')}_cache.json")
+
+def limitador_do_shard(processos_simultaneos: int) -> LimitadorAdaptativo:
+    """
+    Um limitador com a parte proporcional de CONCORRENCIA_INICIAL e CONCORRENCIA_MAXIMA,
+    para que `processos_simultaneos` shards contra o mesmo servidor somem os limites de
+    uma extração única. Cada processo reage aos próprios 429 (a pausa não é compartilhada).
+    """
+    processos = max(1, processos_simultaneos)
+    return LimitadorAdaptativo(
+        concorrencia_inicial=max(CONCORRENCIA_INICIAL // processos, CONCORRENCIA_MINIMA),
+        concorrencia_maxima=max(CONCORRENCIA_MAXIMA // processos, CONCORRENCIA_MINIMA)
+    )
+
+def extrair_shard(
+    indice_shard: int,
+    total_shards: int,
+    quantidade: int = QUANTIDADE_POKEMON,
+    recurso: str = "pokemon",
+    ids: Optional[Sequence[int]] = None,
+    diretorio: str = DIRETORIO_SHARDS,
+    processos_simultaneos: int = 1
+) -> str:
+    """
+    Baixa as IDs de um shard e grava o resultado no seu cache parcial.
+
+    Pode ser executado em processos locais ou em máquinas diferentes que compartilhem
+    o diretório de shards; cada shard escreve somente no seu próprio arquivo.
+    Com vários shards ao mesmo tempo contra o mesmo servidor, informe quantos em
+    `processos_simultaneos`: cada um fica com uma parte proporcional da concorrência.
+
+    Args:
+        indice_shard (int): O índice deste shard.
+        total_shards (int): O número total de shards.
+        quantidade (int): Define o espaço de IDs 1..quantidade quando `ids` não é informado.
+        recurso (str): O endpoint da PokeAPI (ex: 'pokemon', 'pokemon-species').
+        ids (Optional[Sequence[int]]): Uma lista explícita de IDs a particionar.
+        diretorio (str): O diretório dos caches parciais.
+        processos_simultaneos (int): Quantos shards rodam ao mesmo tempo (divide a concorrência).
+
+    Returns:
+        str: O caminho do cache parcial gravado.
+    """
+    ids_shard = particionar_ids(ids if ids is not None else range(1, quantidade + 1), total_shards, indice_shard)
+    logging.info(f"Shard {indice_shard}/{total_shards} de '{recurso}': {len(ids_shard)} IDs.")
+
+    sessao = _criar_sessao_com_retentativas()
+    dados = _baixar_pokemon(ids_shard, sessao, limitador_do_shard(processos_simultaneos), f"{URL_BASE_API}{recurso}/")
+
+    caminho = caminho_shard(recurso, indice_shard, total_shards, diretorio)
+    salvar_cache_json(dados, caminho)
+    logging.info(f"Shard {indice_shard}/{total_shards} concluído: {len(dados)} registros em {caminho}.")
+    return caminho
+
+def mesclar_shards(
+    recurso: str = "pokemon",
+    quantidade: int = QUANTIDADE_POKEMON,
+    ids_esperados: Optional[Sequence[int]] = None,
+    total_shards: Optional[int] = None,
+    diretorio: str = DIRETORIO_SHARDS,
+    caminho_saida: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Mescla os caches parciais em um dataset canônico ordenado por ID.
+
+    Os arquivos são lidos em ordem de nome, e a primeira ocorrência de cada ID vence,
+    então o resultado é o mesmo independentemente da ordem em que os shards terminaram.
+    IDs fora das esperadas ficam fora do dataset (só aparecem no relatório).
+
+    Args:
+        recurso (str): O endpoint cujos shards serão mesclados.
+        quantidade (int): Define as IDs esperadas 1..quantidade quando `ids_esperados` não é informado.
+        ids_esperados (Optional[Sequence[int]]): Uma lista explícita de IDs esperadas.
+        total_shards (Optional[int]): Se informado, considera apenas shards dessa partição.
+            Se não, os arquivos do diretório precisam ser todos da mesma partição.
+        diretorio (str): O diretório dos caches parciais.
+        caminho_saida (Optional[str]): Onde salvar o dataset. Se None, usa o cache do recurso.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: O dataset mesclado e o relatório de
+        mesclagem (shards lidos, IDs duplicadas e IDs faltando).
+
+    Raises:
+        ValueError: Se `total_shards` não foi informado e há shards de partições diferentes.
+    """
+    sufixo = f"_de_{total_shards:03d}" if total_shards else "_de_*"
+    arquivos = sorted(glob.glob(os.path.join(diretorio, f"{recurso}_shard_*{sufixo}.json")))
+    arquivos = [a for a in arquivos if re.search(rf"{re.escape(recurso)}_shard_\d+_de_\d+\.json$", a)]
+    particoes = sorted({re.search(r"_de_(\d+)\.json$", a).group(1) for a in arquivos})
+    if len(particoes) > 1:
+        # Shards de outra partição (ex: de uma execução anterior) se misturariam ao resultado
+        raise ValueError(
+            f"Shards de '{recurso}' de partições diferentes em {diretorio} ({', '.join(particoes)} shards). "
+            f"Informe total_shards ou remova os arquivos antigos."
+        )
+
+    por_id: Dict[int, Dict[str, Any]] = {}
+    duplicados: Dict[int, int] = {}
+    divergentes: List[int] = []
+    for arquivo in arquivos:
+        for registro in carregar_cache_json(arquivo) or []:
+            registro_id = registro.get('id')
+            if registro_id is None:
+                continue
+            if registro_id in por_id:
+                duplicados[registro_id] = duplicados.get(registro_id, 1) + 1
+                if registro != por_id[registro_id]:
+                    divergentes.append(registro_id)
+                continue
+            por_id[registro_id] = registro
+
+    esperados = set(ids_esperados if ids_esperados is not None else range(1, quantidade + 1))
+    dados = [por_id[i] for i in sorted(por_id) if i in esperados]
+    relatorio = {
+        'recurso': recurso,
+        'shards_lidos': [os.path.basename(a) for a in arquivos],
+        'total_registros': len(dados),
+        'ids_duplicados': {str(i): n for i, n in sorted(duplicados.items())},
+        'ids_divergentes': sorted(set(divergentes)),
+        'ids_faltando': sorted(esperados - set(por_id)),
+        'ids_inesperados': sorted(set(por_id) - esperados)
+    }
+
+    if relatorio['ids_duplicados']:
+        logging.warning(f"{len(duplicados)} IDs aparecem em mais de um shard de '{recurso}'.")
+    if relatorio['ids_faltando']:
+        logging.warning(f"{len(relatorio['ids_faltando'])} IDs de '{recurso}' não estão em nenhum shard: {relatorio['ids_faltando']}")
+    if relatorio['ids_inesperados']:
+        logging.warning(
+            f"{len(relatorio['ids_inesperados'])} IDs de '{recurso}' fora das esperadas foram ignoradas: "
+            f"{relatorio['ids_inesperados']}"
+        )
+
+    if dados:
+        salvar_cache_json(dados, caminho_saida or caminho_dataset_mesclado(recurso))
+    salvar_cache_json(relatorio, os.path.join(diretorio, f"{recurso}_relatorio_mesclagem.json"))
+    logging.info(f"Mesclagem de '{recurso}' concluída: {len(dados)} registros de {len(arquivos)} shards.")
+    return dados, relatorio
+
+def extrair_em_paralelo(
+    quantidade: int = QUANTIDADE_POKEMON,
+    num_processos: int = PROCESSOS_EXTRACAO,
+    recurso: str = "pokemon",
+    diretorio: str = DIRETORIO_SHARDS
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Executa todos os shards em processos locais e mescla o resultado.
+
+    Args:
+        quantidade (int): O espaço de IDs 1..quantidade.
+        num_processos (int): O número de processos (e de shards).
+        recurso (str): O endpoint da PokeAPI a ser extraído.
+        diretorio (str): O diretório dos caches parciais.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: O dataset mesclado e o relatório de mesclagem.
+    """
+    with ProcessPoolExecutor(max_workers=num_processos) as executor:
+        futuros = [
+            executor.submit(extrair_shard, i, num_processos, quantidade, recurso, None, diretorio, num_processos)
+            for i in range(num_processos)
+        ]
+        for futuro in futuros:
+            futuro.result()
+    return mesclar_shards(recurso, quantidade, total_shards=num_processos, diretorio=diretorio)
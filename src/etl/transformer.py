@@ -5,12 +5,15 @@ import pandas as pd
 import logging
 from typing import List, Dict, Any
 
-def transformar_dados_pokemon(dados_brutos: List[Dict[str, Any]]) -> pd.DataFrame:
+from src.etl.esquema import aplicar_esquema, explodir_tipos, bytes_por_linha
+
+def transformar_dados_pokemon(dados_brutos: List[Dict[str, Any]], compacto: bool = True) -> pd.DataFrame:
     """
     Transforma a lista de dados brutos da PokeAPI em um DataFrame estruturado e limpo.
 
     Args:
         dados_brutos (List[Dict[str, Any]]): A lista de dicionários com dados de Pokémon.
+        compacto (bool): Se deve aplicar o esquema compacto (ver esquema.ESQUEMA_POKEMON).
 
     Returns:
         pd.DataFrame: Uma tabela com colunas: ID, Nome, Tipos, Experiencia_Base, HP, Ataque, Defesa, Categoria.
@@ -33,7 +36,12 @@ def transformar_dados_pokemon(dados_brutos: List[Dict[str, Any]]) -> pd.DataFram
         })
     
     tabela = pd.DataFrame(dados_transformados)
-    logging.info(f"Transformação concluída. Tabela criada com {len(tabela)} Pokémon.")
+    if compacto:
+        tabela = aplicar_esquema(tabela)
+    logging.info(
+        f"Transformação concluída. Tabela criada com {len(tabela)} Pokémon "
+        f"({bytes_por_linha(tabela).get('total', 0):.0f} bytes por linha)."
+    )
     return tabela
 
 def contar_pokemon_por_tipo(tabela: pd.DataFrame) -> Dict[str, int]:
@@ -46,7 +54,8 @@ def contar_pokemon_por_tipo(tabela: pd.DataFrame) -> Dict[str, int]:
     Returns:
         Dict[str, int]: Um dicionário com a contagem de cada tipo.
     """
-    contagem = tabela['Tipos'].str.split(', ', expand=True).stack().value_counts().to_dict()
+    contagem = explodir_tipos(tabela, colunas=[])['Tipos'].value_counts()
+    contagem = {tipo: int(n) for tipo, n in contagem.items() if n > 0}  # Sem as categorias ausentes
     logging.info(f"Contagem de tipos concluída. {len(contagem)} tipos únicos encontrados.")
     return contagem
 
@@ -60,8 +69,10 @@ def calcular_media_stats_por_tipo(tabela: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Uma tabela com a média de stats para cada tipo.
     """
-    tabela_tipos = tabela.assign(Tipos=tabela['Tipos'].str.split(', ')).explode('Tipos')
-    media_por_tipo = tabela_tipos.groupby('Tipos')[['HP', 'Ataque', 'Defesa']].mean().round(1)
+    tabela_tipos = explodir_tipos(tabela, colunas=['HP', 'Ataque', 'Defesa'])
+    media_por_tipo = tabela_tipos.groupby('Tipos', observed=True)[['HP', 'Ataque', 'Defesa']].mean().round(1)
+    media_por_tipo.index = media_por_tipo.index.astype(str)
+    media_por_tipo = media_por_tipo.sort_index()  # Ordem alfabética dos tipos, como antes
     logging.info(f"Média de stats por tipo calculada.")
     return media_por_tipo
 
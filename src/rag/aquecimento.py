@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from src.config.settings import AQUECER_LLM, K_CANDIDATOS
+from src.rag.rag_data_loader import get_embedding_model
+from src.rag_builder import inicializar_rag
+
+ETAPAS_AQUECIMENTO = ("modelo_embeddings", "indice", "embedding_teste", "busca_teste", "llm")
+
+class Aquecimento:
+    """
+    Aquece a API em segundo plano: carrega o modelo de embeddings, mapeia o índice FAISS,
+    faz um embedding e uma busca de teste (que trazem para a memória as páginas do índice e
+    do docstore) e, opcionalmente, faz uma chamada curta ao LLM para abrir as conexões.
+
+    O servidor aceita conexões desde o início; `pronto` indica quando a réplica pode
+    receber tráfego de chat (readiness), separado de o processo estar vivo (liveness).
+    """
+
+    def __init__(self, gerenciador_vetorstore, aquecer_llm: bool = AQUECER_LLM):
+        self.gerenciador = gerenciador_vetorstore
+        self.aquecer_llm = aquecer_llm
+        self.etapas: Dict[str, Dict[str, Any]] = {
+            nome: {'status': "pendente", 'duracao_s': None, 'erro': None} for nome in ETAPAS_AQUECIMENTO
+        }
+        self.iniciado_em: Optional[str] = None
+        self._inicio = 0.0
+        self._fim: Optional[float] = None
+        self._concluido = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pronto(self) -> bool:
+        """
+        Pronta quando o aquecimento terminou com o modelo carregado e há um índice em uso
+        (também depois de um /run_pipeline, se o índice não existia na inicialização).
+        """
+        return (
+            self._concluido.is_set()
+            and self.etapas['modelo_embeddings']['status'] == "concluida"
+            and self.gerenciador.obter() is not None
+        )
+
+    @property
+    def em_andamento(self) -> bool:
+        return self._thread is not None and not self._concluido.is_set()
+
+    def iniciar(self, ao_carregar_indice: Optional[Callable[[], None]] = None) -> None:
+        """
+        Inicia o aquecimento em uma thread e retorna imediatamente.
+
+        Args:
+            ao_carregar_indice: Chamada depois da etapa do índice (com ou sem sucesso),
+                ex: para iniciar o monitoramento de novas gerações.
+        """
+        if self._thread is not None:
+            return
+        self.iniciado_em = datetime.now().isoformat(timespec="seconds")
+        self._inicio = time.monotonic()
+        self._thread = threading.Thread(target=self._executar, args=(ao_carregar_indice,), name="aquecimento", daemon=True)
+        self._thread.start()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """Espera o fim do aquecimento. Retorna se a réplica ficou pronta."""
+        self._concluido.wait(timeout)
+        return self.pronto
+
+    def _etapa(self, nome: str, funcao: Callable[[], Any]) -> Any:
+        etapa = self.etapas[nome]
+        etapa['status'] = "em_andamento"
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao()
+        except Exception as e:
+            etapa.update(status="falhou", erro=f"{type(e).__name__}: {e}", duracao_s=round(time.perf_counter() - inicio, 3))
+            logging.error(f"Aquecimento: etapa '{nome}' falhou: {e}")
+            return None
+        etapa.update(status="concluida", duracao_s=round(time.perf_counter() - inicio, 3))
+        logging.info(f"Aquecimento: etapa '{nome}' concluída em {etapa['duracao_s']:.2f}s.")
+        return resultado
+
+    def _pular(self, *nomes: str, motivo: str) -> None:
+        for nome in nomes:
+            self.etapas[nome].update(status="pulada", erro=motivo)
+
+    def _carregar_indice(self):
+        vetorstore = inicializar_rag()
+        if vetorstore is None:
+            raise RuntimeError("Índice não encontrado e não foi possível gerá-lo. Execute o pipeline.")
+        self.gerenciador.publicar(vetorstore)
+        return vetorstore
+
+    def _buscar(self, vetorstore, vetor: np.ndarray) -> int:
+        _, ids = vetorstore.index.search(vetor[None, :], min(K_CANDIDATOS, vetorstore.index.ntotal))
+        for i in ids[0]:
+            if i != -1:
+                vetorstore.docstore.search(vetorstore.index_to_docstore_id[int(i)])
+        return int((ids[0] != -1).sum())
+
+    def _aquecer_llm(self) -> str:
+        from src.rag.rag_core import get_llm  # Evita importar os clientes de LLM só para o aquecimento
+        llm = get_llm()
+        if llm is None:
+            raise RuntimeError("Nenhuma API Key de LLM configurada.")
+        return llm.invoke("Responda apenas: ok").content
+
+    def _executar(self, ao_carregar_indice: Optional[Callable[[], None]]) -> None:
+        try:
+            modelo = self._etapa("modelo_embeddings", get_embedding_model)
+            vetorstore = self._etapa("indice", self._carregar_indice)
+            if ao_carregar_indice:
+                ao_carregar_indice()
+
+            if modelo is None:
+                self._pular("embedding_teste", "busca_teste", motivo="Modelo de embeddings indisponível.")
+            else:
+                vetor = self._etapa("embedding_teste", lambda: np.array(modelo.embed_query("Pokémon do tipo fogo"), dtype="float32"))
+                if vetorstore is None or vetor is None:
+                    self._pular("busca_teste", motivo="Índice ou embedding de teste indisponível.")
+                else:
+                    self._etapa("busca_teste", lambda: self._buscar(vetorstore, vetor))
+
+            if self.aquecer_llm:
+                self._etapa("llm", self._aquecer_llm)  # Falha aqui não impede a réplica de ficar pronta
+            else:
+                self._pular("llm", motivo="Desativado (AQUECER_LLM).")
+        finally:
+            self._fim = time.monotonic()
+            self._concluido.set()
+            logging.info(
+                f"Aquecimento {'concluído' if self.pronto else 'terminou sem deixar a réplica pronta'} "
+                f"em {self._fim - self._inicio:.1f}s."
+            )
+
+    def estado(self) -> Dict[str, Any]:
+        finalizadas = sum(1 for etapa in self.etapas.values() if etapa['status'] not in ("pendente", "em_andamento"))
+        return {
+            'pronto': self.pronto,
+            'em_andamento': self.em_andamento,
+            'progresso': f"{finalizadas}/{len(ETAPAS_AQUECIMENTO)}",
+            'iniciado_em': self.iniciado_em,
+            'duracao_s': round((self._fim or time.monotonic()) - self._inicio, 1) if self.iniciado_em else None,
+            'etapas': self.etapas
+        }
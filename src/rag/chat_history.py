@@ -1,33 +1,132 @@
 import os
+import re
 import json
+import threading
 import pandas as pd
 from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.config.settings import (
+    DIRETORIO_DADOS_CHAT,
+    DIRETORIO_GRAFICOS_CHAT,
+    DIRETORIO_HISTORICO_CHAT,
+    SESSAO_PADRAO_CHAT,
+    ARTEFATOS_NO_CONTEXTO,
+    ENTRADAS_HISTORICO_NO_CONTEXTO,
+    ORCAMENTO_TOKENS_HISTORICO,
+    ORCAMENTO_TOKENS_DADOS_ANTERIORES,
+    LIMITE_BYTES_HISTORICO_SESSAO,
+    ENTRADAS_MANTIDAS_HISTORICO
+)
+from src.rag.recuperacao_adaptativa import estimar_tokens
+from src.utils.armazem_artefatos import obter_armazem, validar_sessao
 
 CHAT_OUTPUTS_DIR = "chat_outputs"
-DADOS_DIR = os.path.join(CHAT_OUTPUTS_DIR, "dados")
-HISTORICO_PATH = os.path.join(CHAT_OUTPUTS_DIR, "historico.txt")
+DADOS_DIR = DIRETORIO_DADOS_CHAT
+HISTORICO_PATH = os.path.join(CHAT_OUTPUTS_DIR, "historico.txt")  # Formato antigo (único, sem limite); migrado
+ARQUIVO_HISTORICO = "historico.jsonl"  # Uma entrada por linha, por sessão
+
+_trava_historico = threading.Lock()
+
+def _caminho_historico(sessao: Optional[str]) -> str:
+    return obter_armazem(DIRETORIO_HISTORICO_CHAT).caminho(ARQUIVO_HISTORICO, sessao)
+
+def _ler_entradas(caminho: str) -> List[Dict[str, str]]:
+    if not os.path.exists(caminho):
+        return []
+    entradas = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                continue  # Linha cortada por uma escrita interrompida
+    return entradas
+
+def _reescrever(caminho: str, entradas: List[Dict[str, str]]) -> None:
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in entradas)
+    os.replace(temporario, caminho)
+
+def _migrar_historico_legado() -> None:
+    """Move as entradas do historico.txt antigo para o histórico da sessão padrão (uma vez)."""
+    if not os.path.exists(HISTORICO_PATH):
+        return
+    with open(HISTORICO_PATH, "r", encoding="utf-8") as f:
+        blocos = f.read().split(f"{'--'*20}\n")
+    entradas = []
+    for bloco in blocos:
+        partes = re.match(r"\[(.*?)\]\nPergunta: (.*?)\nResposta: (.*)\n?$", bloco, re.DOTALL)
+        if partes:
+            entradas.append({'data': partes[1], 'pergunta': partes[2], 'resposta': partes[3].rstrip("\n")})
+    caminho = _caminho_historico(SESSAO_PADRAO_CHAT)
+    _reescrever(caminho, (entradas + _ler_entradas(caminho))[-ENTRADAS_MANTIDAS_HISTORICO:])
+    obter_armazem(DIRETORIO_HISTORICO_CHAT).registrar(caminho, regravado=True)
+    os.remove(HISTORICO_PATH)
+
+def salvar_historico(pergunta: str, resposta: str, sessao: Optional[str] = None):
+    """
+    Acrescenta a entrada ao histórico da sessão. Acima de LIMITE_BYTES_HISTORICO_SESSAO, o arquivo
+    é reescrito só com as últimas ENTRADAS_MANTIDAS_HISTORICO entradas.
+    """
+    entrada = {'data': datetime.now().isoformat(), 'pergunta': pergunta, 'resposta': resposta}
+    with _trava_historico:
+        _migrar_historico_legado()
+        caminho = _caminho_historico(sessao)
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        if os.path.getsize(caminho) > LIMITE_BYTES_HISTORICO_SESSAO:
+            _reescrever(caminho, _ler_entradas(caminho)[-ENTRADAS_MANTIDAS_HISTORICO:])
+        obter_armazem(DIRETORIO_HISTORICO_CHAT).registrar(caminho, regravado=True)
+
+def _formatar_entrada(entrada: Dict[str, str]) -> str:
+    return f"[{entrada.get('data', '')}]\nPergunta: {entrada.get('pergunta', '')}\nResposta: {entrada.get('resposta', '')}\n{'--'*20}\n"
 
-def salvar_historico(pergunta: str, resposta: str):
-    os.makedirs(CHAT_OUTPUTS_DIR, exist_ok=True)
-    with open(HISTORICO_PATH, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.now().isoformat()}]\nPergunta: {pergunta}\nResposta: {resposta}\n{'--'*20}\n")
+def ler_historico(sessao: Optional[str] = None) -> str:
+    """Histórico da sessão (já limitado em tamanho), no formato de texto exibido pelo frontend."""
+    with _trava_historico:
+        _migrar_historico_legado()
+        entradas = _ler_entradas(_caminho_historico(sessao))
+    return "".join(_formatar_entrada(entrada) for entrada in entradas)
 
-def carregar_contexto_anterior() -> str:
+def _dentro_do_orcamento(trechos: List[str], orcamento_tokens: int) -> List[str]:
+    """Os trechos mais recentes (fim da lista) que cabem no orçamento, em ordem cronológica."""
+    escolhidos, usados = [], 0
+    for trecho in reversed(trechos):
+        tokens = estimar_tokens(trecho)
+        if usados + tokens > orcamento_tokens:
+            break
+        escolhidos.append(trecho)
+        usados += tokens
+    return escolhidos[::-1]
+
+def carregar_contexto_anterior(sessao: Optional[str] = None) -> str:
+    """
+    Últimas ENTRADAS_HISTORICO_NO_CONTEXTO conversas da sessão mais os ARTEFATOS_NO_CONTEXTO dados
+    estruturados mais recentes dela (pelo índice do armazém, sem listar o diretório), cada parte
+    limitada ao seu orçamento de tokens: as entradas mais antigas ficam de fora primeiro.
+    """
+    sessao = validar_sessao(sessao)
     contexto_partes = []
-    if os.path.exists(HISTORICO_PATH):
-        try:
-            with open(HISTORICO_PATH, 'r', encoding='utf-8') as f:
-                historico = f.read()
-                if historico.strip():
-                    contexto_partes.append(f"=== HISTÓRICO DE CONVERSAS ===\n{historico}")
-        except Exception as e:
-            print(f"Erro ao ler histórico: {e}")
+    try:
+        with _trava_historico:
+            _migrar_historico_legado()
+            entradas = _ler_entradas(_caminho_historico(sessao))[-ENTRADAS_HISTORICO_NO_CONTEXTO:]
+        historico = _dentro_do_orcamento([_formatar_entrada(e) for e in entradas], ORCAMENTO_TOKENS_HISTORICO)
+        if historico:
+            contexto_partes.append("=== HISTÓRICO DE CONVERSAS ===\n" + "".join(historico))
+    except Exception as e:
+        print(f"Erro ao ler histórico: {e}")
     
-    if os.path.exists(DADOS_DIR):
+    artefatos = obter_armazem(DADOS_DIR).listar(sessao, limite=ARTEFATOS_NO_CONTEXTO)
+    if artefatos:
         try:
             dados_estruturados = []
-            for arquivo in os.listdir(DADOS_DIR):
-                caminho_arquivo = os.path.join(DADOS_DIR, arquivo)
+            for artefato in reversed(artefatos):  # Em ordem cronológica
+                arquivo, caminho_arquivo = artefato['nome'], artefato['caminho']
+                if not os.path.exists(caminho_arquivo):
+                    continue
                 if arquivo.endswith('.csv'):
                     df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8')
                     dados_estruturados.append(f"CSV ({arquivo}):\n{df.to_string()}")
@@ -36,6 +135,7 @@ def carregar_contexto_anterior() -> str:
                         dados_json = json.load(f)
                         dados_estruturados.append(f"JSON ({arquivo}):\n{json.dumps(dados_json, indent=2, ensure_ascii=False)}")
             
+            dados_estruturados = _dentro_do_orcamento(dados_estruturados, ORCAMENTO_TOKENS_DADOS_ANTERIORES)
             if dados_estruturados:
                 contexto_partes.append(f"=== DADOS ESTRUTURADOS ANTERIORES ===\n" + "\n\n".join(dados_estruturados))
         except Exception as e:
@@ -43,7 +143,8 @@ def carregar_contexto_anterior() -> str:
     
     return "\n\n".join(contexto_partes) if contexto_partes else ""
 
-def limpar_contexto(confirmar: bool = True):
+def limpar_contexto(confirmar: bool = True, sessao: Optional[str] = None):
+    """Remove histórico, dados estruturados e gráficos. Com `sessao`, remove só o histórico e os dados dela."""
     if confirmar:
         resposta = input("Tem certeza que deseja limpar todo o contexto? (sim/não): ")
         if resposta.lower() not in ['sim', 's', 'yes', 'y']:
@@ -51,22 +152,26 @@ def limpar_contexto(confirmar: bool = True):
             return
     
     try:
-        if os.path.exists(HISTORICO_PATH):
-            os.remove(HISTORICO_PATH)
-            print(f"[INFO] Histórico removido: {HISTORICO_PATH}")
+        if sessao:
+            removidos = obter_armazem(DADOS_DIR).remover_sessao(sessao)
+            with _trava_historico:
+                obter_armazem(DIRETORIO_HISTORICO_CHAT).remover_sessao(sessao)
+            print(f"[SUCESSO] {removidos} arquivos de dados da sessão '{sessao}' removidos.")
+            return
+
+        with _trava_historico:
+            if os.path.exists(HISTORICO_PATH):
+                os.remove(HISTORICO_PATH)
+            obter_armazem(DIRETORIO_HISTORICO_CHAT).limpar()
+        print(f"[INFO] Histórico removido de {DIRETORIO_HISTORICO_CHAT}")
         
         if os.path.exists(DADOS_DIR):
-            for arquivo in os.listdir(DADOS_DIR):
-                os.remove(os.path.join(DADOS_DIR, arquivo))
+            obter_armazem(DADOS_DIR).limpar()
             print(f"[INFO] Arquivos de dados removidos de {DADOS_DIR}")
-            os.rmdir(DADOS_DIR)
-
-        graficos_dir = os.path.join(CHAT_OUTPUTS_DIR, "graficos")
-        if os.path.exists(graficos_dir):
-            for arquivo in os.listdir(graficos_dir):
-                os.remove(os.path.join(graficos_dir, arquivo))
-            print(f"[INFO] Gráficos removidos de {graficos_dir}")
-            os.rmdir(graficos_dir)
+
+        if os.path.exists(DIRETORIO_GRAFICOS_CHAT):
+            obter_armazem(DIRETORIO_GRAFICOS_CHAT).limpar()
+            print(f"[INFO] Gráficos removidos de {DIRETORIO_GRAFICOS_CHAT}")
 
         if os.path.exists(CHAT_OUTPUTS_DIR) and not os.listdir(CHAT_OUTPUTS_DIR):
              os.rmdir(CHAT_OUTPUTS_DIR)
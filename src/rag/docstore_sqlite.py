@@ -0,0 +1,111 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Union
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore, AddableMixin
+
+ARQUIVO_DOCSTORE = "docstore.sqlite"
+
+class DocstoreSQLite(Docstore, AddableMixin):
+    """
+    Docstore em SQLite, sem pickle: os documentos são lidos sob demanda, então abrir o
+    índice não desserializa o corpus inteiro, e vários processos compartilham as páginas
+    do arquivo pelo cache do sistema operacional.
+    """
+
+    def __init__(self, caminho: str, somente_leitura: bool = True):
+        self.caminho = caminho
+        self.somente_leitura = somente_leitura
+        # A conexão é aberta já aqui e compartilhada entre threads (com trava): assim o arquivo
+        # continua acessível mesmo que a geração do índice seja removida do disco depois da carga.
+        if somente_leitura:
+            uri = f"file:{os.path.abspath(caminho)}?mode=ro&immutable=1"
+            self._conexao_db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conexao_db = sqlite3.connect(caminho, check_same_thread=False)
+            self._conexao_db.execute(
+                "CREATE TABLE IF NOT EXISTS documentos ("
+                "posicao INTEGER PRIMARY KEY, doc_id TEXT UNIQUE NOT NULL, conteudo TEXT NOT NULL, metadados TEXT)"
+            )
+        self._trava = threading.Lock()
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> list:
+        with self._trava:
+            return self._conexao_db.execute(sql, parametros).fetchall()
+
+    def search(self, search: str) -> Union[str, Document]:
+        """Busca um documento pelo id."""
+        linhas = self._consultar("SELECT conteudo, metadados FROM documentos WHERE doc_id = ?", (search,))
+        if not linhas:
+            return f"ID {search} not found."
+        conteudo, metadados = linhas[0]
+        return Document(page_content=conteudo, metadata=json.loads(metadados) if metadados else {})
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Adiciona documentos, na ordem do dicionário, após os já existentes."""
+        if self.somente_leitura:
+            raise ValueError("Docstore aberto somente para leitura.")
+        inicio = self._consultar("SELECT COALESCE(MAX(posicao) + 1, 0) FROM documentos")[0][0]
+        with self._trava, self._conexao_db as conexao:
+            conexao.executemany(
+                "INSERT INTO documentos (posicao, doc_id, conteudo, metadados) VALUES (?, ?, ?, ?)",
+                [
+                    (inicio + i, doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False))
+                    for i, (doc_id, doc) in enumerate(texts.items())
+                ]
+            )
+
+    def delete(self, ids: List) -> None:
+        """Remove documentos pelo id."""
+        if self.somente_leitura:
+            raise ValueError("Docstore aberto somente para leitura.")
+        with self._trava, self._conexao_db as conexao:
+            conexao.executemany("DELETE FROM documentos WHERE doc_id = ?", [(i,) for i in ids])
+
+    def mapeamento_indice(self) -> "MapeamentoIndiceDocstore":
+        """Retorna o mapeamento posição no índice FAISS -> id do documento."""
+        return MapeamentoIndiceDocstore(self)
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._conexao_db.close()
+
+class MapeamentoIndiceDocstore(Mapping):
+    """
+    Substitui o dicionário index_to_docstore_id do LangChain consultando o SQLite,
+    para não materializar um dict com uma entrada por vetor a cada carga.
+    """
+
+    def __init__(self, docstore: DocstoreSQLite):
+        self._docstore = docstore
+        self._tamanho = None
+
+    def __getitem__(self, posicao: int) -> str:
+        linhas = self._docstore._consultar("SELECT doc_id FROM documentos WHERE posicao = ?", (int(posicao),))
+        if not linhas:
+            raise KeyError(posicao)
+        return linhas[0][0]
+
+    def __len__(self) -> int:
+        if self._tamanho is None:
+            self._tamanho = self._docstore._consultar("SELECT COUNT(*) FROM documentos")[0][0]
+        return self._tamanho
+
+    def __iter__(self) -> Iterator[int]:
+        for (posicao,) in self._docstore._consultar("SELECT posicao FROM documentos ORDER BY posicao"):
+            yield posicao
+
+def salvar_docstore_sqlite(documentos_por_posicao: List[tuple], diretorio: str) -> str:
+    """Grava (id, documento) na ordem dos vetores do índice em um novo docstore SQLite."""
+    caminho = os.path.join(diretorio, ARQUIVO_DOCSTORE)
+    caminho_temp = f"{caminho}.tmp"
+    if os.path.exists(caminho_temp):
+        os.remove(caminho_temp)
+    docstore = DocstoreSQLite(caminho_temp, somente_leitura=False)
+    docstore.add(dict(documentos_por_posicao))
+    docstore.fechar()
+    os.replace(caminho_temp, caminho)
+    return caminho
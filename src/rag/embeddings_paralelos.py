@@ -0,0 +1,218 @@
+# embeddings_paralelos.py
+# Embeddings de corpora grandes em shards, calculados em um pool de processos e gravados em disco.
+#
+# O pool roda em um processo à parte (python -m src.rag.embeddings_paralelos <build> <processos>):
+# com 'spawn', cada trabalhador reimporta o __main__ do processo que criou o pool, e o do
+# pipeline/API importaria o app inteiro. Este módulo só importa numpy, o cache e as configurações.
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.cache import salvar_cache_json, carregar_cache_json
+from src.config.settings import (
+    NIVEL_LOG,
+    MODELO_EMBEDDINGS,
+    PROCESSOS_EMBEDDINGS,
+    TAMANHO_SHARD_EMBEDDINGS,
+    DIRETORIO_SHARDS_EMBEDDINGS
+)
+
+def chave_build(textos: Sequence[str], tamanho_shard: int, modelo: str = MODELO_EMBEDDINGS) -> str:
+    """
+    Identifica um build pelo modelo, tamanho do shard e conteúdo (em ordem) dos textos.
+    Um build interrompido só é retomado se a chave for a mesma.
+    """
+    sha = hashlib.sha256(f"{modelo}\n{tamanho_shard}\n".encode("utf-8"))
+    for texto in textos:
+        sha.update(texto.encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+def caminho_shard_embeddings(diretorio_build: str, indice_shard: int) -> str:
+    return os.path.join(diretorio_build, f"vetores_{indice_shard:05d}.npy")
+
+def _limites_shards(total_textos: int, tamanho_shard: int) -> List[tuple]:
+    return [(inicio, min(inicio + tamanho_shard, total_textos)) for inicio in range(0, total_textos, tamanho_shard)]
+
+def _shards_pendentes(diretorio_build: str, limites: List[tuple]) -> List[int]:
+    return [
+        i for i, (inicio, fim) in enumerate(limites)
+        if not _shard_concluido(caminho_shard_embeddings(diretorio_build, i), fim - inicio)
+    ]
+
+def _preparar_build(diretorio_build: str, manifesto: Dict[str, Any]) -> None:
+    """
+    Cria o diretório do build ou, se já existe, confere o manifesto: shards de outro modelo,
+    tamanho de shard ou corpus não são reaproveitados (o build recomeça do zero).
+    """
+    caminho_manifesto = os.path.join(diretorio_build, "manifesto.json")
+    anterior = carregar_cache_json(caminho_manifesto) if os.path.isdir(diretorio_build) else None
+    if os.path.isdir(diretorio_build) and anterior != manifesto:
+        logging.warning(f"Manifesto do build de embeddings em {diretorio_build} não confere ({anterior}); recomeçando o build.")
+        shutil.rmtree(diretorio_build, ignore_errors=True)
+    os.makedirs(diretorio_build, exist_ok=True)
+    salvar_cache_json(manifesto, caminho_manifesto, compacto=False)
+
+def _shard_concluido(caminho: str, linhas: int) -> bool:
+    """Um shard está concluído se o arquivo existe e tem uma linha por texto."""
+    if not os.path.exists(caminho):
+        return False
+    try:
+        return np.load(caminho, mmap_mode="r").shape[0] == linhas
+    except (ValueError, OSError):
+        return False  # Arquivo corrompido: o shard é recalculado
+
+def _inicializar_trabalhador(threads: int) -> None:
+    """Carrega o modelo uma vez por processo, com threads limitadas para os processos não disputarem os núcleos."""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from src.rag.rag_data_loader import get_embedding_model  # Import tardio: rag_data_loader importa este módulo
+    get_embedding_model()
+
+def _codificar_shard(indice_shard: int, textos: List[str], caminho: str) -> int:
+    """Calcula os embeddings de um shard e os grava de forma atômica (um .npy parcial nunca parece concluído)."""
+    from src.rag.rag_data_loader import get_embedding_model
+    vetores = np.asarray(get_embedding_model().embed_documents(textos), dtype="float32")
+    temporario = f"{caminho}.{os.getpid()}.tmp.npy"
+    np.save(temporario, vetores)
+    os.replace(temporario, caminho)
+    return indice_shard
+
+def _descartar_builds_antigos(diretorio: str, atual: str) -> None:
+    """Remove shards de builds de outros corpora (ex: interrompidos antes de uma mudança nos dados)."""
+    if not os.path.isdir(diretorio):
+        return
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        if nome != atual and os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+            logging.info(f"Shards de embeddings de um build anterior removidos: {caminho}")
+
+def calcular_embeddings_em_shards(
+    textos: Sequence[str],
+    processos: int = PROCESSOS_EMBEDDINGS,
+    tamanho_shard: int = TAMANHO_SHARD_EMBEDDINGS,
+    diretorio: str = DIRETORIO_SHARDS_EMBEDDINGS
+) -> tuple[np.ndarray, str]:
+    """
+    Divide os textos em shards contíguos, calcula os embeddings de cada shard em um pool de
+    processos e mescla os vetores na ordem dos textos.
+
+    Cada shard é gravado em <diretorio>/<chave do build>/vetores_NNNNN.npy assim que termina;
+    se o build for interrompido, a próxima execução com os mesmos textos (e o mesmo manifesto:
+    modelo, tamanho do shard e número de textos) só calcula os shards que faltam. O pool roda
+    em um processo à parte, para que os trabalhadores não importem o __main__ de quem chamou.
+
+    Args:
+        textos (Sequence[str]): Os textos dos documentos, na ordem do índice.
+        processos (int): O número de processos (cada um carrega o modelo uma vez).
+        tamanho_shard (int): O número de textos por shard.
+        diretorio (str): O diretório dos builds.
+
+    Returns:
+        tuple[np.ndarray, str]: Os vetores (float32, um por texto) e o diretório do build,
+        que deve ser removido com descartar_shards_embeddings depois que o índice for salvo.
+    """
+    if tamanho_shard < 1:
+        raise ValueError(f"Tamanho de shard inválido: {tamanho_shard}.")
+    chave = chave_build(textos, tamanho_shard)[:20]
+    diretorio_build = os.path.join(diretorio, chave)
+    _descartar_builds_antigos(diretorio, chave)
+    limites = _limites_shards(len(textos), tamanho_shard)
+    _preparar_build(diretorio_build, {
+        'modelo': MODELO_EMBEDDINGS,
+        'total_textos': len(textos),
+        'tamanho_shard': tamanho_shard,
+        'total_shards': len(limites)
+    })
+    pendentes = _shards_pendentes(diretorio_build, limites)
+    if len(pendentes) < len(limites):
+        logging.info(f"Retomando build de embeddings: {len(limites) - len(pendentes)} de {len(limites)} shards já concluídos.")
+
+    if pendentes:
+        caminho_textos = os.path.join(diretorio_build, "textos.json")
+        if not os.path.exists(caminho_textos):  # Mesma chave, mesmos textos: gravados uma vez por build
+            salvar_cache_json(list(textos), caminho_textos)
+        ambiente = dict(os.environ)
+        raiz_projeto = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        ambiente['PYTHONPATH'] = os.pathsep.join(filter(None, [raiz_projeto, ambiente.get('PYTHONPATH')]))
+        retorno = subprocess.run(
+            [sys.executable, "-m", "src.rag.embeddings_paralelos", diretorio_build, str(processos)],
+            env=ambiente
+        ).returncode
+        faltando = _shards_pendentes(diretorio_build, limites)
+        if retorno != 0 or faltando:
+            raise RuntimeError(
+                f"Build de embeddings em {diretorio_build} falhou (código {retorno}, {len(faltando)} shards faltando). "
+                f"A próxima execução retoma dos shards concluídos."
+            )
+
+    return mesclar_shards_embeddings(diretorio_build, limites), diretorio_build
+
+def _executar_build(diretorio_build: str, processos: int) -> None:
+    """Calcula, no pool de processos, os shards que faltam de um build preparado por calcular_embeddings_em_shards."""
+    manifesto = carregar_cache_json(os.path.join(diretorio_build, "manifesto.json"))
+    textos = carregar_cache_json(os.path.join(diretorio_build, "textos.json"))
+    if not manifesto or textos is None or len(textos) != manifesto['total_textos']:
+        raise ValueError(f"Build de embeddings incompleto em {diretorio_build} (manifesto ou textos ausentes).")
+    limites = _limites_shards(len(textos), manifesto['tamanho_shard'])
+    pendentes = _shards_pendentes(diretorio_build, limites)
+    if not pendentes:
+        return
+
+    inicio_build = time.perf_counter()
+    num_processos = max(1, min(processos, len(pendentes)))
+    threads = max(1, (os.cpu_count() or 1) // num_processos)
+    # 'spawn': o torch não é seguro depois de um fork, e cada processo carrega o próprio modelo.
+    with ProcessPoolExecutor(
+        max_workers=num_processos,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_inicializar_trabalhador,
+        initargs=(threads,)
+    ) as executor:
+        futuros = [
+            executor.submit(
+                _codificar_shard, i, textos[limites[i][0]:limites[i][1]],
+                caminho_shard_embeddings(diretorio_build, i)
+            )
+            for i in pendentes
+        ]
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            indice_shard = futuro.result()
+            logging.info(f"Shard de embeddings {indice_shard} concluído ({concluidos}/{len(pendentes)}).")
+    logging.info(
+        f"{len(pendentes)} shards de embeddings calculados em {time.perf_counter() - inicio_build:.1f}s "
+        f"com {num_processos} processos."
+    )
+
+def mesclar_shards_embeddings(diretorio_build: str, limites: List[tuple]) -> np.ndarray:
+    """Junta os vetores dos shards em uma única matriz, lendo cada shard por mmap direto na posição final."""
+    vetores: Optional[np.ndarray] = None
+    for i, (inicio, fim) in enumerate(limites):
+        shard = np.load(caminho_shard_embeddings(diretorio_build, i), mmap_mode="r")
+        if vetores is None:
+            vetores = np.empty((limites[-1][1], shard.shape[1]), dtype="float32")
+        vetores[inicio:fim] = shard
+    return vetores if vetores is not None else np.empty((0, 0), dtype="float32")
+
+def descartar_shards_embeddings(diretorio_build: str) -> None:
+    """Remove os shards de um build cujo índice já foi salvo."""
+    shutil.rmtree(diretorio_build, ignore_errors=True)
+
+if __name__ == "__main__":
+    # Só o processo que coordena o pool executa isto; os trabalhadores reimportam o módulo sem rodá-lo.
+    logging.basicConfig(level=NIVEL_LOG, format="%(asctime)s [%(levelname)s] %(message)s")
+    _executar_build(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,67 @@
+import threading
+from src.config.settings import CAMINHO_INDICE_FAISS, INTERVALO_VERIFICACAO_INDICE
+from src.rag.indice_vetorial import geracao_atual_indice
+from src.rag.rag_data_loader import carregar_vetorstore
+
+class GerenciadorVetorstore:
+    """
+    Mantém o vector store em uso pela API e o troca por uma nova geração sem reiniciar.
+
+    A troca é só a substituição de uma referência: cada requisição pega o vector store
+    atual uma vez no início (obter) e termina nele, mesmo que uma geração nova seja
+    publicada no meio; a geração antiga é liberada quando a última requisição a soltar.
+    """
+
+    def __init__(self, base: str = CAMINHO_INDICE_FAISS, intervalo_verificacao: float = INTERVALO_VERIFICACAO_INDICE):
+        self.base = base
+        self.intervalo_verificacao = intervalo_verificacao
+        self._estado = (None, None)  # (geração, vector store), trocados juntos
+        self._trava_recarga = threading.Lock()
+        self._parar = threading.Event()
+        self._monitor = None
+
+    @property
+    def geracao(self):
+        return self._estado[0]
+
+    def obter(self):
+        """Retorna o vector store da geração atual (ou None se ainda não há índice)."""
+        return self._estado[1]
+
+    def publicar(self, vetorstore, geracao=None):
+        """Passa a servir um vector store já carregado."""
+        self._estado = (geracao or geracao_atual_indice(self.base), vetorstore)
+
+    def recarregar(self, forcar: bool = False) -> bool:
+        """Carrega a geração atual do disco se ela mudou. Retorna True se houve troca."""
+        with self._trava_recarga:
+            geracao = geracao_atual_indice(self.base)
+            if geracao is None or (geracao == self.geracao and not forcar):
+                return False
+            try:
+                vetorstore = carregar_vetorstore(geracao=geracao)
+            except Exception as e:
+                print(f"Erro ao carregar a geração {geracao} do índice: {e}. Mantendo a geração {self.geracao}.")
+                return False
+            if vetorstore is None:
+                return False
+            geracao_anterior = self.geracao
+            self._estado = (geracao, vetorstore)
+        print(f"Vector store trocado: geração {geracao_anterior} -> {geracao}.")
+        return True
+
+    def iniciar_monitoramento(self):
+        """Verifica periodicamente, em uma thread, se uma nova geração do índice foi publicada."""
+        if self._monitor and self._monitor.is_alive():
+            return
+        self._parar.clear()
+
+        def _monitorar():
+            while not self._parar.wait(self.intervalo_verificacao):
+                self.recarregar()
+
+        self._monitor = threading.Thread(target=_monitorar, name="monitor-indice", daemon=True)
+        self._monitor.start()
+
+    def parar_monitoramento(self):
+        self._parar.set()
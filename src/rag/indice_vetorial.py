@@ -0,0 +1,166 @@
+import json
+import math
+import os
+import shutil
+from datetime import datetime
+import faiss
+import numpy as np
+
+from src.config.settings import (
+    TIPO_INDICE_FAISS,
+    COMPRESSAO_INDICE_FAISS,
+    IVF_NPROBE,
+    HNSW_M,
+    HNSW_EF_SEARCH,
+    PQ_SUBQUANTIZADORES,
+    GERACOES_INDICE_MANTIDAS
+)
+
+ARQUIVO_CONFIG_INDICE = "config_indice.json"
+ARQUIVO_INDICE = "index.faiss"
+ARQUIVO_GERACAO_ATUAL = "ATUAL"
+DIRETORIO_GERACOES = "geracoes"
+TIPOS_INDICE = ("flat", "ivf", "hnsw")
+COMPRESSOES_INDICE = (None, "pq", "sq8", "fp16")
+# Abaixo disso o treino do IVF/PQ não tem pontos suficientes e o índice cai para flat.
+MINIMO_VETORES_TREINO = 1000
+
+def _sufixo_compressao(compressao, dimensao: int) -> str:
+    if compressao is None:
+        return "Flat"
+    if compressao == "sq8":
+        return "SQ8"
+    if compressao == "fp16":
+        return "SQfp16"
+    if dimensao % PQ_SUBQUANTIZADORES:
+        raise ValueError(f"A dimensão {dimensao} não é divisível por PQ_SUBQUANTIZADORES={PQ_SUBQUANTIZADORES}.")
+    return f"PQ{PQ_SUBQUANTIZADORES}"
+
+def montar_fabrica_faiss(tipo: str, compressao, total_vetores: int, dimensao: int) -> str:
+    """Monta a string do index_factory do FAISS para o tipo e a compressão escolhidos."""
+    if tipo not in TIPOS_INDICE or compressao not in COMPRESSOES_INDICE:
+        raise ValueError(f"Índice não suportado: tipo={tipo}, compressao={compressao}.")
+    sufixo = _sufixo_compressao(compressao, dimensao)
+    if tipo == "ivf":
+        nlist = max(1, min(int(4 * math.sqrt(total_vetores)), total_vetores // 39))
+        return f"IVF{nlist},{sufixo}"
+    if tipo == "hnsw":
+        return f"HNSW{HNSW_M}" if compressao is None else f"HNSW{HNSW_M}_{sufixo}"
+    return sufixo
+
+def aplicar_parametros_busca(indice, config: dict) -> None:
+    """Aplica os parâmetros de busca (nprobe, efSearch) salvos na configuração do índice."""
+    if config.get("tipo") == "ivf":
+        faiss.extract_index_ivf(indice).nprobe = config.get("nprobe", IVF_NPROBE)
+    elif config.get("tipo") == "hnsw":
+        faiss.downcast_index(indice).hnsw.efSearch = config.get("ef_search", HNSW_EF_SEARCH)
+
+def criar_indice_faiss(vetores: np.ndarray, tipo: str = TIPO_INDICE_FAISS, compressao=COMPRESSAO_INDICE_FAISS):
+    """
+    Treina (se necessário) e preenche um índice FAISS com os vetores.
+
+    Retorna o índice e a configuração que deve ser salva junto dele.
+    """
+    vetores = np.ascontiguousarray(vetores, dtype="float32")
+    total_vetores, dimensao = vetores.shape
+    precisa_treino = tipo == "ivf" or compressao == "pq"
+    if precisa_treino and total_vetores < MINIMO_VETORES_TREINO:
+        print(f"Poucos vetores ({total_vetores}) para treinar um índice {tipo}/{compressao}. Usando flat.")
+        tipo, compressao = "flat", None
+
+    fabrica = montar_fabrica_faiss(tipo, compressao, total_vetores, dimensao)
+    indice = faiss.index_factory(dimensao, fabrica)
+    if not indice.is_trained:
+        indice.train(vetores)
+    indice.add(vetores)
+
+    config = {
+        "tipo": tipo,
+        "compressao": compressao,
+        "fabrica": fabrica,
+        "dimensao": dimensao,
+        "total_vetores": total_vetores,
+        "nprobe": IVF_NPROBE,
+        "ef_search": HNSW_EF_SEARCH
+    }
+    aplicar_parametros_busca(indice, config)
+    return indice, config
+
+def gravar_indice_faiss(indice, diretorio: str) -> str:
+    """Grava o índice FAISS no diretório."""
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, ARQUIVO_INDICE)
+    faiss.write_index(indice, caminho)
+    return caminho
+
+def ler_indice_faiss(diretorio: str, usar_mmap: bool = True):
+    """
+    Lê o índice FAISS do diretório. Com mmap, os vetores ficam no arquivo mapeado em vez
+    de serem copiados para a memória do processo, e as páginas são compartilhadas entre processos.
+    """
+    flags = 0
+    if usar_mmap:
+        flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    return faiss.read_index(os.path.join(diretorio, ARQUIVO_INDICE), flags)
+
+def salvar_config_indice(config: dict, diretorio: str) -> None:
+    """Salva a configuração do índice ao lado dos arquivos do FAISS."""
+    os.makedirs(diretorio, exist_ok=True)
+    with open(os.path.join(diretorio, ARQUIVO_CONFIG_INDICE), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+def carregar_config_indice(diretorio: str) -> dict:
+    """Lê a configuração do índice; índices antigos, sem o arquivo, são flat."""
+    caminho = os.path.join(diretorio, ARQUIVO_CONFIG_INDICE)
+    if not os.path.exists(caminho):
+        return {"tipo": "flat", "compressao": None, "fabrica": "Flat"}
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# --- Gerações do índice ---
+# Cada reconstrução grava uma nova geração em <base>/geracoes/<nome>/ e só então troca o
+# ponteiro <base>/ATUAL. Quem já carregou a geração anterior continua usando-a até terminar.
+
+def nova_geracao_indice(base: str) -> tuple[str, str]:
+    """Cria o diretório de uma nova geração e retorna (nome, diretório)."""
+    nome = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    diretorio = os.path.join(base, DIRETORIO_GERACOES, nome)
+    os.makedirs(diretorio, exist_ok=True)
+    return nome, diretorio
+
+def publicar_geracao_indice(base: str, nome: str) -> None:
+    """Aponta ATUAL para a geração de forma atômica e remove gerações antigas."""
+    caminho_ponteiro = os.path.join(base, ARQUIVO_GERACAO_ATUAL)
+    caminho_temp = f"{caminho_ponteiro}.tmp"
+    with open(caminho_temp, "w", encoding="utf-8") as f:
+        f.write(nome)
+    os.replace(caminho_temp, caminho_ponteiro)
+
+    diretorio_geracoes = os.path.join(base, DIRETORIO_GERACOES)
+    antigas = [g for g in sorted(os.listdir(diretorio_geracoes)) if g != nome]
+    for geracao in antigas[:max(0, len(antigas) - (GERACOES_INDICE_MANTIDAS - 1))]:
+        shutil.rmtree(os.path.join(diretorio_geracoes, geracao), ignore_errors=True)
+
+def geracao_atual_indice(base: str) -> str | None:
+    """
+    Retorna o nome da geração atual. Índices antigos, gravados direto em <base>, são
+    identificados pela data de modificação dos arquivos, para que mudanças também sejam detectadas.
+    """
+    caminho_ponteiro = os.path.join(base, ARQUIVO_GERACAO_ATUAL)
+    if os.path.exists(caminho_ponteiro):
+        with open(caminho_ponteiro, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    caminho_legado = os.path.join(base, ARQUIVO_INDICE)
+    if os.path.exists(caminho_legado):
+        return f"legado-{os.stat(caminho_legado).st_mtime_ns}"
+    return None
+
+def resolver_diretorio_indice(base: str, geracao: str | None = None) -> str | None:
+    """Retorna o diretório com os arquivos da geração informada (ou da atual)."""
+    geracao = geracao or geracao_atual_indice(base)
+    if geracao is None:
+        return None
+    if geracao.startswith("legado-"):
+        return base
+    diretorio = os.path.join(base, DIRETORIO_GERACOES, geracao)
+    return diretorio if os.path.isdir(diretorio) else None
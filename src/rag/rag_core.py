@@ -1,56 +1,105 @@
 import os
 import re
 import json
+import numpy as np
 import pandas as pd
+import threading
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from langgraph.graph import StateGraph
 from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
 from src.rag.chat_history import carregar_contexto_anterior, salvar_historico
+from src.rag.recuperacao_adaptativa import RecuperadorAdaptativo
+from src.rag.roteador_llm import ProvedorLLM, RoteadorLLM, SemProvedorDisponivel
+from src.utils.armazem_artefatos import obter_armazem
+from src.config.settings import (
+    K_RECUPERACAO,
+    CONCORRENCIA_LLM_LOTE,
+    RECUPERACAO_ADAPTATIVA,
+    MODELO_GROQ,
+    MODELO_OPENAI,
+    PRAZO_LLM_S,
+    DIRETORIO_DADOS_CHAT
+)
+
+_roteador_llm = None
+_chaves_roteador = None
+_trava_roteador = threading.Lock()
 
 def get_llm():
-    """Retorna o LLM a ser usado, priorizando Groq."""
+    """
+    Retorna o LLM a ser usado: um roteador entre os provedores com chave configurada,
+    priorizando Groq, com prazo, failover, hedging e disjuntores (ver roteador_llm).
+    O roteador é reaproveitado entre chamadas para manter o histórico de saúde dos provedores.
+    """
+    global _roteador_llm, _chaves_roteador
     groq_api_key = os.getenv("GROQ_API_KEY")
     openai_api_key = os.getenv("OPENAI_API_KEY")
 
-    if groq_api_key:
-        print("Usando Groq LLM.")
-        return ChatGroq(api_key=groq_api_key, model="llama3-8b-8192")
-    elif openai_api_key:
-        print("Groq API Key não encontrada. Usando OpenAI LLM como fallback.")
-        return ChatOpenAI(api_key=openai_api_key, model="gpt-3.5-turbo")
-    else:
-        print("Nenhuma API Key encontrada.")
-        return None
+    with _trava_roteador:
+        if (groq_api_key, openai_api_key) == _chaves_roteador and _roteador_llm is not None:
+            return _roteador_llm
+
+        provedores = []
+        # Sem retentativas no cliente: o roteador decide quando tentar outro provedor.
+        if groq_api_key:
+            print("Usando Groq LLM.")
+            provedores.append(ProvedorLLM("groq", ChatGroq(
+                api_key=groq_api_key, model=MODELO_GROQ, timeout=PRAZO_LLM_S, max_retries=0
+            )))
+        if openai_api_key:
+            print("Usando OpenAI LLM." if not groq_api_key else "OpenAI LLM configurado como fallback.")
+            provedores.append(ProvedorLLM("openai", ChatOpenAI(
+                api_key=openai_api_key, model=MODELO_OPENAI, timeout=PRAZO_LLM_S, max_retries=0
+            )))
+        if not provedores:
+            print("Nenhuma API Key encontrada.")
+            return None
+
+        if _roteador_llm is not None:
+            _roteador_llm.encerrar()
+        _roteador_llm = RoteadorLLM(provedores)
+        _chaves_roteador = (groq_api_key, openai_api_key)
+        return _roteador_llm
+
+def obter_saude_llm():
+    """Saúde dos provedores de LLM (None se nenhum roteador foi criado ainda)."""
+    return _roteador_llm.saude() if _roteador_llm is not None else None
+
+def montar_prompt(pergunta: str, docs, contexto_anterior: str) -> str:
+    """Monta o prompt com o contexto anterior e os documentos recuperados."""
+    context = "\n".join([doc.page_content for doc in docs])
+
+    prompt_template = (
+        "Responda sempre em português. Use o contexto de conversas anteriores e dados para dar respostas precisas. "
+        "Se a pergunta se referir a análises anteriores, mencione isso. "
+        "Para listas, contagens ou análises, retorne os dados em formato estruturado (tabelas markdown ou JSON). "
+        "Linhas marcadas com [RESUMO] trazem estatísticas já calculadas sobre todos os Pokémon; "
+        "para médias, contagens e rankings, use-as em vez de estimar a partir de Pokémon individuais. "
+        "Se não houver dados, diga explicitamente.\n\n"
+        "{contexto_anterior_str}"
+        "=== DADOS ATUAIS ===\n{context}\n\n"
+        "Pergunta: {pergunta}\nResposta:"
+    )
+
+    contexto_anterior_str = f"=== CONTEXTO ANTERIOR ===\n{contexto_anterior}\n\n" if contexto_anterior else ""
 
-def construir_grafo_rag(retriever, llm):
+    return prompt_template.format(
+        contexto_anterior_str=contexto_anterior_str,
+        context=context,
+        pergunta=pergunta
+    )
+
+def construir_grafo_rag(retriever, llm, sessao: Optional[str] = None):
     """Constrói o grafo LangGraph para o pipeline RAG."""
     def recuperar_docs(state):
         docs = retriever.invoke(state["pergunta"])
         return {"docs": docs, **state}
 
     def gerar_resposta(state):
-        context = "\n".join([doc.page_content for doc in state["docs"]])
-        contexto_anterior = carregar_contexto_anterior()
-        
-        prompt_template = (
-            "Responda sempre em português. Use o contexto de conversas anteriores e dados para dar respostas precisas. "
-            "Se a pergunta se referir a análises anteriores, mencione isso. "
-            "Para listas, contagens ou análises, retorne os dados em formato estruturado (tabelas markdown ou JSON). "
-            "Se não houver dados, diga explicitamente.\n\n"
-            "{contexto_anterior_str}"
-            "=== DADOS ATUAIS ===\n{context}\n\n"
-            "Pergunta: {pergunta}\nResposta:"
-        )
-        
-        contexto_anterior_str = f"=== CONTEXTO ANTERIOR ===\n{contexto_anterior}\n\n" if contexto_anterior else ""
-        
-        prompt = prompt_template.format(
-            contexto_anterior_str=contexto_anterior_str,
-            context=context, 
-            pergunta=state['pergunta']
-        )
-        
+        prompt = montar_prompt(state['pergunta'], state["docs"], carregar_contexto_anterior(sessao))
         resposta = llm.invoke(prompt)
         return {"resposta": resposta, **state}
 
@@ -95,51 +144,168 @@ def tentar_extrair_dados(resposta_texto: str):
 
     return None
 
-def salvar_dados_estruturados(dados):
-    DADOS_DIR = "chat_outputs/dados"
-    os.makedirs(DADOS_DIR, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+def salvar_dados_estruturados(dados, sessao: Optional[str] = None):
+    """Salva os dados extraídos no armazém do chat, no namespace da sessão (com limites de espaço e idade)."""
+    armazem = obter_armazem(DIRETORIO_DADOS_CHAT)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")  # Microssegundos: respostas em lote saem no mesmo segundo
     
     if isinstance(dados, list) and all(isinstance(d, pd.DataFrame) for d in dados):
         caminhos = []
         for i, df in enumerate(dados):
-            caminho = os.path.join(DADOS_DIR, f"dados_{timestamp}_part{i+1}.csv")
+            caminho = armazem.caminho(f"dados_{timestamp}_part{i+1}.csv", sessao)
             df.to_csv(caminho, index=False, sep=';', encoding='utf-8')
+            armazem.registrar(caminho)
             caminhos.append(caminho)
         return caminhos
 
     caminho = None
     if isinstance(dados, pd.DataFrame):
-        caminho = os.path.join(DADOS_DIR, f"dados_{timestamp}.csv")
+        caminho = armazem.caminho(f"dados_{timestamp}.csv", sessao)
         dados.to_csv(caminho, index=False, sep=';', encoding='utf-8')
     elif isinstance(dados, (list, dict)):
-        caminho = os.path.join(DADOS_DIR, f"dados_{timestamp}.json")
+        caminho = armazem.caminho(f"dados_{timestamp}.json", sessao)
         with open(caminho, "w", encoding="utf-8") as f:
             json.dump(dados, f, ensure_ascii=False, indent=2)
+    if caminho:
+        armazem.registrar(caminho)
             
     return caminho
 
-def responder_pergunta_rag(pergunta: str, vetorstore):
+def _registrar_resposta(pergunta: str, resposta_texto: str, sessao: Optional[str] = None):
+    """Salva o histórico e os dados estruturados extraídos da resposta. Retorna o caminho dos dados (se houver)."""
+    salvar_historico(pergunta, resposta_texto, sessao)
+    dados_estruturados = tentar_extrair_dados(resposta_texto)
+    if dados_estruturados is not None:
+        caminho_dados = salvar_dados_estruturados(dados_estruturados, sessao)
+        if caminho_dados:
+            print(f"\n[INFO] Dados estruturados extraídos e salvos em: {caminho_dados}")
+        return caminho_dados
+    return None
+
+def _criar_retriever(vetorstore):
+    if RECUPERACAO_ADAPTATIVA:
+        return RecuperadorAdaptativo(vetorstore)
+    return vetorstore.as_retriever(search_kwargs={"k": K_RECUPERACAO})
+
+def responder_pergunta_rag(pergunta: str, vetorstore, sessao: Optional[str] = None):
     llm = get_llm()
     if not llm or not vetorstore:
         print("Erro: LLM ou Vector Store não inicializado.")
         return None # Retorna None em caso de erro
 
-    retriever = vetorstore.as_retriever(search_kwargs={"k": 25})
-    grafo = construir_grafo_rag(retriever, llm)
-    resultado = grafo.invoke({"pergunta": pergunta})
+    grafo = construir_grafo_rag(_criar_retriever(vetorstore), llm, sessao)
+    try:
+        resultado = grafo.invoke({"pergunta": pergunta})
+    except (TimeoutError, SemProvedorDisponivel) as e:
+        print(f"Erro ao consultar o LLM: {e}")
+        return None
     
     if "resposta" in resultado and hasattr(resultado["resposta"], 'content'):
         resposta_texto = resultado["resposta"].content
         print("\nResposta:\n") # Manter o print para logs, se necessário
         print(resposta_texto) # Manter o print para logs, se necessário
-        salvar_historico(pergunta, resposta_texto)
-        dados_estruturados = tentar_extrair_dados(resposta_texto)
-        if dados_estruturados is not None:
-            caminho_dados = salvar_dados_estruturados(dados_estruturados)
-            if caminho_dados:
-                print(f"\n[INFO] Dados estruturados extraídos e salvos em: {caminho_dados}")
+        _registrar_resposta(pergunta, resposta_texto, sessao)
         return resposta_texto # Retorna a resposta
     else:
         print("Não foi possível gerar uma resposta.")
         return None # Retorna None se não houver resposta
+
+def responder_pergunta_rag_stream(pergunta: str, vetorstore, sessao: Optional[str] = None):
+    """
+    Responde a pergunta em streaming. Gera eventos (dicts) à medida que o LLM produz a resposta:
+
+    - {"tipo": "token", "conteudo": "..."} para cada pedaço de texto;
+    - {"tipo": "fim", "resposta": "...", "dados": caminho ou None} depois que a resposta
+      completa foi salva no histórico e os dados estruturados foram extraídos e salvos;
+    - {"tipo": "erro", "erro": "..."} se não for possível responder (nada é salvo).
+
+    A recuperação e o prompt são os mesmos de responder_pergunta_rag.
+    """
+    llm = get_llm()
+    if not llm or not vetorstore:
+        print("Erro: LLM ou Vector Store não inicializado.")
+        yield {"tipo": "erro", "erro": "LLM ou Vector Store não inicializado."}
+        return
+
+    docs = _criar_retriever(vetorstore).invoke(pergunta)
+    prompt = montar_prompt(pergunta, docs, carregar_contexto_anterior(sessao))
+    pedacos = []
+    try:
+        for pedaco in llm.stream(prompt):
+            pedacos.append(pedaco)
+            yield {"tipo": "token", "conteudo": pedaco}
+    except Exception as e:
+        print(f"Erro ao consultar o LLM: {e}")
+        yield {"tipo": "erro", "erro": str(e)}
+        return
+
+    resposta_texto = "".join(pedacos)
+    if not resposta_texto:
+        print("Não foi possível gerar uma resposta.")
+        yield {"tipo": "erro", "erro": "Não foi possível gerar uma resposta."}
+        return
+    # Extração e gravação só com a resposta completa, depois do último token
+    caminho_dados = _registrar_resposta(pergunta, resposta_texto, sessao)
+    yield {"tipo": "fim", "resposta": resposta_texto, "dados": caminho_dados}
+
+def buscar_documentos_em_lote(perguntas: list[str], vetorstore, k: int = K_RECUPERACAO) -> list[list]:
+    """
+    Recupera os documentos de várias perguntas de uma vez: uma única chamada ao encoder
+    para todas as perguntas e uma única busca vetorial com a matriz de consultas.
+    Com RECUPERACAO_ADAPTATIVA, cada pergunta passa pelo corte adaptativo, MMR e orçamento.
+    """
+    if RECUPERACAO_ADAPTATIVA:
+        return RecuperadorAdaptativo(vetorstore).buscar_em_lote(perguntas)
+    vetores = np.array(vetorstore.embedding_function.embed_documents(perguntas), dtype="float32")
+    _, indices = vetorstore.index.search(vetores, k)
+    resultados = []
+    for linha in indices:
+        docs = []
+        for i in linha:
+            if i == -1:  # Menos de k vetores no índice
+                continue
+            doc = vetorstore.docstore.search(vetorstore.index_to_docstore_id[int(i)])
+            if not isinstance(doc, str):
+                docs.append(doc)
+        resultados.append(docs)
+    return resultados
+
+def responder_perguntas_em_lote(
+    perguntas: list[str],
+    vetorstore,
+    max_concorrencia: int = CONCORRENCIA_LLM_LOTE,
+    sessao: Optional[str] = None
+):
+    """
+    Responde várias perguntas: recuperação em lote e geração concorrente (limitada a
+    max_concorrencia chamadas ao LLM). Gera um resultado por pergunta assim que fica pronto,
+    fora da ordem de entrada; o campo "indice" indica a posição da pergunta.
+    """
+    llm = get_llm()
+    if not llm or not vetorstore:
+        print("Erro: LLM ou Vector Store não inicializado.")
+        return
+
+    docs_por_pergunta = buscar_documentos_em_lote(perguntas, vetorstore)
+    contexto_anterior = carregar_contexto_anterior(sessao)  # Lido uma vez para todo o lote
+
+    def _gerar(indice: int) -> str:
+        prompt = montar_prompt(perguntas[indice], docs_por_pergunta[indice], contexto_anterior)
+        return llm.invoke(prompt).content
+
+    executor = ThreadPoolExecutor(max_workers=max_concorrencia)
+    try:
+        futuros = {executor.submit(_gerar, i): i for i in range(len(perguntas))}
+        for futuro in as_completed(futuros):
+            indice = futuros[futuro]
+            try:
+                resposta_texto = futuro.result()
+            except Exception as e:
+                yield {"indice": indice, "pergunta": perguntas[indice], "resposta": None, "erro": str(e)}
+                continue
+            _registrar_resposta(perguntas[indice], resposta_texto, sessao)
+            yield {"indice": indice, "pergunta": perguntas[indice], "resposta": resposta_texto, "erro": None}
+    finally:
+        # Se quem consome o lote desiste (ex: o cliente HTTP desconectou), as gerações que
+        # ainda não começaram são canceladas em vez de chamar o LLM sem ninguém esperando.
+        executor.shutdown(wait=False, cancel_futures=True)
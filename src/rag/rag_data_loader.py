@@ -1,12 +1,44 @@
 import os
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from src.config.settings import (
+    CAMINHO_INDICE_FAISS,
+    TIPO_INDICE_FAISS,
+    COMPRESSAO_INDICE_FAISS,
+    USAR_MMAP_INDICE,
+    INCLUIR_DOCUMENTOS_AGREGADOS,
+    TOP_N_DOCUMENTOS_AGREGADOS,
+    TAMANHO_BLOCO_ANALISE,
+    MODELO_EMBEDDINGS,
+    INDEXACAO_PARALELA,
+    TAMANHO_SHARD_EMBEDDINGS
+)
+from src.etl.agregados import AgregadosPokemon, TopK, COLUNAS_STATS
+from src.etl.esquema import ler_relatorio_csv, explodir_tipos
+from src.rag.indice_vetorial import (
+    criar_indice_faiss,
+    aplicar_parametros_busca,
+    gravar_indice_faiss,
+    ler_indice_faiss,
+    salvar_config_indice,
+    carregar_config_indice,
+    nova_geracao_indice,
+    publicar_geracao_indice,
+    resolver_diretorio_indice
+)
+from src.rag.docstore_sqlite import ARQUIVO_DOCSTORE, DocstoreSQLite, salvar_docstore_sqlite
+from src.rag.embeddings_paralelos import calcular_embeddings_em_shards, descartar_shards_embeddings
+
+@lru_cache(maxsize=1)
 def get_embedding_model():
-    """Retorna o modelo de embedding da Hugging Face."""
-    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    """Retorna o modelo de embedding da Hugging Face (carregado uma vez por processo)."""
+    return HuggingFaceEmbeddings(model_name=MODELO_EMBEDDINGS)
 
 def verificar_csv_existe(caminho_csv: str = "data/relatorio.csv") -> bool:
     """Verifica se o arquivo CSV existe e não está vazio."""
@@ -17,15 +49,81 @@ def verificar_csv_existe(caminho_csv: str = "data/relatorio.csv") -> bool:
     except OSError:
         return False
 
+def _documento_agregado(assunto: str, conteudo: str) -> Document:
+    return Document(page_content=f"[RESUMO] {conteudo}", metadata={"tipo_documento": "agregado", "assunto": assunto})
+
+def _listar_top(titulo: str, tabela: pd.DataFrame, coluna: str) -> str:
+    itens = [f"{i}. {linha['Nome']} ({linha['Tipos']}): {linha[coluna]}" for i, (_, linha) in enumerate(tabela.iterrows(), start=1)]
+    return f"{titulo}: " + "; ".join(itens) + "."
+
+def gerar_documentos_agregados(caminho_csv: str = "data/relatorio.csv", top_n: int = TOP_N_DOCUMENTOS_AGREGADOS) -> list[Document]:
+    """
+    Gera documentos com estatísticas já calculadas sobre todos os Pokémon: resumo geral,
+    contagem e médias por tipo, rankings de tipos, top-N por atributo e categorias.
+
+    Perguntas agregadas ("qual tipo tem maior média de ataque?") passam a recuperar poucos
+    documentos exatos, em vez de dezenas de linhas para o LLM estimar.
+    """
+    agregados = AgregadosPokemon(k_top=top_n)
+    tops = {coluna: TopK(top_n, coluna) for coluna in COLUNAS_STATS}
+    categorias_por_tipo: dict[str, dict[str, int]] = {}
+    for bloco in ler_relatorio_csv(caminho_csv, chunksize=TAMANHO_BLOCO_ANALISE):
+        agregados.atualizar(bloco)
+        for top in tops.values():
+            top.atualizar(bloco)
+        explodido = explodir_tipos(bloco, colunas=['Categoria'])
+        for (tipo, categoria), quantidade in explodido.groupby(['Tipos', 'Categoria'], observed=True).size().items():
+            contagem = categorias_por_tipo.setdefault(tipo, {})
+            contagem[categoria] = contagem.get(categoria, 0) + int(quantidade)
+
+    resumo = agregados.resumo()
+    contagem_tipos = agregados.contagem_tipos()
+    medias = agregados.media_stats_por_tipo()
+    documentos = [
+        _documento_agregado("resumo_geral", (
+            f"Resumo geral dos dados: {resumo['total_pokemon']} Pokémon de {resumo['tipos_unicos']} tipos. "
+            f"Categorias: {resumo['fortes']} Fortes (experiência base acima de 100), {resumo['medios']} Médios "
+            f"(50 a 100) e {resumo['fracos']} Fracos (abaixo de 50). Médias gerais: HP {resumo['hp_medio']:.1f}, "
+            f"Ataque {resumo['ataque_medio']:.1f}, Defesa {resumo['defesa_media']:.1f}."
+        )),
+        _documento_agregado("contagem_tipos", "Quantidade de Pokémon por tipo (do mais comum ao menos comum): " + "; ".join(
+            f"{tipo}: {quantidade}" for tipo, quantidade in contagem_tipos.items()
+        ) + "."),
+    ]
+    for coluna in COLUNAS_STATS:
+        ranking = medias[coluna].sort_values(ascending=False)
+        documentos.append(_documento_agregado(f"ranking_media_{coluna.lower()}", (
+            f"Ranking dos tipos pela média de {coluna} (da maior para a menor): "
+            + "; ".join(f"{i}. {tipo}: {valor:.1f}" for i, (tipo, valor) in enumerate(ranking.items(), start=1)) + "."
+        )))
+    for tipo, linha in medias.iterrows():
+        categorias = categorias_por_tipo.get(tipo, {})
+        documentos.append(_documento_agregado(f"tipo_{tipo}", (
+            f"Estatísticas do tipo {tipo}: {contagem_tipos.get(tipo, 0)} Pokémon; média de HP {linha['HP']:.1f}, "
+            f"Ataque {linha['Ataque']:.1f} e Defesa {linha['Defesa']:.1f}; categorias: "
+            + ", ".join(f"{categorias.get(c, 0)} {c}" for c in ("Forte", "Médio", "Fraco")) + "."
+        )))
+    documentos.append(_documento_agregado("top_experiencia", _listar_top(
+        f"Top {top_n} Pokémon com maior experiência base", agregados.top_experiencia(), 'Experiencia_Base'
+    )))
+    for coluna, top in tops.items():
+        documentos.append(_documento_agregado(f"top_{coluna.lower()}", _listar_top(
+            f"Top {top_n} Pokémon com maior {coluna}", top.resultado(), coluna
+        )))
+    return documentos
+
 def gerar_documentos_para_rag(caminho_csv: str = "data/relatorio.csv") -> list[Document]:
-    """Gera documentos LangChain a partir do arquivo CSV estruturado."""
+    """
+    Gera documentos LangChain a partir do arquivo CSV estruturado: um por Pokémon e,
+    se INCLUIR_DOCUMENTOS_AGREGADOS, os documentos de resumo de gerar_documentos_agregados.
+    """
     if not verificar_csv_existe(caminho_csv):
         print(f"Arquivo CSV não encontrado ou vazio: {caminho_csv}")
         print("Execute o pipeline primeiro: python main.py pipeline")
         return []
     
     try:
-        df = pd.read_csv(caminho_csv, sep=';', encoding='utf-8')
+        df = ler_relatorio_csv(caminho_csv)
         documentos = []
         
         for _, row in df.iterrows():
@@ -36,25 +134,89 @@ def gerar_documentos_para_rag(caminho_csv: str = "data/relatorio.csv") -> list[D
             documentos.append(Document(page_content=conteudo))
         
         print(f"Documentos gerados a partir do CSV: {len(documentos)} Pokémon")
+        if INCLUIR_DOCUMENTOS_AGREGADOS:
+            agregados = gerar_documentos_agregados(caminho_csv)
+            print(f"Documentos de resumo (agregados): {len(agregados)}")
+            documentos.extend(agregados)
         return documentos
     except Exception as e:
         print(f"Erro ao ler o arquivo CSV: {e}")
         return []
 
-def indexar_dados(documentos: list[Document]):
-    """Cria e salva um vector store FAISS com os documentos."""
+def indexar_dados(
+    documentos: list[Document],
+    tipo_indice: str = TIPO_INDICE_FAISS,
+    compressao: str | None = COMPRESSAO_INDICE_FAISS,
+    paralelo: bool = INDEXACAO_PARALELA
+):
+    """
+    Cria e salva um vector store FAISS com os documentos, no tipo de índice configurado.
+
+    Com `paralelo`, corpora maiores que TAMANHO_SHARD_EMBEDDINGS têm os embeddings calculados
+    em shards por um pool de processos; os shards ficam em disco até o índice ser salvo, então
+    um build interrompido é retomado de onde parou.
+    """
     if not documentos:
         print("Nenhum documento para indexar.")
         return None
     embeddings = get_embedding_model()
-    vetorstore = FAISS.from_documents(documentos, embeddings)
-    vetorstore.save_local("data/indice_faiss")
-    print("Vector store FAISS criado e salvo em data/indice_faiss")
+    textos = [doc.page_content for doc in documentos]
+    diretorio_shards = None
+    if paralelo and len(textos) > TAMANHO_SHARD_EMBEDDINGS:
+        vetores, diretorio_shards = calcular_embeddings_em_shards(textos)
+    else:
+        vetores = np.array(embeddings.embed_documents(textos), dtype="float32")
+    indice, config = criar_indice_faiss(vetores, tipo_indice, compressao)
+
+    ids = [str(i) for i in range(len(documentos))]
+    vetorstore = FAISS(
+        embedding_function=embeddings,
+        index=indice,
+        docstore=InMemoryDocstore(dict(zip(ids, documentos))),
+        index_to_docstore_id=dict(enumerate(ids))
+    )
+    geracao, diretorio = nova_geracao_indice(CAMINHO_INDICE_FAISS)
+    salvar_vetorstore(vetorstore, config, diretorio)
+    publicar_geracao_indice(CAMINHO_INDICE_FAISS, geracao)
+    if diretorio_shards:
+        descartar_shards_embeddings(diretorio_shards)
+    print(f"Vector store FAISS ({config['fabrica']}) criado e salvo em {diretorio}")
     return vetorstore
 
-def carregar_vetorstore():
-    """Carrega o vector store FAISS local."""
-    if not os.path.exists("data/indice_faiss"):
+def salvar_vetorstore(vetorstore: FAISS, config: dict, diretorio: str):
+    """Salva o índice FAISS e os documentos em SQLite (sem pickle), junto da configuração do índice."""
+    gravar_indice_faiss(vetorstore.index, diretorio)
+    documentos = [
+        (doc_id, vetorstore.docstore.search(doc_id))
+        for _, doc_id in sorted(vetorstore.index_to_docstore_id.items())
+    ]
+    salvar_docstore_sqlite(documentos, diretorio)
+    salvar_config_indice(config, diretorio)
+    caminho_pickle = os.path.join(diretorio, "index.pkl")
+    if os.path.exists(caminho_pickle):
+        os.remove(caminho_pickle)  # Docstore antigo, substituído pelo SQLite
+
+def carregar_vetorstore(usar_mmap: bool = USAR_MMAP_INDICE, geracao: str | None = None):
+    """
+    Carrega o vector store FAISS local (da geração atual ou da informada) com os parâmetros
+    de busca salvos no índice. Índices no formato novo são mapeados em memória e leem os
+    documentos do SQLite sob demanda; índices antigos (docstore em pickle) continuam sendo
+    carregados pelo LangChain.
+    """
+    diretorio = resolver_diretorio_indice(CAMINHO_INDICE_FAISS, geracao)
+    if diretorio is None:
         return None
     embeddings = get_embedding_model()
-    return FAISS.load_local("data/indice_faiss", embeddings, allow_dangerous_deserialization=True)
+    caminho_docstore = os.path.join(diretorio, ARQUIVO_DOCSTORE)
+    if os.path.exists(caminho_docstore):
+        docstore = DocstoreSQLite(caminho_docstore)
+        vetorstore = FAISS(
+            embedding_function=embeddings,
+            index=ler_indice_faiss(diretorio, usar_mmap),
+            docstore=docstore,
+            index_to_docstore_id=docstore.mapeamento_indice()
+        )
+    else:
+        vetorstore = FAISS.load_local(diretorio, embeddings, allow_dangerous_deserialization=True)
+    aplicar_parametros_busca(vetorstore.index, carregar_config_indice(diretorio))
+    return vetorstore
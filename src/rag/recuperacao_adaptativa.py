@@ -0,0 +1,211 @@
+import logging
+import re
+import unicodedata
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config.settings import (
+    K_RECUPERACAO,
+    K_CANDIDATOS,
+    K_MINIMO,
+    K_MAXIMO_POR_TIPO_PERGUNTA,
+    FATOR_SALTO_SCORE,
+    LAMBDA_MMR,
+    LIMIAR_DUPLICADO,
+    ORCAMENTO_TOKENS_CONTEXTO,
+    FATOR_AMPLIACAO_AGREGADA
+)
+
+# Palavras que indicam perguntas sobre o conjunto (respondidas pelos documentos [RESUMO])
+# ou que pedem listas longas. Comparadas sem acentos e em minúsculas.
+_PADRAO_AGREGADA = re.compile(
+    r"\b(media|medias|quantos|quantas|quantidade|total|contagem|ranking|distribuicao|proporcao|"
+    r"porcentagem|percentual|qual tipo|quais tipos|por tipo|mais comum|menos comum|categorias?)\b"
+)
+_PADRAO_LISTA = re.compile(r"\b(liste|listar|lista|todos|todas|quais pokemon|quais sao os|top \d+|compare|comparar)\b")
+_PALAVRAS_INICIAIS = {"Qual", "Quais", "Quem", "Quantos", "Quantas", "Como", "O", "A", "Os", "As", "Me", "Liste", "Pokémon", "Pokemon"}
+
+def _normalizar(texto: str) -> str:
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return sem_acentos.lower()
+
+def classificar_pergunta(pergunta: str) -> str:
+    """
+    Classifica a pergunta para escolher a profundidade da busca:
+    'agregada' (médias, contagens, rankings), 'lista', 'especifica' (cita um Pokémon) ou 'geral'.
+    """
+    texto = _normalizar(pergunta)
+    if _PADRAO_AGREGADA.search(texto):
+        return "agregada"
+    if _PADRAO_LISTA.search(texto):
+        return "lista"
+    nomes = [p for p in re.findall(r"\b[A-ZÀ-Ý][\wà-ÿ-]+", pergunta) if p not in _PALAVRAS_INICIAIS]
+    if nomes:
+        return "especifica"
+    return "geral"
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa de tokens sem depender do tokenizador do LLM (~4 caracteres por token)."""
+    return len(texto) // 4 + 1
+
+def cortar_por_salto(distancias: np.ndarray, k_minimo: int, k_maximo: int, fator: float = FATOR_SALTO_SCORE) -> int:
+    """
+    Escolhe quantos candidatos manter a partir das distâncias (em ordem crescente): corta no
+    primeiro salto, a partir de k_minimo, maior que `fator` vezes o salto médio anterior.
+    """
+    total = min(len(distancias), k_maximo)
+    if total <= k_minimo:
+        return total
+    saltos = np.diff(distancias[:total])
+    for posicao in range(k_minimo, total):
+        salto_medio = saltos[:posicao - 1].mean() if posicao > 1 else saltos[0]
+        if saltos[posicao - 1] > fator * max(salto_medio, 1e-6):
+            return posicao
+    return total
+
+def selecionar_mmr(
+    vetor_consulta: np.ndarray,
+    vetores: np.ndarray,
+    quantidade: int,
+    lambda_mmr: float = LAMBDA_MMR,
+    limiar_duplicado: float = LIMIAR_DUPLICADO
+) -> list[int]:
+    """
+    Seleciona até `quantidade` posições por Maximal Marginal Relevance, descartando
+    candidatos quase idênticos (similaridade >= limiar_duplicado) a algum já escolhido.
+    """
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    vetores = vetores / np.where(normas == 0, 1, normas)
+    consulta = vetor_consulta / (np.linalg.norm(vetor_consulta) or 1)
+    relevancia = vetores @ consulta
+    similaridades = vetores @ vetores.T
+
+    escolhidos: list[int] = []
+    restantes = list(range(len(vetores)))
+    while restantes and len(escolhidos) < quantidade:
+        if escolhidos:
+            redundancia = similaridades[np.ix_(restantes, escolhidos)].max(axis=1)
+        else:
+            redundancia = np.zeros(len(restantes))
+        pontuacoes = lambda_mmr * relevancia[restantes] - (1 - lambda_mmr) * redundancia
+        melhor = int(np.argmax(pontuacoes))
+        if redundancia[melhor] >= limiar_duplicado:
+            restantes.pop(melhor)  # Quase duplicado de um documento já escolhido
+            continue
+        escolhidos.append(restantes.pop(melhor))
+    return escolhidos
+
+def empacotar_contexto(docs: list[Document], orcamento_tokens: int = ORCAMENTO_TOKENS_CONTEXTO) -> list[Document]:
+    """Mantém os documentos, em ordem, até o orçamento de tokens (sempre ao menos um)."""
+    empacotados = []
+    usados = 0
+    for doc in docs:
+        tokens = estimar_tokens(doc.page_content)
+        if empacotados and usados + tokens > orcamento_tokens:
+            break
+        empacotados.append(doc)
+        usados += tokens
+    return empacotados
+
+class RecuperadorAdaptativo:
+    """
+    Recuperação com profundidade adaptativa, no lugar de um retriever com k fixo:
+
+    1. classifica a pergunta e busca K_CANDIDATOS vizinhos;
+    2. corta a lista no primeiro salto grande de distância (limitado pelo k do tipo de pergunta);
+    3. remove quase duplicados e diversifica com MMR;
+    4. empacota o contexto até ORCAMENTO_TOKENS_CONTEXTO.
+
+    Perguntas agregadas priorizam os documentos [RESUMO]. Expõe `invoke`, como um retriever do LangChain.
+    """
+
+    def __init__(
+        self,
+        vetorstore,
+        k_candidatos: int = K_CANDIDATOS,
+        k_minimo: int = K_MINIMO,
+        orcamento_tokens: int = ORCAMENTO_TOKENS_CONTEXTO
+    ):
+        self.vetorstore = vetorstore
+        self.k_candidatos = k_candidatos
+        self.k_minimo = k_minimo
+        self.orcamento_tokens = orcamento_tokens
+
+    def _reconstruir(self, ids: np.ndarray) -> np.ndarray | None:
+        """Lê os vetores dos candidatos do próprio índice (None se o tipo de índice não permitir)."""
+        try:
+            return np.vstack([self.vetorstore.index.reconstruct(int(i)) for i in ids])
+        except RuntimeError:
+            return None
+
+    def _diversificar(self, posicoes: list[int], ids: np.ndarray, docs: list, vetor_consulta: np.ndarray, quantidade: int) -> list[int]:
+        """MMR sobre os vetores do índice; sem eles, remove apenas os textos repetidos."""
+        vetores = self._reconstruir(ids[posicoes])
+        if vetores is not None:
+            return [posicoes[p] for p in selecionar_mmr(vetor_consulta, vetores, quantidade)]
+        vistos = set()
+        unicos = [p for p in posicoes if not (docs[p].page_content in vistos or vistos.add(docs[p].page_content))]
+        return unicos[:quantidade]
+
+    def selecionar(self, pergunta: str, vetor_consulta: np.ndarray, distancias: np.ndarray, ids: np.ndarray) -> list[Document]:
+        """Aplica corte, MMR e orçamento aos candidatos de uma pergunta já buscada no índice."""
+        distancias, ids = self._ampliar_se_sem_resumos(pergunta, vetor_consulta, distancias, ids)
+        validos = ids != -1  # Menos candidatos que vetores no índice
+        distancias, ids = distancias[validos], ids[validos]
+        tipo_pergunta = classificar_pergunta(pergunta)
+        k_maximo = K_MAXIMO_POR_TIPO_PERGUNTA.get(tipo_pergunta, K_RECUPERACAO)
+
+        docs = []
+        for i in ids:
+            doc = self.vetorstore.docstore.search(self.vetorstore.index_to_docstore_id[int(i)])
+            docs.append(doc if not isinstance(doc, str) else None)
+        posicoes = [p for p, doc in enumerate(docs) if doc is not None]
+        if tipo_pergunta == "agregada":
+            # Resumos primeiro; as linhas individuais só completam o k.
+            resumos = [p for p in posicoes if docs[p].metadata.get("tipo_documento") == "agregado"]
+            grupos = [resumos, [p for p in posicoes if p not in set(resumos)]]
+            k = k_maximo
+        else:
+            k = cortar_por_salto(distancias[posicoes], self.k_minimo, k_maximo)
+            grupos = [posicoes[:k]]  # O MMR só escolhe entre os candidatos antes do salto
+
+        ordem: list[int] = []
+        for grupo in grupos:
+            if len(ordem) < k and grupo:
+                ordem += self._diversificar(grupo, ids, docs, vetor_consulta, k - len(ordem))
+
+        selecionados = empacotar_contexto([docs[p] for p in ordem], self.orcamento_tokens)
+        logging.info(
+            f"Recuperação adaptativa: pergunta '{tipo_pergunta}', {len(posicoes)} candidatos, "
+            f"{len(selecionados)} documentos (~{sum(estimar_tokens(d.page_content) for d in selecionados)} tokens)."
+        )
+        return selecionados
+
+    def buscar_em_lote(self, perguntas: list[str]) -> list[list[Document]]:
+        """Uma chamada ao encoder e uma busca vetorial para todas as perguntas."""
+        vetores = np.array(self.vetorstore.embedding_function.embed_documents(perguntas), dtype="float32")
+        distancias, ids = self.vetorstore.index.search(vetores, self.k_candidatos)
+        return [self.selecionar(p, v, d, i) for p, v, d, i in zip(perguntas, vetores, distancias, ids)]
+
+    def invoke(self, pergunta: str) -> list[Document]:
+        vetor = np.array(self.vetorstore.embedding_function.embed_query(pergunta), dtype="float32")
+        distancias, ids = self.vetorstore.index.search(vetor[None, :], self.k_candidatos)
+        return self.selecionar(pergunta, vetor, distancias[0], ids[0])
+
+    def _ampliar_se_sem_resumos(self, pergunta, vetor_consulta, distancias, ids):
+        """
+        Em perguntas agregadas, se nenhum [RESUMO] está entre os candidatos (corpus grande, com
+        muitas linhas parecidas com a pergunta), busca de novo com mais candidatos, uma vez.
+        """
+        if classificar_pergunta(pergunta) != "agregada":
+            return distancias, ids
+        for i in ids:
+            if i != -1:
+                doc = self.vetorstore.docstore.search(self.vetorstore.index_to_docstore_id[int(i)])
+                if not isinstance(doc, str) and doc.metadata.get("tipo_documento") == "agregado":
+                    return distancias, ids
+        k_ampliado = min(self.k_candidatos * FATOR_AMPLIACAO_AGREGADA, self.vetorstore.index.ntotal)
+        if k_ampliado <= len(ids):
+            return distancias, ids
+        novas_distancias, novos_ids = self.vetorstore.index.search(vetor_consulta[None, :], k_ampliado)
+        return novas_distancias[0], novos_ids[0]
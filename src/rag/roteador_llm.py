@@ -0,0 +1,411 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.config.settings import (
+    PRAZO_LLM_S,
+    HEDGING_LLM,
+    PERCENTIL_HEDGING,
+    ATRASO_HEDGING_PADRAO_S,
+    AMOSTRAS_MINIMAS_HEDGING,
+    JANELA_LATENCIAS_LLM,
+    FALHAS_ABRIR_DISJUNTOR,
+    TEMPO_DISJUNTOR_ABERTO_S,
+    TRABALHADORES_ROTEADOR_LLM
+)
+
+class SemProvedorDisponivel(RuntimeError):
+    """Todos os provedores falharam ou estão com o disjuntor aberto."""
+
+class Disjuntor:
+    """
+    Circuit breaker de um provedor: após `limite_falhas` falhas consecutivas, o provedor
+    fica fora de uso ('aberto') por `tempo_aberto_s`. Depois disso, uma única chamada de
+    teste é liberada ('meio_aberto'); se ela funcionar o disjuntor fecha, senão abre de novo.
+    """
+
+    def __init__(
+        self,
+        limite_falhas: int = FALHAS_ABRIR_DISJUNTOR,
+        tempo_aberto_s: float = TEMPO_DISJUNTOR_ABERTO_S,
+        relogio: Callable[[], float] = time.monotonic
+    ):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto_s = tempo_aberto_s
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        self.estado = "fechado"
+        self.falhas_consecutivas = 0
+        self._aberto_em = 0.0
+
+    def permitir(self) -> bool:
+        """Indica se uma nova chamada pode ser feita (e reserva a chamada de teste, se for o caso)."""
+        with self._trava:
+            if self.estado == "fechado":
+                return True
+            if self.estado == "aberto" and self._relogio() - self._aberto_em >= self.tempo_aberto_s:
+                self.estado = "meio_aberto"
+                return True
+            return False  # Aberto, ou com a chamada de teste ainda em andamento
+
+    def registrar_sucesso(self) -> None:
+        with self._trava:
+            self.estado = "fechado"
+            self.falhas_consecutivas = 0
+
+    def liberar_teste(self) -> None:
+        """
+        Devolve a chamada de teste sem resultado (ex: cancelada): o disjuntor volta a 'aberto'
+        e libera outra chamada de teste depois de `tempo_aberto_s`. Fechado, não muda nada.
+        """
+        with self._trava:
+            if self.estado == "meio_aberto":
+                self.estado = "aberto"
+                self._aberto_em = self._relogio()
+
+    def registrar_falha(self) -> None:
+        with self._trava:
+            self.falhas_consecutivas += 1
+            if self.estado == "meio_aberto" or self.falhas_consecutivas >= self.limite_falhas:
+                if self.estado != "aberto":
+                    logging.warning(f"Disjuntor aberto após {self.falhas_consecutivas} falhas consecutivas.")
+                self.estado = "aberto"
+                self._aberto_em = self._relogio()
+
+class ProvedorLLM:
+    """
+    Um LLM (qualquer objeto com `invoke(prompt)`, como ChatGroq ou ChatOpenAI) com seu
+    disjuntor e as latências recentes, usadas para calcular o atraso do hedge.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        llm: Any,
+        disjuntor: Optional[Disjuntor] = None,
+        janela_latencias: int = JANELA_LATENCIAS_LLM,
+        atraso_padrao_s: float = ATRASO_HEDGING_PADRAO_S,
+        amostras_minimas: int = AMOSTRAS_MINIMAS_HEDGING
+    ):
+        self.nome = nome
+        self.llm = llm
+        self.disjuntor = disjuntor or Disjuntor()
+        self.atraso_padrao_s = atraso_padrao_s
+        self.amostras_minimas = amostras_minimas
+        self._latencias: deque = deque(maxlen=janela_latencias)
+        self._latencias_primeiro_token: deque = deque(maxlen=janela_latencias)
+        self._trava = threading.Lock()
+        self.contadores = {'chamadas': 0, 'sucessos': 0, 'falhas': 0, 'fora_do_prazo': 0}
+        self.ultimo_erro: Optional[str] = None
+
+    def invocar(self, prompt: Any, prazo_s: float) -> Any:
+        """Chama o LLM e registra o resultado. Respostas que passam do prazo contam como falha."""
+        inicio = time.monotonic()
+        with self._trava:
+            self.contadores['chamadas'] += 1
+        try:
+            resposta = self.llm.invoke(prompt)
+        except Exception as e:
+            with self._trava:
+                self.contadores['falhas'] += 1
+                self.ultimo_erro = f"{type(e).__name__}: {e}"
+            self.disjuntor.registrar_falha()
+            raise
+        latencia = time.monotonic() - inicio
+        with self._trava:
+            self._latencias.append(latencia)
+            if latencia > prazo_s:
+                self.contadores['fora_do_prazo'] += 1
+                self.ultimo_erro = f"Resposta em {latencia:.1f}s, acima do prazo de {prazo_s:.1f}s"
+            else:
+                self.contadores['sucessos'] += 1
+        if latencia > prazo_s:
+            self.disjuntor.registrar_falha()  # Um provedor lento demais conta como indisponível
+        else:
+            self.disjuntor.registrar_sucesso()
+        return resposta
+
+    def transmitir(self, prompt: Any, prazo_s: float, emitir: Callable[[str, Any], None], cancelado: threading.Event) -> None:
+        """
+        Transmite a resposta do LLM (`llm.stream`) pedaço a pedaço, chamando `emitir("token", texto)`
+        e, ao final, `emitir("fim", None)` ou `emitir("erro", excecao)`. Para de ler quando
+        `cancelado` é sinalizado (outro provedor venceu o hedge ou o cliente desistiu).
+        O tempo até o primeiro token acima do prazo conta como falha, como em `invocar`.
+        Cancelado depois de um primeiro token dentro do prazo, conta como sucesso; antes
+        disso, não há resultado e a chamada de teste do disjuntor (se era uma) é devolvida.
+        """
+        inicio = time.monotonic()
+        primeiro_token: Optional[float] = None
+        with self._trava:
+            self.contadores['chamadas'] += 1
+        try:
+            for pedaco in self.llm.stream(prompt):
+                if cancelado.is_set():
+                    if primeiro_token is not None and primeiro_token <= prazo_s:
+                        self.disjuntor.registrar_sucesso()
+                    else:
+                        self.disjuntor.liberar_teste()
+                    return
+                texto = getattr(pedaco, "content", pedaco)
+                if not texto:
+                    continue  # Alguns provedores abrem o stream com um pedaço vazio
+                if primeiro_token is None:
+                    primeiro_token = time.monotonic() - inicio
+                    with self._trava:
+                        self._latencias_primeiro_token.append(primeiro_token)
+                emitir("token", texto)
+        except Exception as e:
+            with self._trava:
+                self.contadores['falhas'] += 1
+                self.ultimo_erro = f"{type(e).__name__}: {e}"
+            self.disjuntor.registrar_falha()
+            emitir("erro", e)
+            return
+        with self._trava:
+            self._latencias.append(time.monotonic() - inicio)
+            if primeiro_token is not None and primeiro_token > prazo_s:
+                self.contadores['fora_do_prazo'] += 1
+                self.ultimo_erro = f"Primeiro token em {primeiro_token:.1f}s, acima do prazo de {prazo_s:.1f}s"
+            else:
+                self.contadores['sucessos'] += 1
+        if primeiro_token is not None and primeiro_token > prazo_s:
+            self.disjuntor.registrar_falha()
+        else:
+            self.disjuntor.registrar_sucesso()
+        emitir("fim", None)
+
+    def _amostras(self, primeiro_token: bool) -> List[float]:
+        with self._trava:
+            return list(self._latencias_primeiro_token if primeiro_token else self._latencias)
+
+    def percentil_latencia(self, percentil: float, primeiro_token: bool = False) -> Optional[float]:
+        latencias = self._amostras(primeiro_token)
+        return float(np.percentile(latencias, percentil)) if latencias else None
+
+    def atraso_hedging(self, percentil: float = PERCENTIL_HEDGING, primeiro_token: bool = False) -> float:
+        """
+        Quanto esperar por este provedor antes de disparar o próximo: o p95 das latências
+        recentes (ou do tempo até o primeiro token, no streaming).
+        """
+        if len(self._amostras(primeiro_token)) < self.amostras_minimas:
+            return self.atraso_padrao_s
+        return self.percentil_latencia(percentil, primeiro_token)
+
+    def saude(self) -> Dict[str, Any]:
+        p50, p95 = self.percentil_latencia(50), self.percentil_latencia(95)
+        p95_primeiro_token = self.percentil_latencia(95, primeiro_token=True)
+        return {
+            'provedor': self.nome,
+            'disjuntor': self.disjuntor.estado,
+            'falhas_consecutivas': self.disjuntor.falhas_consecutivas,
+            **self.contadores,
+            'latencia_p50_s': round(p50, 3) if p50 is not None else None,
+            'latencia_p95_s': round(p95, 3) if p95 is not None else None,
+            'primeiro_token_p95_s': round(p95_primeiro_token, 3) if p95_primeiro_token is not None else None,
+            'ultimo_erro': self.ultimo_erro
+        }
+
+class RoteadorLLM:
+    """
+    Distribui as chamadas entre provedores de LLM, na ordem de preferência:
+
+    - prazo: cada chamada tem um prazo total; esgotado, levanta TimeoutError;
+    - failover: se um provedor falha, o próximo é chamado na hora;
+    - hedging: se o provedor não responde dentro do seu p95, o próximo é disparado em
+      paralelo e vale a primeira resposta (a outra chamada é ignorada ao terminar);
+    - disjuntores: provedores com falhas seguidas são pulados até a chamada de teste.
+
+    Expõe `invoke` e `stream`, como um LLM do LangChain, então pode ser usado no lugar de um.
+    """
+
+    def __init__(
+        self,
+        provedores: List[ProvedorLLM],
+        prazo_s: float = PRAZO_LLM_S,
+        hedging: bool = HEDGING_LLM,
+        trabalhadores: int = TRABALHADORES_ROTEADOR_LLM
+    ):
+        if not provedores:
+            raise ValueError("O roteador precisa de ao menos um provedor.")
+        self.provedores = provedores
+        self.prazo_s = prazo_s
+        self.hedging = hedging
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="llm")
+        self._trava = threading.Lock()
+        self.contadores = {'chamadas': 0, 'hedges': 0, 'vitorias_hedge': 0, 'failovers': 0, 'prazos_esgotados': 0}
+
+    def _contar(self, chave: str) -> None:
+        with self._trava:
+            self.contadores[chave] += 1
+
+    def invoke(self, prompt: Any, prazo_s: Optional[float] = None) -> Any:
+        prazo_s = prazo_s if prazo_s is not None else self.prazo_s
+        inicio = time.monotonic()
+        limite = inicio + prazo_s
+        self._contar('chamadas')
+        restantes = list(self.provedores)
+        em_andamento: Dict[Any, ProvedorLLM] = {}
+        hedges: List[ProvedorLLM] = []
+        erros: List[str] = []
+
+        def _disparar() -> Optional[ProvedorLLM]:
+            while restantes:
+                provedor = restantes.pop(0)
+                if provedor.disjuntor.permitir():
+                    em_andamento[self._executor.submit(provedor.invocar, prompt, prazo_s)] = provedor
+                    return provedor
+                erros.append(f"{provedor.nome}: disjuntor aberto")
+            return None
+
+        def _agendar_hedge(provedor: Optional[ProvedorLLM]) -> float:
+            if provedor is None or not self.hedging or not restantes:
+                return float("inf")
+            return time.monotonic() + provedor.atraso_hedging()
+
+        proximo_hedge = _agendar_hedge(_disparar())
+        while em_andamento:
+            agora = time.monotonic()
+            if agora >= limite:
+                self._contar('prazos_esgotados')
+                raise TimeoutError(
+                    f"Nenhum provedor de LLM respondeu em {prazo_s:.1f}s "
+                    f"(aguardando: {', '.join(p.nome for p in em_andamento.values())})."
+                )
+            concluidos, _ = wait(em_andamento, timeout=min(limite, proximo_hedge) - agora, return_when=FIRST_COMPLETED)
+
+            for futuro in concluidos:
+                provedor = em_andamento.pop(futuro)
+                try:
+                    resposta = futuro.result()
+                except Exception as e:
+                    erros.append(f"{provedor.nome}: {type(e).__name__}: {e}")
+                    logging.warning(f"Provedor de LLM '{provedor.nome}' falhou: {e}")
+                    continue
+                if time.monotonic() > limite:
+                    continue  # Chegou depois do prazo (já contado como falha do provedor)
+                if provedor in hedges:
+                    self._contar('vitorias_hedge')
+                return resposta
+
+            if concluidos and not em_andamento:
+                proximo = _disparar()  # Failover: o provedor em andamento falhou
+                if proximo is not None:
+                    self._contar('failovers')
+                    logging.info(f"Failover para o provedor de LLM '{proximo.nome}'.")
+                proximo_hedge = _agendar_hedge(proximo)
+            elif not concluidos and time.monotonic() >= proximo_hedge:
+                proximo = _disparar()  # Hedge: o provedor em andamento passou do seu p95
+                if proximo is not None:
+                    hedges.append(proximo)
+                    self._contar('hedges')
+                    logging.info(f"Hedge: disparando também o provedor de LLM '{proximo.nome}'.")
+                proximo_hedge = _agendar_hedge(proximo)
+
+        raise SemProvedorDisponivel(f"Nenhum provedor de LLM disponível ({'; '.join(erros)}).")
+
+    def stream(self, prompt: Any, prazo_s: Optional[float] = None) -> Iterator[str]:
+        """
+        Gera os pedaços de texto da resposta à medida que chegam.
+
+        Failover e hedging valem até o primeiro token: o provedor que entregar o primeiro
+        token vence e os demais são cancelados. Depois disso não há como trocar de provedor
+        sem repetir texto, então um erro no meio da resposta é propagado. O prazo vale para o
+        primeiro token e, depois, para o intervalo entre tokens (TimeoutError).
+        """
+        prazo_s = prazo_s if prazo_s is not None else self.prazo_s
+        self._contar('chamadas')
+        fila: queue.Queue = queue.Queue()
+        restantes = list(self.provedores)
+        cancelamentos: Dict[ProvedorLLM, threading.Event] = {}
+        ativos: List[ProvedorLLM] = []
+        hedges: List[ProvedorLLM] = []
+        erros: List[str] = []
+        vencedor: Optional[ProvedorLLM] = None
+
+        def _disparar() -> Optional[ProvedorLLM]:
+            while restantes:
+                provedor = restantes.pop(0)
+                if provedor.disjuntor.permitir():
+                    cancelamentos[provedor] = threading.Event()
+                    ativos.append(provedor)
+                    self._executor.submit(
+                        provedor.transmitir, prompt, prazo_s,
+                        lambda tipo, valor, p=provedor: fila.put((p, tipo, valor)), cancelamentos[provedor]
+                    )
+                    return provedor
+                erros.append(f"{provedor.nome}: disjuntor aberto")
+            return None
+
+        def _agendar_hedge(provedor: Optional[ProvedorLLM]) -> float:
+            if provedor is None or not self.hedging or not restantes:
+                return float("inf")
+            return time.monotonic() + provedor.atraso_hedging(primeiro_token=True)
+
+        try:
+            proximo_hedge = _agendar_hedge(_disparar())
+            limite = time.monotonic() + prazo_s
+            while ativos:
+                agora = time.monotonic()
+                if agora >= limite:
+                    self._contar('prazos_esgotados')
+                    etapa = "o primeiro token" if vencedor is None else "o próximo token"
+                    raise TimeoutError(f"Nenhum provedor de LLM enviou {etapa} em {prazo_s:.1f}s.")
+                try:
+                    provedor, tipo, valor = fila.get(timeout=min(limite, proximo_hedge) - agora)
+                except queue.Empty:
+                    if vencedor is None and time.monotonic() >= proximo_hedge:
+                        proximo = _disparar()  # Hedge: o primeiro token passou do p95 do provedor
+                        if proximo is not None:
+                            hedges.append(proximo)
+                            self._contar('hedges')
+                            logging.info(f"Hedge: disparando também o provedor de LLM '{proximo.nome}' (streaming).")
+                        proximo_hedge = _agendar_hedge(proximo)
+                    continue
+                if vencedor is not None and provedor is not vencedor:
+                    continue  # Resto de um provedor que perdeu a corrida
+
+                if tipo == "erro":
+                    ativos.remove(provedor)
+                    if provedor is vencedor:
+                        raise valor  # Parte da resposta já foi entregue
+                    erros.append(f"{provedor.nome}: {type(valor).__name__}: {valor}")
+                    logging.warning(f"Provedor de LLM '{provedor.nome}' falhou: {valor}")
+                    if not ativos:
+                        proximo = _disparar()  # Failover antes do primeiro token
+                        if proximo is not None:
+                            self._contar('failovers')
+                            logging.info(f"Failover para o provedor de LLM '{proximo.nome}' (streaming).")
+                        proximo_hedge = _agendar_hedge(proximo)
+                    continue
+
+                if vencedor is None:
+                    vencedor = provedor
+                    for outro, cancelado in cancelamentos.items():
+                        if outro is not vencedor:
+                            cancelado.set()
+                    if provedor in hedges:
+                        self._contar('vitorias_hedge')
+                if tipo == "fim":
+                    return
+                limite = time.monotonic() + prazo_s
+                yield valor
+
+            raise SemProvedorDisponivel(f"Nenhum provedor de LLM disponível ({'; '.join(erros)}).")
+        finally:
+            for cancelado in cancelamentos.values():
+                cancelado.set()  # Também quando quem consome o stream desiste no meio
+
+    def saude(self) -> Dict[str, Any]:
+        """Estado dos disjuntores, latências e contadores de cada provedor e do roteador."""
+        with self._trava:
+            contadores = dict(self.contadores)
+        return {'provedores': [p.saude() for p in self.provedores], 'roteador': contadores}
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,2 +1,2 @@
-from .cache import salvar_cache_json, carregar_cache_json
+from .cache import salvar_cache_json, salvar_cache_json_em_fluxo, carregar_cache_json, iterar_cache_json
 from .logger import configurar_logs
\ No newline at end of file
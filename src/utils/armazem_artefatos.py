@@ -0,0 +1,274 @@
+# armazem_artefatos.py
+# Armazenamento limitado dos arquivos gerados pelo chat, com índice, namespaces por sessão e remoção LRU.
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.settings import (
+    SESSAO_PADRAO_CHAT,
+    LIMITE_BYTES_ARTEFATOS_CHAT,
+    LIMITE_ARQUIVOS_ARTEFATOS_CHAT,
+    IDADE_MAXIMA_ARTEFATOS_CHAT_S
+)
+
+ARQUIVO_INDICE_ARTEFATOS = "indice.json"
+_PADRAO_SESSAO = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+def validar_sessao(sessao: Optional[str]) -> str:
+    """
+    Retorna a sessão (ou SESSAO_PADRAO_CHAT se vazia).
+
+    Raises:
+        ValueError: Se a sessão tiver caracteres fora de [A-Za-z0-9_-] ou mais de 64 caracteres.
+    """
+    sessao = sessao or SESSAO_PADRAO_CHAT
+    if not _PADRAO_SESSAO.match(sessao):
+        raise ValueError("Sessão inválida: use até 64 letras, números, '_' ou '-'.")
+    return sessao
+
+class ArmazemArtefatos:
+    """
+    Guarda os arquivos de um diretório do chat em <diretorio>/<sessao>/<nome>, com um índice
+    (<diretorio>/indice.json) de tamanho, criação e último acesso de cada arquivo.
+
+    Ao registrar um arquivo, os limites são aplicados: arquivos criados há mais de
+    `idade_maxima_s` são removidos e, enquanto o total passar de `max_bytes` ou de
+    `max_arquivos`, sai o arquivo acessado há mais tempo (LRU). Listagens e buscas usam
+    o índice em vez de listar o diretório, então o custo por pergunta não cresce com o
+    tempo de uso.
+
+    O índice fica em memória e é relido se outro processo o alterou. A gravação não é
+    coordenada entre processos: `reconciliar` (chamada ao iniciar) corrige o índice com o
+    que existe no disco.
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        max_bytes: int = LIMITE_BYTES_ARTEFATOS_CHAT,
+        max_arquivos: int = LIMITE_ARQUIVOS_ARTEFATOS_CHAT,
+        idade_maxima_s: Optional[float] = IDADE_MAXIMA_ARTEFATOS_CHAT_S,
+        relogio: Callable[[], float] = time.time
+    ):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.max_arquivos = max_arquivos
+        self.idade_maxima_s = idade_maxima_s
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        self._artefatos: Dict[str, Dict[str, Any]] = {}
+        self._mtime_indice: Optional[int] = None
+
+    @property
+    def caminho_indice(self) -> str:
+        return os.path.join(self.diretorio, ARQUIVO_INDICE_ARTEFATOS)
+
+    # --- Índice ---
+
+    def _carregar(self) -> None:
+        """Relê o índice se ele mudou no disco desde a última leitura (ou gravação) deste processo."""
+        try:
+            mtime = os.stat(self.caminho_indice).st_mtime_ns
+        except FileNotFoundError:
+            if self._mtime_indice is not None:
+                self._artefatos, self._mtime_indice = {}, None  # Removido por outro processo
+            return
+        if mtime == self._mtime_indice:
+            return
+        try:
+            with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                self._artefatos = json.load(f).get("artefatos", {})
+        except (OSError, ValueError) as e:
+            logging.warning(f"Índice de artefatos ilegível em {self.caminho_indice} ({e}); reconstruindo.")
+            self._artefatos = {}
+            self._reconciliar()
+            return
+        self._mtime_indice = mtime
+
+    def _salvar(self) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = f"{self.caminho_indice}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"artefatos": self._artefatos}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_indice)
+        self._mtime_indice = os.stat(self.caminho_indice).st_mtime_ns
+
+    def _chave(self, caminho: str) -> str:
+        return os.path.relpath(caminho, self.diretorio).replace(os.sep, "/")
+
+    def _caminho_da_chave(self, chave: str) -> str:
+        return os.path.join(self.diretorio, *chave.split("/"))
+
+    # --- Limites ---
+
+    def _remover(self, chave: str, motivo: str) -> None:
+        self._artefatos.pop(chave, None)
+        try:
+            os.remove(self._caminho_da_chave(chave))
+        except FileNotFoundError:
+            pass
+        logging.info(f"Artefato do chat removido ({motivo}): {chave}")
+
+    def _aplicar_limites(self, preservar: Optional[str] = None) -> None:
+        if self.idade_maxima_s is not None:
+            limite = self._relogio() - self.idade_maxima_s
+            for chave in [c for c, a in self._artefatos.items() if a['criado_em'] < limite and c != preservar]:
+                self._remover(chave, "idade")
+        total_bytes = sum(a['bytes'] for a in self._artefatos.values())
+        if total_bytes <= self.max_bytes and len(self._artefatos) <= self.max_arquivos:
+            return
+        for chave in sorted(self._artefatos, key=lambda c: self._artefatos[c]['acessado_em']):
+            if total_bytes <= self.max_bytes and len(self._artefatos) <= self.max_arquivos:
+                break
+            if chave == preservar:
+                continue  # O arquivo recém-registrado fica, mesmo sozinho acima do limite
+            total_bytes -= self._artefatos[chave]['bytes']
+            self._remover(chave, "limite de espaço")
+
+    # --- Operações ---
+
+    def caminho(self, nome: str, sessao: Optional[str] = None) -> str:
+        """Caminho onde gravar um novo artefato da sessão (o diretório é criado). Chame `registrar` depois."""
+        diretorio = os.path.join(self.diretorio, validar_sessao(sessao))
+        os.makedirs(diretorio, exist_ok=True)
+        return os.path.join(diretorio, os.path.basename(nome))
+
+    def registrar(self, caminho: str, regravado: bool = False) -> None:
+        """
+        Adiciona (ou atualiza) um arquivo já gravado no índice e aplica os limites. Com
+        `regravado` (ex: um histórico que recebeu novas entradas), a idade volta a contar de agora.
+        """
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return
+        chave = self._chave(caminho)
+        sessao, _, nome = chave.rpartition("/")
+        agora = self._relogio()
+        with self._trava:
+            self._carregar()
+            anterior = self._artefatos.get(chave, {})
+            self._artefatos[chave] = {
+                'sessao': sessao,
+                'nome': nome,
+                'bytes': tamanho,
+                'criado_em': agora if regravado else anterior.get('criado_em', agora),
+                'acessado_em': agora
+            }
+            self._aplicar_limites(preservar=chave)
+            self._salvar()
+
+    def tocar(self, caminho: str) -> None:
+        """Marca o artefato como usado agora (fica por último na fila de remoção)."""
+        chave = self._chave(caminho)
+        with self._trava:
+            self._carregar()
+            if chave in self._artefatos:
+                self._artefatos[chave]['acessado_em'] = self._relogio()
+                self._salvar()
+
+    def localizar(self, nome: str, sessao: Optional[str] = None) -> Optional[str]:
+        """Caminho de um artefato pelo nome (na sessão, se informada), marcando o acesso. None se não existir."""
+        nome = os.path.basename(nome)
+        with self._trava:
+            self._carregar()
+            candidatos = [
+                chave for chave, artefato in self._artefatos.items()
+                if artefato['nome'] == nome and (sessao is None or artefato['sessao'] == sessao)
+            ]
+        for chave in candidatos:
+            caminho = self._caminho_da_chave(chave)
+            if os.path.exists(caminho):
+                self.tocar(caminho)
+                return caminho
+        return None
+
+    def listar(self, sessao: Optional[str] = None, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Artefatos (da sessão, se informada) do mais recente para o mais antigo, com o 'caminho' de cada um."""
+        with self._trava:
+            self._carregar()
+            artefatos = [
+                {**artefato, 'caminho': self._caminho_da_chave(chave)}
+                for chave, artefato in self._artefatos.items()
+                if sessao is None or artefato['sessao'] == sessao
+            ]
+        artefatos.sort(key=lambda a: a['criado_em'], reverse=True)
+        return artefatos[:limite] if limite is not None else artefatos
+
+    def remover_sessao(self, sessao: str) -> int:
+        """Remove todos os artefatos de uma sessão. Retorna quantos foram removidos."""
+        sessao = validar_sessao(sessao)
+        with self._trava:
+            self._carregar()
+            chaves = [c for c, a in self._artefatos.items() if a['sessao'] == sessao]
+            for chave in chaves:
+                self._remover(chave, f"sessão '{sessao}' limpa")
+            self._salvar()
+        shutil.rmtree(os.path.join(self.diretorio, sessao), ignore_errors=True)
+        return len(chaves)
+
+    def limpar(self) -> None:
+        """Remove o diretório inteiro, com o índice."""
+        with self._trava:
+            shutil.rmtree(self.diretorio, ignore_errors=True)
+            self._artefatos, self._mtime_indice = {}, None
+
+    def _reconciliar(self) -> None:
+        if not os.path.isdir(self.diretorio):
+            return
+        encontrados = {}
+        for entrada in os.scandir(self.diretorio):
+            if entrada.is_file() and entrada.name != ARQUIVO_INDICE_ARTEFATOS and not entrada.name.endswith(".tmp"):
+                # Arquivos soltos na raiz (de antes dos namespaces) vão para a sessão padrão
+                destino = self.caminho(entrada.name, SESSAO_PADRAO_CHAT)
+                os.replace(entrada.path, destino)
+                encontrados[self._chave(destino)] = os.stat(destino)
+            elif entrada.is_dir():
+                for arquivo in os.scandir(entrada.path):
+                    if arquivo.is_file() and not arquivo.name.endswith(".tmp"):
+                        encontrados[self._chave(arquivo.path)] = arquivo.stat()
+        for chave in list(self._artefatos):
+            if chave not in encontrados:
+                self._artefatos.pop(chave)  # Removido fora do armazém
+        for chave, estado in encontrados.items():
+            if chave not in self._artefatos:
+                sessao, _, nome = chave.rpartition("/")
+                self._artefatos[chave] = {
+                    'sessao': sessao, 'nome': nome, 'bytes': estado.st_size,
+                    'criado_em': estado.st_mtime, 'acessado_em': estado.st_mtime
+                }
+        self._aplicar_limites()
+        self._salvar()
+
+    def reconciliar(self) -> None:
+        """
+        Acerta o índice com o disco (uma varredura completa): adota arquivos que não estão no
+        índice, esquece os que sumiram e aplica os limites. Feita ao iniciar a API ou o chat.
+        """
+        with self._trava:
+            self._carregar()
+            self._reconciliar()
+
+    def estado(self) -> Dict[str, Any]:
+        with self._trava:
+            self._carregar()
+            artefatos = list(self._artefatos.values())
+        return {
+            'diretorio': self.diretorio,
+            'arquivos': len(artefatos),
+            'bytes': sum(a['bytes'] for a in artefatos),
+            'sessoes': len({a['sessao'] for a in artefatos}),
+            'limites': {'bytes': self.max_bytes, 'arquivos': self.max_arquivos, 'idade_s': self.idade_maxima_s}
+        }
+
+@lru_cache(maxsize=None)
+def obter_armazem(diretorio: str) -> ArmazemArtefatos:
+    """Um armazém por diretório em cada processo (o índice em memória é compartilhado)."""
+    return ArmazemArtefatos(diretorio)
@@ -1,48 +1,305 @@
 # cache.py
 # Funções para manipulação de cache
 
+import gc
+import gzip
+import io
 import logging
 import os
 import json
-from typing import Any, Optional, List, Dict, Union
+import tempfile
+from typing import Any, Optional, List, Dict, Union, Iterable, Iterator, BinaryIO
 
-def salvar_cache_json(dados: Union[List[Any], Dict[str, Any]], caminho: str) -> None:
+try:
+    import orjson
+except ImportError:  # Backend opcional; o json da biblioteca padrão é usado como fallback
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Compressão zstd é opcional
+    zstandard = None
+
+from src.config.settings import COMPRESSAO_CACHE
+
+_ERROS_ZSTD = (zstandard.ZstdError,) if zstandard is not None else ()
+
+def _modo_padrao_arquivos() -> int:
+    """As permissões de um arquivo criado com open(..., "w"): 0o666 sem os bits da umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# Lida uma vez: o mkstemp cria o temporário com 0o600, e o os.replace manteria esse modo.
+_MODO_ARQUIVOS = _modo_padrao_arquivos()
+
+_ASSINATURA_GZIP = b"\x1f\x8b"
+_ASSINATURA_ZSTD = b"\x28\xb5\x2f\xfd"
+_TAMANHO_BLOCO_LEITURA = 1 << 16
+
+def _inferir_compressao(caminho: str, compressao: Optional[str]) -> Optional[str]:
+    """Define a compressão pelo parâmetro, pela extensão do arquivo ou pela configuração."""
+    if compressao:
+        return compressao
+    if caminho.endswith(".gz"):
+        return "gzip"
+    if caminho.endswith(".zst"):
+        return "zstd"
+    return COMPRESSAO_CACHE
+
+def serializar_json(dados: Any, compacto: bool = True) -> bytes:
+    """Serializa em JSON UTF-8 (o mesmo formato gravado nos caches), usando orjson quando disponível."""
+    if orjson is not None:
+        opcoes = orjson.OPT_NON_STR_KEYS | (0 if compacto else orjson.OPT_INDENT_2)
+        return orjson.dumps(dados, option=opcoes)
+    if compacto:
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(dados, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _desserializar(conteudo: bytes, pausar_gc: bool = False) -> Any:
+    """
+    Desserializa JSON UTF-8, usando orjson quando disponível.
+    Com `pausar_gc`, o coletor de lixo fica pausado durante a leitura: caches grandes criam
+    milhões de objetos de uma vez, e as coletas disparadas no meio dobram o tempo de carga.
+    """
+    if not pausar_gc:
+        if orjson is not None:
+            return orjson.loads(conteudo)
+        return json.loads(conteudo)
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        if orjson is not None:
+            return orjson.loads(conteudo)
+        return json.loads(conteudo)
+    finally:
+        if gc_ativo:
+            gc.enable()
+
+def _comprimir(conteudo: bytes, compressao: Optional[str]) -> bytes:
+    if compressao == "gzip":
+        return gzip.compress(conteudo, compresslevel=6)
+    if compressao == "zstd":
+        if zstandard is None:
+            logging.warning("Pacote 'zstandard' não instalado. O cache será salvo sem compressão.")
+            return conteudo
+        return zstandard.ZstdCompressor(level=3).compress(conteudo)
+    return conteudo
+
+def _abrir_leitura(caminho: str) -> BinaryIO:
+    """
+    Abre o cache para leitura binária, descomprimindo conforme a assinatura do arquivo.
+    Assim um cache continua legível mesmo que a configuração de compressão mude.
+    """
+    arquivo = open(caminho, "rb")
+    assinatura = arquivo.read(4)
+    arquivo.seek(0)
+    if assinatura.startswith(_ASSINATURA_GZIP):
+        return gzip.GzipFile(fileobj=arquivo, mode="rb")
+    if assinatura == _ASSINATURA_ZSTD:
+        if zstandard is None:
+            arquivo.close()
+            raise IOError("Cache comprimido com zstd, mas o pacote 'zstandard' não está instalado.")
+        return zstandard.ZstdDecompressor().stream_reader(arquivo, closefd=True)
+    return arquivo
+
+def _escrever_atomico(conteudo: bytes, caminho: str) -> None:
+    """Grava em um arquivo temporário no mesmo diretório e o renomeia sobre o destino."""
+    diretorio = os.path.dirname(caminho) or "."
+    descritor, caminho_temp = tempfile.mkstemp(dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.chmod(caminho_temp, _MODO_ARQUIVOS)
+        os.replace(caminho_temp, caminho)
+    except BaseException:
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        raise
+
+def _abrir_escrita(arquivo: BinaryIO, compressao: Optional[str]) -> BinaryIO:
+    """Envolve o arquivo de destino com o compressor de fluxo correspondente."""
+    if compressao == "gzip":
+        return gzip.GzipFile(fileobj=arquivo, mode="wb", compresslevel=6)
+    if compressao == "zstd":
+        if zstandard is None:
+            logging.warning("Pacote 'zstandard' não instalado. O cache será salvo sem compressão.")
+            return arquivo
+        return zstandard.ZstdCompressor(level=3).stream_writer(arquivo, closefd=False)
+    return arquivo
+
+def salvar_cache_json(
+    dados: Union[List[Any], Dict[str, Any]],
+    caminho: str,
+    compressao: Optional[str] = None,
+    compacto: bool = True
+) -> None:
     """
     Salva uma estrutura de dados (lista ou dicionário) em um arquivo JSON.
 
+    A escrita é atômica (arquivo temporário + rename): uma falha no meio da gravação
+    mantém o cache anterior intacto.
+
     Args:
         dados (Union[List[Any], Dict[str, Any]]): Os dados a serem salvos.
         caminho (str): O caminho do arquivo JSON de destino.
+        compressao (Optional[str]): 'gzip', 'zstd' ou None. Se None, é inferida pela
+            extensão (.gz, .zst) ou por COMPRESSAO_CACHE.
+        compacto (bool): Se False, grava o JSON indentado (mais legível e maior).
     """
-    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
     try:
-        with open(caminho, "w", encoding="utf-8") as arquivo:
-            json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+        conteudo = _comprimir(serializar_json(dados, compacto), _inferir_compressao(caminho, compressao))
+        _escrever_atomico(conteudo, caminho)
         logging.info(f"Cache salvo com sucesso em: {caminho}")
     except TypeError as e:
         logging.error(f"Erro de serialização ao salvar cache JSON: {e}")
     except IOError as e:
         logging.error(f"Erro de I/O ao salvar cache JSON em {caminho}: {e}")
 
-def carregar_cache_json(caminho: str) -> Optional[Union[List[Any], Dict[str, Any]]]:
+def salvar_cache_json_em_fluxo(elementos: Iterable[Any], caminho: str, compressao: Optional[str] = None) -> int:
+    """
+    Salva os elementos de um iterável como uma lista JSON compacta, um por vez.
+
+    É o par de escrita de `iterar_cache_json`: os elementos não são materializados em
+    uma lista, então geradores muito grandes podem ir direto para o disco. A escrita
+    também é atômica.
+
+    Args:
+        elementos (Iterable[Any]): Os elementos da lista, na ordem em que serão gravados.
+        caminho (str): O caminho do arquivo JSON de destino.
+        compressao (Optional[str]): 'gzip', 'zstd' ou None. Se None, é inferida pela
+            extensão (.gz, .zst) ou por COMPRESSAO_CACHE.
+
+    Returns:
+        int: O número de elementos gravados.
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    diretorio = os.path.dirname(caminho) or "."
+    descritor, caminho_temp = tempfile.mkstemp(dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix=".tmp")
+    total = 0
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            saida = _abrir_escrita(arquivo, _inferir_compressao(caminho, compressao))
+            saida.write(b"[")
+            for elemento in elementos:
+                if total:
+                    saida.write(b",")
+                saida.write(serializar_json(elemento, compacto=True))
+                total += 1
+            saida.write(b"]")
+            if saida is not arquivo:
+                saida.close()  # Finaliza o quadro comprimido sem fechar o arquivo
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.chmod(caminho_temp, _MODO_ARQUIVOS)
+        os.replace(caminho_temp, caminho)
+    except BaseException:
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        raise
+    logging.info(f"Cache salvo em fluxo com sucesso em: {caminho} ({total} elementos)")
+    return total
+
+def carregar_cache_json(caminho: str, pausar_gc: bool = False) -> Optional[Union[List[Any], Dict[str, Any]]]:
     """
     Carrega dados de um arquivo JSON de cache, se ele existir e for válido.
+    Arquivos comprimidos com gzip ou zstd são detectados automaticamente.
 
     Args:
         caminho (str): O caminho do arquivo JSON a ser carregado.
+        pausar_gc (bool): Pausa o coletor de lixo durante a leitura. A pausa vale para o
+            processo inteiro, então só deve ser usada por quem roda em uma única thread.
 
     Returns:
         Optional[Union[List[Any], Dict[str, Any]]]: Os dados carregados ou None se o arquivo não existir ou ocorrer um erro.
     """
     if not os.path.exists(caminho):
         return None
-    
+
     try:
-        with open(caminho, "r", encoding="utf-8") as arquivo:
-            return json.load(arquivo)
-    except json.JSONDecodeError as e:
+        with _abrir_leitura(caminho) as arquivo:
+            return _desserializar(arquivo.read(), pausar_gc)
+    except ValueError as e:  # json.JSONDecodeError e orjson.JSONDecodeError herdam de ValueError
         logging.warning(f"Erro ao decodificar JSON do cache {caminho}: {e}. O cache será ignorado.")
         return None
-    except IOError as e:
+    except (IOError, EOFError, *_ERROS_ZSTD) as e:  # Inclui gzip ou zstd corrompido
         logging.error(f"Erro de I/O ao carregar cache JSON de {caminho}: {e}")
         return None
+
+def iterar_cache_json(caminho: str) -> Iterator[Any]:
+    """
+    Lê um cache cujo conteúdo é uma lista JSON, devolvendo um elemento por vez.
+
+    Apenas um bloco do arquivo e o elemento atual ficam em memória, o que permite
+    percorrer caches muito grandes sem carregá-los inteiros.
+
+    Args:
+        caminho (str): O caminho do arquivo JSON (comprimido ou não).
+
+    Yields:
+        Any: Cada elemento da lista, na ordem do arquivo.
+
+    Raises:
+        ValueError: Se o arquivo não contiver uma lista JSON válida.
+    """
+    decodificador = json.JSONDecoder()
+    with _abrir_leitura(caminho) as bruto:
+        leitor = io.TextIOWrapper(bruto, encoding="utf-8")
+        buffer = ""
+        posicao = 0
+        fim_arquivo = False
+
+        def _ler_mais() -> bool:
+            nonlocal buffer, posicao, fim_arquivo
+            bloco = leitor.read(_TAMANHO_BLOCO_LEITURA)
+            if not bloco:
+                fim_arquivo = True
+                return False
+            buffer = buffer[posicao:] + bloco
+            posicao = 0
+            return True
+
+        def _proximo_caractere() -> Optional[str]:
+            nonlocal posicao
+            while True:
+                while posicao < len(buffer) and buffer[posicao].isspace():
+                    posicao += 1
+                if posicao < len(buffer):
+                    return buffer[posicao]
+                if not _ler_mais():
+                    return None
+
+        if _proximo_caractere() != "[":
+            raise ValueError(f"O cache {caminho} não contém uma lista JSON.")
+        posicao += 1
+
+        primeiro = True
+        while True:
+            caractere = _proximo_caractere()
+            if caractere == "]":
+                return
+            if caractere is None:
+                raise ValueError(f"Fim inesperado do cache {caminho}.")
+            if not primeiro:
+                if caractere != ",":
+                    raise ValueError(f"Separador inválido no cache {caminho} (posição {posicao}).")
+                posicao += 1
+                _proximo_caractere()
+            primeiro = False
+
+            while True:
+                try:
+                    elemento, fim = decodificador.raw_decode(buffer, posicao)
+                except json.JSONDecodeError:
+                    if _ler_mais():
+                        continue
+                    raise
+                # Um elemento que termina no fim do buffer pode estar incompleto (ex: número cortado).
+                if fim == len(buffer) and not fim_arquivo and _ler_mais():
+                    continue
+                posicao = fim
+                break
+            yield elemento
@@ -1,29 +1,173 @@
 # logger.py
-# Funções para configuração de logging 
+# Funções para configuração de logging
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+from datetime import datetime
 from typing import Any, Optional, List, Dict, Union
 
-from src.config.settings import CAMINHO_LOG
+from src.config.settings import (
+    CAMINHO_LOG,
+    NIVEL_LOG,
+    NIVEIS_LOG_POR_MODULO,
+    LOG_ASSINCRONO,
+    LOG_FORMATO_JSON,
+    LOG_ROTACAO,
+    LOG_TAMANHO_MAXIMO_MB,
+    LOG_ROTACAO_QUANDO,
+    LOG_ARQUIVOS_BACKUP
+)
 
-def configurar_logs(caminho_log: str = CAMINHO_LOG) -> None:
+FORMATO_TEXTO = "%(asctime)s [%(levelname)s] %(message)s"
+
+_ouvinte: Optional[logging.handlers.QueueListener] = None
+_configuracao_atual: Optional[tuple] = None
+
+# Atributos padrão de um LogRecord; o que não estiver aqui veio de `extra=` e vai para o JSON.
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como uma linha JSON, incluindo os campos passados em `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'modulo': record.module,
+            'thread': record.threadName,
+            'mensagem': record.getMessage()
+        }
+        if record.exc_info:
+            registro['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:  # Já formatada pelo HandlerFila (modo assíncrono)
+            registro['excecao'] = record.exc_text
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                registro[chave] = valor
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """
+    QueueHandler que mantém o traceback fora da mensagem. O `prepare` padrão junta a exceção
+    ao texto e apaga `exc_info`, e o JSON perderia o campo 'excecao'; aqui o traceback vai
+    formatado em `exc_text`, que os formatadores de texto acrescentam à mensagem.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None  # Tracebacks não são serializáveis; o texto basta
+        return record
+
+class FiltroNivelPorModulo(logging.Filter):
+    """
+    Aplica níveis por módulo às mensagens emitidas com `logging.info(...)` direto no logger
+    raiz, que é como o projeto registra logs: o módulo é identificado pelo arquivo de origem.
+    """
+
+    def __init__(self, niveis: Dict[str, int]):
+        super().__init__()
+        self.niveis = niveis
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        nivel = self.niveis.get(record.module) if record.name == "root" else None
+        return nivel is None or record.levelno >= nivel
+
+def _criar_handler_arquivo(caminho_log: str, rotacao: Optional[str]) -> logging.Handler:
+    if rotacao == "tamanho":
+        return logging.handlers.RotatingFileHandler(
+            caminho_log, maxBytes=int(LOG_TAMANHO_MAXIMO_MB * 1024 * 1024),
+            backupCount=LOG_ARQUIVOS_BACKUP, encoding="utf-8"
+        )
+    if rotacao == "tempo":
+        return logging.handlers.TimedRotatingFileHandler(
+            caminho_log, when=LOG_ROTACAO_QUANDO, backupCount=LOG_ARQUIVOS_BACKUP, encoding="utf-8"
+        )
+    return logging.FileHandler(caminho_log, encoding="utf-8")
+
+def parar_logs() -> None:
+    """Esvazia a fila de logs e encerra a thread de escrita, se o modo assíncrono estiver ativo."""
+    global _ouvinte, _configuracao_atual
+    _configuracao_atual = None
+    if _ouvinte is not None:
+        _ouvinte.stop()
+        for handler in _ouvinte.handlers:
+            handler.close()
+        _ouvinte = None
+
+atexit.register(parar_logs)
+
+def configurar_logs(
+    caminho_log: str = CAMINHO_LOG,
+    assincrono: bool = LOG_ASSINCRONO,
+    formato_json: bool = LOG_FORMATO_JSON,
+    rotacao: Optional[str] = LOG_ROTACAO,
+    niveis_por_modulo: Optional[Dict[str, str]] = None
+) -> None:
     """
     Configura o sistema de logs para salvar em arquivo e mostrar no console.
 
+    No modo assíncrono, quem registra a mensagem apenas a coloca em uma fila
+    (QueueHandler); uma thread (QueueListener) formata e escreve no arquivo e no console,
+    então os workers da extração e as requisições da API não disputam o I/O de log.
+
     Args:
         caminho_log (str): O caminho para o arquivo de log.
+        assincrono (bool): Se deve escrever os logs em uma thread separada.
+        formato_json (bool): Se o arquivo deve receber uma linha JSON por registro.
+        rotacao (Optional[str]): 'tamanho', 'tempo' ou None (sem rotação).
+        niveis_por_modulo (Optional[Dict[str, str]]): Nível mínimo por módulo (ex:
+            {'extractor': 'WARNING'}) ou por logger nomeado (ex: {'urllib3': 'ERROR'}).
+            Se None, usa NIVEIS_LOG_POR_MODULO.
     """
+    global _ouvinte, _configuracao_atual
+    niveis = niveis_por_modulo if niveis_por_modulo is not None else NIVEIS_LOG_POR_MODULO
+    configuracao = (caminho_log, assincrono, formato_json, rotacao, tuple(sorted(niveis.items())))
+    # Chamadas repetidas (ex: cada execução do pipeline pela API) não recriam os handlers,
+    # para não haver uma janela sem logs enquanto outras threads registram mensagens.
+    if configuracao == _configuracao_atual and logging.root.handlers:
+        return
+
     os.makedirs(os.path.dirname(caminho_log), exist_ok=True)
-    
+    parar_logs()
+
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
-        
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(caminho_log, encoding="utf-8"),
-            logging.StreamHandler()
-        ]
-    )
+        handler.close()
+
+    handler_arquivo = _criar_handler_arquivo(caminho_log, rotacao)
+    handler_arquivo.setFormatter(FormatadorJSON() if formato_json else logging.Formatter(FORMATO_TEXTO))
+    handler_console = logging.StreamHandler()
+    handler_console.setFormatter(logging.Formatter(FORMATO_TEXTO))
+
+    niveis_modulos = {}
+    for nome, nivel in niveis.items():
+        nivel = logging.getLevelName(nivel.upper()) if isinstance(nivel, str) else nivel
+        logging.getLogger(nome).setLevel(nivel)  # Loggers nomeados (bibliotecas)
+        niveis_modulos[nome] = nivel  # Módulos do projeto, que registram no logger raiz
+    filtro = FiltroNivelPorModulo(niveis_modulos)
+
+    if assincrono:
+        fila = queue.SimpleQueue()
+        handler_fila = HandlerFila(fila)  # A formatação final fica com a thread
+        handler_fila.addFilter(filtro)  # Descarta antes de enfileirar
+        _ouvinte = logging.handlers.QueueListener(fila, handler_arquivo, handler_console, respect_handler_level=True)
+        _ouvinte.start()
+        handlers = [handler_fila]
+    else:
+        for handler in (handler_arquivo, handler_console):
+            handler.addFilter(filtro)
+        handlers = [handler_arquivo, handler_console]
+
+    logging.basicConfig(level=NIVEL_LOG, handlers=handlers, force=True)
+    _configuracao_atual = configuracao
@@ -0,0 +1,236 @@
+# perfilador.py
+# Profiling de seções do pipeline e do chat: CPU (cProfile), pilhas amostradas e memória (tracemalloc).
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import (
+    DIRETORIO_PERFIS,
+    INTERVALO_AMOSTRAGEM_PERFIL_S,
+    QUADROS_TRACEMALLOC,
+    TOP_PERFIL
+)
+
+PREFIXO_AMOSTRADOR = "amostrador-perfil"
+
+# Alocações do próprio perfilador (pilhas amostradas, relatórios de seções aninhadas), do
+# tracemalloc e do mecanismo de import não interessam nos relatórios.
+_FILTROS_MEMORIA = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+class AmostradorPilhas(threading.Thread):
+    """
+    Amostra a pilha de todas as threads a cada `intervalo_s` (tempo de relógio, não de CPU),
+    para gerar stacks colapsadas. Ao contrário do cProfile, que só vê a thread que o ligou,
+    mostra também o que as outras threads estavam fazendo (ex: esperando HTTP ou o LLM).
+    """
+
+    def __init__(self, intervalo_s: float = INTERVALO_AMOSTRAGEM_PERFIL_S):
+        super().__init__(name=f"{PREFIXO_AMOSTRADOR}-{id(self)}", daemon=True)
+        self.intervalo_s = intervalo_s
+        self.pilhas: Counter = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._nomes_quadros: Dict[Any, str] = {}
+
+    def _quadro(self, codigo) -> str:
+        nome = self._nomes_quadros.get(codigo)
+        if nome is None:
+            nome = self._nomes_quadros[codigo] = f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+        return nome
+
+    def run(self) -> None:
+        while not self._parar.wait(self.intervalo_s):
+            nomes = {t.ident: t.name for t in threading.enumerate()}
+            for ident, quadro in sys._current_frames().items():
+                nome = nomes.get(ident, str(ident))
+                if nome.startswith(PREFIXO_AMOSTRADOR):
+                    continue
+                pilha = []
+                while quadro is not None:
+                    pilha.append(self._quadro(quadro.f_code))
+                    quadro = quadro.f_back
+                self.pilhas[(f"thread:{nome}",) + tuple(reversed(pilha))] += 1
+            self.amostras += 1
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+    def linhas_colapsadas(self) -> List[str]:
+        """Formato 'a;b;c contagem' (flamegraph.pl, speedscope, inferno)."""
+        return [f"{';'.join(pilha)} {contagem}" for pilha, contagem in sorted(self.pilhas.items())]
+
+class Perfilador:
+    """
+    Perfila seções nomeadas (`with perfilador.secao("extracao"): ...`) e grava, para cada uma,
+    em <DIRETORIO_PERFIS>/<rotulo>_<data>/:
+
+    - NN_<secao>.prof: o perfil do cProfile (pstats, snakeviz);
+    - NN_<secao>.txt: as funções com maior tempo acumulado;
+    - NN_<secao>.collapsed: as pilhas amostradas de todas as threads, para flame graphs;
+    - NN_<secao>.memoria.txt: o pico de memória e as linhas que mais alocaram (tracemalloc);
+    - resumo.json: duração, CPU e memória de todas as seções da sessão.
+
+    Só uma seção é perfilada por vez no processo (o cProfile não aceita perfis simultâneos
+    em versões recentes do Python); seções iniciadas em outra thread nesse meio-tempo rodam
+    sem perfil. Seções aninhadas na mesma thread são permitidas: enquanto a interna roda,
+    o cProfile da externa fica pausado.
+
+    Desativado, `secao` não faz nada e não tem custo.
+    """
+
+    _trava = threading.Lock()
+    _dono: Optional[int] = None
+    _pilha: List[Dict[str, Any]] = []
+
+    def __init__(self, ativo: bool = False, rotulo: str = "sessao", diretorio: str = DIRETORIO_PERFIS):
+        self.ativo = ativo
+        self.rotulo = rotulo
+        self.diretorio_base = diretorio
+        self.diretorio: Optional[str] = None
+        self.secoes: List[Dict[str, Any]] = []
+        self._trava_secoes = threading.Lock()
+
+    def ativar(self) -> None:
+        """Liga o profiling; os próximos relatórios vão para uma nova sessão."""
+        with self._trava_secoes:
+            self.ativo = True
+            self.diretorio = None
+            self.secoes = []
+
+    def desativar(self) -> None:
+        self.ativo = False
+
+    def _diretorio_sessao(self) -> str:
+        if self.diretorio is None:
+            self.diretorio = os.path.join(self.diretorio_base, f"{self.rotulo}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+            os.makedirs(self.diretorio, exist_ok=True)
+        return self.diretorio
+
+    @contextmanager
+    def secao(self, nome: str) -> Iterator[None]:
+        if not self.ativo:
+            yield
+            return
+        aninhada = Perfilador._dono == threading.get_ident()
+        if not aninhada and not Perfilador._trava.acquire(blocking=False):
+            logging.info(f"Seção '{nome}' executada sem perfil: outra seção já está sendo perfilada.")
+            yield
+            return
+        Perfilador._dono = threading.get_ident()
+
+        pilha = Perfilador._pilha
+        iniciou_tracemalloc = not tracemalloc.is_tracing()
+        if iniciou_tracemalloc:
+            tracemalloc.start(QUADROS_TRACEMALLOC)
+        if pilha:
+            pilha[-1]['perfil'].disable()
+            pilha[-1]['pico'] = max(pilha[-1]['pico'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        atual = {'perfil': cProfile.Profile(), 'pico': 0}
+        pilha.append(atual)
+        antes = tracemalloc.take_snapshot().filter_traces(_FILTROS_MEMORIA)
+        amostrador = AmostradorPilhas()
+        amostrador.start()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        atual['perfil'].enable()
+        try:
+            yield
+        finally:
+            atual['perfil'].disable()
+            duracao, cpu = time.perf_counter() - inicio, time.process_time() - inicio_cpu
+            amostrador.parar()
+            pico = max(atual['pico'], tracemalloc.get_traced_memory()[1])
+            depois = tracemalloc.take_snapshot().filter_traces(_FILTROS_MEMORIA)
+            pilha.pop()
+            if iniciou_tracemalloc:
+                tracemalloc.stop()
+            if pilha:
+                pilha[-1]['perfil'].enable()
+            else:
+                Perfilador._dono = None
+                Perfilador._trava.release()
+            try:
+                self._gravar_relatorios(nome, atual['perfil'], amostrador, antes, depois, duracao, cpu, pico)
+            except OSError as e:
+                logging.error(f"Não foi possível gravar o perfil da seção '{nome}': {e}")
+
+    def _gravar_relatorios(
+        self,
+        nome: str,
+        perfil: cProfile.Profile,
+        amostrador: AmostradorPilhas,
+        antes: tracemalloc.Snapshot,
+        depois: tracemalloc.Snapshot,
+        duracao: float,
+        cpu: float,
+        pico: int
+    ) -> None:
+        with self._trava_secoes:
+            diretorio = self._diretorio_sessao()
+            nome_arquivo = re.sub(r"[^\w.-]+", "_", nome)
+            prefixo = os.path.join(diretorio, f"{len(self.secoes) + 1:02d}_{nome_arquivo}")
+            registro = {'secao': nome}
+            self.secoes.append(registro)
+
+        perfil.dump_stats(f"{prefixo}.prof")
+        saida = io.StringIO()
+        pstats.Stats(perfil, stream=saida).sort_stats("cumulative").print_stats(TOP_PERFIL)
+        with open(f"{prefixo}.txt", "w", encoding="utf-8") as f:
+            f.write(saida.getvalue())
+        with open(f"{prefixo}.collapsed", "w", encoding="utf-8") as f:
+            f.write("\n".join(amostrador.linhas_colapsadas()) + "\n")
+
+        diferencas = depois.compare_to(antes, "lineno")
+        retida = sum(d.size_diff for d in diferencas)
+        with open(f"{prefixo}.memoria.txt", "w", encoding="utf-8") as f:
+            f.write(f"Seção: {nome}\nPico de memória rastreada: {pico / 2**20:.2f} MiB\n")
+            f.write(f"Memória retida ao final: {retida / 2**20:.2f} MiB\n\n")
+            f.write(f"Top {TOP_PERFIL} linhas por memória retida:\n")
+            for diferenca in diferencas[:TOP_PERFIL]:
+                quadro = diferenca.traceback[0]
+                f.write(
+                    f"{diferenca.size_diff / 1024:>10.1f} KiB  {diferenca.count_diff:>+8d} blocos  "
+                    f"{quadro.filename}:{quadro.lineno}\n"
+                )
+
+        registro.update(
+            duracao_s=round(duracao, 3),
+            cpu_s=round(cpu, 3),
+            pico_memoria_mb=round(pico / 2**20, 2),
+            memoria_retida_mb=round(retida / 2**20, 2),
+            amostras_pilha=amostrador.amostras,
+            arquivos=[os.path.basename(prefixo) + extensao for extensao in (".prof", ".txt", ".collapsed", ".memoria.txt")]
+        )
+        with self._trava_secoes:
+            with open(os.path.join(diretorio, "resumo.json"), "w", encoding="utf-8") as f:
+                json.dump(self.secoes, f, ensure_ascii=False, indent=2)
+        logging.info(
+            f"Perfil da seção '{nome}': {duracao:.2f}s ({cpu:.2f}s de CPU), pico de {pico / 2**20:.1f} MiB. "
+            f"Relatórios em {diretorio}"
+        )
+
+    def estado(self) -> Dict[str, Any]:
+        with self._trava_secoes:
+            return {'ativo': self.ativo, 'diretorio': self.diretorio, 'secoes': list(self.secoes)}
@@ -0,0 +1,70 @@
+from src.etl.extractor import BuscadorRecursos
+from src.etl.limitador import LimitadorAdaptativo
+from src.utils.cache import salvar_cache_json
+
+URL = "https://pokeapi.test/type/1"
+
+class _Resposta:
+    def __init__(self, status_code, corpo=None, etag=None):
+        self.status_code = status_code
+        self._corpo = corpo
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._corpo
+
+class _Sessao:
+    """Responde 304 a um If-None-Match com o ETag atual e 200 com o recurso nos demais casos."""
+
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.cabecalhos = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.cabecalhos.append(headers or {})
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return _Resposta(304, etag=self.etag)
+        return _Resposta(200, {"nome": "normal", "versao": self.etag}, self.etag)
+
+def _buscador(caminho, sessao, agora, **kwargs):
+    return BuscadorRecursos(sessao, LimitadorAdaptativo(), str(caminho), relogio=lambda: agora, **kwargs)
+
+def test_memo_dentro_da_idade_nao_faz_requisicao(tmp_path):
+    caminho = tmp_path / "memo.json"
+    primeiro = _buscador(caminho, _Sessao(), agora=0, idade_maxima_s=100)
+    primeiro.buscar(URL)
+    primeiro.salvar()
+
+    sessao = _Sessao()
+    segundo = _buscador(caminho, sessao, agora=50, idade_maxima_s=100)
+    assert segundo.buscar(URL)["nome"] == "normal"
+    assert sessao.cabecalhos == [] and segundo.acertos_memo == 1
+
+def test_memo_vencido_e_revalidado_com_get_condicional(tmp_path):
+    caminho = tmp_path / "memo.json"
+    primeiro = _buscador(caminho, _Sessao(), agora=0, idade_maxima_s=100)
+    primeiro.buscar(URL)
+    primeiro.salvar()
+
+    sessao = _Sessao()
+    segundo = _buscador(caminho, sessao, agora=500, idade_maxima_s=100)
+    assert segundo.buscar(URL)["versao"] == '"v1"'
+    assert sessao.cabecalhos == [{"If-None-Match": '"v1"'}] and segundo.revalidados == 1
+    segundo.buscar(URL)  # Renovado: não revalida de novo na mesma execução
+    assert len(sessao.cabecalhos) == 1
+
+    sessao_nova = _Sessao(etag='"v2"')
+    terceiro = _buscador(caminho, sessao_nova, agora=1000, idade_maxima_s=100)
+    assert terceiro.buscar(URL)["versao"] == '"v2"'  # Mudou no servidor: baixado de novo
+
+def test_invalidar_ignora_o_memo(tmp_path):
+    caminho = tmp_path / "memo.json"
+    salvar_cache_json({URL: {"dados": {"nome": "antigo"}, "validadores": {}, "obtido_em": 0}}, str(caminho))
+
+    sessao = _Sessao()
+    buscador = _buscador(caminho, sessao, agora=0, idade_maxima_s=None, invalidar=True)
+    assert buscador.buscar(URL)["nome"] == "normal"
+    assert sessao.cabecalhos == [{}]
@@ -0,0 +1,21 @@
+import time
+
+from benchmarks.stub_llm import LLMFalso
+from src.rag import rag_core
+
+def test_fechar_o_lote_cancela_as_geracoes_pendentes(monkeypatch):
+    llm = LLMFalso("teste", latencia_s=0.05)
+    monkeypatch.setattr(rag_core, "get_llm", lambda: llm)
+    monkeypatch.setattr(rag_core, "buscar_documentos_em_lote", lambda perguntas, vetorstore: [[] for _ in perguntas])
+    monkeypatch.setattr(rag_core, "carregar_contexto_anterior", lambda sessao=None: "")
+    monkeypatch.setattr(rag_core, "_registrar_resposta", lambda *args: None)
+    perguntas = [f"pergunta {i}" for i in range(20)]
+
+    lote = rag_core.responder_perguntas_em_lote(perguntas, object(), max_concorrencia=2)
+    assert next(lote)['erro'] is None
+    lote.close()  # Como o StreamingResponse quando o cliente desconecta
+    chamadas_ao_fechar = llm.chamadas
+    time.sleep(0.3)  # Tempo de sobra para as 18 gerações restantes, se não fossem canceladas
+
+    assert chamadas_ao_fechar <= 3  # A concluída e as que já estavam em andamento
+    assert llm.chamadas == chamadas_ao_fechar
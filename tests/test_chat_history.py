@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from src.rag import chat_history
+
+@pytest.fixture
+def historico(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_history, "DIRETORIO_HISTORICO_CHAT", str(tmp_path / "historico"))
+    monkeypatch.setattr(chat_history, "DADOS_DIR", str(tmp_path / "dados"))
+    monkeypatch.setattr(chat_history, "HISTORICO_PATH", str(tmp_path / "historico.txt"))
+    return tmp_path
+
+def test_historico_separado_por_sessao(historico):
+    chat_history.salvar_historico("pergunta de a", "resposta de a", "a")
+    chat_history.salvar_historico("pergunta de b", "resposta de b", "b")
+
+    contexto = chat_history.carregar_contexto_anterior("a")
+    assert "pergunta de a" in contexto and "pergunta de b" not in contexto
+    assert "pergunta de b" in chat_history.ler_historico("b")
+
+def test_contexto_traz_so_as_ultimas_entradas_dentro_do_orcamento(historico, monkeypatch):
+    monkeypatch.setattr(chat_history, "ENTRADAS_HISTORICO_NO_CONTEXTO", 5)
+    monkeypatch.setattr(chat_history, "ORCAMENTO_TOKENS_HISTORICO", 100)
+    for i in range(20):
+        chat_history.salvar_historico(f"pergunta {i:02d}", "x" * 100)
+
+    contexto = chat_history.carregar_contexto_anterior()
+    incluidas = [i for i in range(20) if f"pergunta {i:02d}" in contexto]
+    assert incluidas and incluidas == list(range(20 - len(incluidas), 20))  # As mais recentes
+    assert len(incluidas) < 5  # Cortadas pelo orçamento antes do limite de entradas
+
+def test_historico_compactado_acima_do_limite(historico, monkeypatch):
+    monkeypatch.setattr(chat_history, "LIMITE_BYTES_HISTORICO_SESSAO", 2000)
+    monkeypatch.setattr(chat_history, "ENTRADAS_MANTIDAS_HISTORICO", 3)
+    for i in range(50):
+        chat_history.salvar_historico(f"pergunta {i}", "y" * 100)
+
+    assert os.path.getsize(chat_history._caminho_historico(None)) <= 2000
+    assert "pergunta 49" in chat_history.ler_historico()
+    assert "pergunta 0\n" not in chat_history.ler_historico()
+
+def test_historico_antigo_migrado_para_a_sessao_padrao(historico):
+    with open(chat_history.HISTORICO_PATH, "w", encoding="utf-8") as f:
+        f.write(f"[2024-01-01T00:00:00]\nPergunta: antiga\nResposta: linha 1\nlinha 2\n{'--'*20}\n")
+
+    texto = chat_history.ler_historico()
+    assert "Pergunta: antiga\nResposta: linha 1\nlinha 2\n" in texto
+    assert not os.path.exists(chat_history.HISTORICO_PATH)
@@ -0,0 +1,28 @@
+from benchmarks.stub_pokeapi import ServidorPokeAPIFalso
+from src.etl.extractor import _baixar_pokemon, _criar_sessao_com_retentativas
+from src.etl.limitador import LimitadorAdaptativo
+
+RETRY_AFTER_S = 0.3
+
+def test_nenhuma_id_se_perde_com_429():
+    with ServidorPokeAPIFalso(quantidade=80, limite_rps=40, retry_after_s=RETRY_AFTER_S) as servidor:
+        dados = _baixar_pokemon(range(1, 81), _criar_sessao_com_retentativas(), LimitadorAdaptativo(), servidor.url_pokemon)
+
+    assert servidor.contadores['limitadas'] > 0
+    assert [p['id'] for p in dados] == list(range(1, 81))
+
+def test_retry_after_e_respeitado():
+    # Uma requisição por vez: depois de cada 429, a próxima só pode chegar após o Retry-After.
+    limitador = LimitadorAdaptativo(concorrencia_inicial=1, concorrencia_maxima=1)
+    with ServidorPokeAPIFalso(quantidade=20, limite_rps=10, retry_after_s=RETRY_AFTER_S) as servidor:
+        dados = _baixar_pokemon(range(1, 21), _criar_sessao_com_retentativas(), limitador, servidor.url_pokemon)
+
+    assert [p['id'] for p in dados] == list(range(1, 21))
+    chegadas = sorted(servidor.chegadas)
+    intervalos_apos_429 = [
+        proxima - chegada
+        for (chegada, status), (proxima, _) in zip(chegadas, chegadas[1:])
+        if status == 429
+    ]
+    assert intervalos_apos_429
+    assert min(intervalos_apos_429) >= RETRY_AFTER_S
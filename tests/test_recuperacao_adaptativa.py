@@ -0,0 +1,54 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from src.rag.recuperacao_adaptativa import RecuperadorAdaptativo, cortar_por_salto
+
+class _Indice:
+    def __init__(self, vetores: np.ndarray):
+        self.vetores = vetores
+        self.ntotal = len(vetores)
+
+    def reconstruct(self, i: int) -> np.ndarray:
+        return self.vetores[i]
+
+class _Docstore:
+    def __init__(self, docs: dict):
+        self.docs = docs
+
+    def search(self, chave: str):
+        return self.docs.get(chave, f"ID {chave} não encontrado")
+
+class _Vetorstore:
+    """O mínimo de um FAISS do LangChain que o RecuperadorAdaptativo usa em `selecionar`."""
+
+    def __init__(self, vetores: np.ndarray):
+        self.index = _Indice(vetores)
+        self.index_to_docstore_id = {i: str(i) for i in range(len(vetores))}
+        self.docstore = _Docstore({str(i): Document(page_content=f"documento {i}") for i in range(len(vetores))})
+
+def _candidatos_com_penhasco():
+    """
+    4 candidatos perto da consulta e quase idênticos entre si, depois um salto grande de
+    distância e 6 candidatos distantes, diferentes entre si (que o MMR preferiria por diversidade).
+    """
+    dimensao = 12
+    consulta = np.eye(dimensao, dtype="float32")[0]
+    proximos = [consulta + 0.05 * np.eye(dimensao, dtype="float32")[i] for i in range(1, 5)]
+    distantes = [0.3 * consulta + np.eye(dimensao, dtype="float32")[i] for i in range(5, 11)]
+    vetores = np.vstack(proximos + distantes).astype("float32")
+    distancias = np.array([0.10, 0.11, 0.12, 0.13, 1.00, 1.01, 1.02, 1.03, 1.04, 1.05], dtype="float32")
+    return consulta, vetores, distancias, np.arange(len(vetores))
+
+def test_corte_no_penhasco():
+    _, _, distancias, _ = _candidatos_com_penhasco()
+    assert cortar_por_salto(distancias, k_minimo=3, k_maximo=12) == 4
+
+def test_mmr_nao_busca_documentos_depois_do_penhasco():
+    consulta, vetores, distancias, ids = _candidatos_com_penhasco()
+    recuperador = RecuperadorAdaptativo(_Vetorstore(vetores), k_minimo=3)
+
+    docs = recuperador.selecionar("fale sobre ataques", consulta, distancias, ids)
+
+    escolhidos = {int(doc.page_content.split()[-1]) for doc in docs}
+    assert escolhidos
+    assert escolhidos <= {0, 1, 2, 3}
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_llm import LLMFalso
+from src.rag.roteador_llm import Disjuntor, ProvedorLLM, RoteadorLLM
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+class _LLMEmPedacos:
+    def __init__(self, pedacos):
+        self.pedacos = pedacos
+
+    def stream(self, prompt):
+        yield from self.pedacos
+
+def _disjuntor_em_teste(relogio: _Relogio) -> Disjuntor:
+    """Um disjuntor aberto que acabou de liberar a chamada de teste ('meio_aberto')."""
+    disjuntor = Disjuntor(limite_falhas=1, tempo_aberto_s=30.0, relogio=relogio)
+    disjuntor.registrar_falha()
+    relogio.agora += 30.0
+    assert disjuntor.permitir()
+    assert disjuntor.estado == "meio_aberto"
+    return disjuntor
+
+def _transmitir_cancelado(provedor: ProvedorLLM) -> list:
+    cancelado = threading.Event()
+    cancelado.set()
+    eventos = []
+    provedor.transmitir("pergunta", 30.0, lambda tipo, valor: eventos.append(tipo), cancelado)
+    return eventos
+
+def test_cancelamento_antes_do_primeiro_token_devolve_a_chamada_de_teste():
+    relogio = _Relogio()
+    disjuntor = _disjuntor_em_teste(relogio)
+    provedor = ProvedorLLM("teste", _LLMEmPedacos(["a", "b"]), disjuntor=disjuntor)
+
+    assert _transmitir_cancelado(provedor) == []
+
+    assert disjuntor.estado == "aberto"
+    assert not disjuntor.permitir()
+    relogio.agora += 30.0
+    assert disjuntor.permitir()  # Uma nova chamada de teste é liberada
+
+def test_cancelamento_depois_do_primeiro_token_fecha_o_disjuntor():
+    relogio = _Relogio()
+    disjuntor = _disjuntor_em_teste(relogio)
+    provedor = ProvedorLLM("teste", _LLMEmPedacos(["a", "b"]), disjuntor=disjuntor)
+    cancelado = threading.Event()
+    eventos = []
+
+    def _emitir(tipo, valor):
+        eventos.append(tipo)
+        cancelado.set()  # O cliente desiste depois do primeiro token
+
+    provedor.transmitir("pergunta", 30.0, _emitir, cancelado)
+
+    assert eventos == ["token"]
+    assert disjuntor.estado == "fechado"
+    assert disjuntor.permitir()
+
+def test_cancelamento_com_disjuntor_fechado_nao_muda_o_estado():
+    disjuntor = Disjuntor()
+    provedor = ProvedorLLM("teste", _LLMEmPedacos(["a"]), disjuntor=disjuntor)
+
+    _transmitir_cancelado(provedor)
+
+    assert disjuntor.estado == "fechado"
+    assert disjuntor.permitir()
+
+def test_prazo_esgotado_levanta_timeout():
+    roteador = RoteadorLLM([ProvedorLLM("lento", LLMFalso("lento", latencia_s=1.0))], prazo_s=0.2, hedging=False)
+    inicio = time.monotonic()
+    with pytest.raises(TimeoutError):
+        roteador.invoke("pergunta")
+    assert time.monotonic() - inicio < 0.6  # Não espera o provedor terminar
+    assert roteador.contadores['prazos_esgotados'] == 1
+    roteador.encerrar()
+
+def test_failover_quando_o_provedor_falha():
+    fora, reserva = LLMFalso("a", fora_do_ar=True), LLMFalso("b", latencia_s=0.02)
+    roteador = RoteadorLLM([ProvedorLLM("a", fora), ProvedorLLM("b", reserva)], prazo_s=2.0, hedging=False)
+
+    resposta = roteador.invoke("pergunta")
+
+    assert resposta.content.startswith("Resposta de b")
+    assert roteador.contadores['failovers'] == 1
+    assert fora.chamadas == 1 and reserva.chamadas == 1
+    roteador.encerrar()
+
+def test_hedge_disparado_no_p95_do_provedor():
+    principal = LLMFalso("a", latencia_s=0.05)
+    provedor = ProvedorLLM("a", principal, amostras_minimas=10)
+    reserva = LLMFalso("b", latencia_s=0.05)
+    roteador = RoteadorLLM([provedor, ProvedorLLM("b", reserva)], prazo_s=3.0, hedging=True)
+    for _ in range(20):
+        roteador.invoke("pergunta")
+    atraso = provedor.atraso_hedging()
+    assert atraso < 0.1  # O p95 das amostras, e não o atraso padrão
+    hedges, chamadas_reserva = roteador.contadores['hedges'], reserva.chamadas
+
+    principal.latencia_s = 2.0  # O provedor principal degrada
+    inicio = time.monotonic()
+    resposta = roteador.invoke("pergunta")
+    duracao = time.monotonic() - inicio
+
+    assert resposta.content.startswith("Resposta de b")
+    assert roteador.contadores['hedges'] == hedges + 1
+    assert roteador.contadores['vitorias_hedge'] >= 1
+    assert reserva.chamadas == chamadas_reserva + 1
+    assert atraso <= duracao < 1.0  # O hedge sai depois do p95, sem esperar o provedor lento
+    roteador.encerrar()
+
+def test_disjuntor_abre_e_fecha():
+    relogio = _Relogio()
+    instavel = LLMFalso("a", fora_do_ar=True, latencia_s=0.01)
+    provedor = ProvedorLLM("a", instavel, disjuntor=Disjuntor(limite_falhas=2, tempo_aberto_s=30.0, relogio=relogio))
+    roteador = RoteadorLLM([provedor, ProvedorLLM("b", LLMFalso("b", latencia_s=0.01))], prazo_s=2.0, hedging=False)
+
+    for _ in range(2):
+        roteador.invoke("pergunta")
+    assert provedor.disjuntor.estado == "aberto"
+
+    roteador.invoke("pergunta")
+    assert instavel.chamadas == 2  # Aberto: o provedor é pulado
+
+    instavel.fora_do_ar = False
+    relogio.agora += 30.0
+    resposta = roteador.invoke("pergunta")  # A chamada de teste vai para o provedor recuperado
+    assert resposta.content.startswith("Resposta de a")
+    assert provedor.disjuntor.estado == "fechado"
+    roteador.encerrar()
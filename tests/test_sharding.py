@@ -0,0 +1,23 @@
+import pytest
+
+from src.etl.sharding import caminho_shard, mesclar_shards
+from src.utils.cache import salvar_cache_json
+
+def test_ids_fora_das_esperadas_ficam_fora_do_dataset(tmp_path):
+    diretorio = str(tmp_path)
+    salvar_cache_json([{'id': 1}, {'id': 3}], caminho_shard("pokemon", 0, 2, diretorio))
+    salvar_cache_json([{'id': 2}, {'id': 7}], caminho_shard("pokemon", 1, 2, diretorio))
+
+    dados, relatorio = mesclar_shards(quantidade=3, diretorio=diretorio, caminho_saida=str(tmp_path / "saida.json"))
+
+    assert [p['id'] for p in dados] == [1, 2, 3]
+    assert relatorio['ids_inesperados'] == [7]
+    assert relatorio['total_registros'] == 3
+
+def test_particoes_misturadas_sem_total_shards(tmp_path):
+    diretorio = str(tmp_path)
+    salvar_cache_json([{'id': 1}], caminho_shard("pokemon", 0, 2, diretorio))
+    salvar_cache_json([{'id': 2}], caminho_shard("pokemon", 0, 3, diretorio))
+
+    with pytest.raises(ValueError):
+        mesclar_shards(quantidade=2, diretorio=diretorio, caminho_saida=str(tmp_path / "saida.json"))